@@ -1,10 +1,17 @@
 from django.contrib import admin
 
 from bookings.models import Booking
+from hotel_management.pagination import EstimatedCountPaginator
 
 
 class BookingAdmin(admin.ModelAdmin):
-    list_display = ('booking_id', 'room', 'guest', 'check_in', 'check_out')
+    list_display = ('booking_id', 'room', 'guest', 'check_in', 'check_out', 'total_price', 'amount_paid', 'payment_status')
+    list_select_related = ('room', 'guest')  # Both are rendered with __str__
+    list_filter = ('booking_status',)
+    date_hierarchy = 'check_in'  # Served by booking_check_in_idx
+    autocomplete_fields = ('room', 'guest')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # Skips a second COUNT(*) of the whole table when filtering
 
 
 admin.site.register(Booking, BookingAdmin)
@@ -0,0 +1,63 @@
+"""
+Streaming export of bookings.
+
+Rows are read with QuerySet.iterator(), which uses a server-side cursor on
+PostgreSQL, and encoded one at a time, so memory use does not grow with the
+size of the table. Filters are applied in SQL.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Booking
+
+EXPORT_FIELDS = [
+    'booking_id',
+    'room_id',
+    'guest_id',
+    'booking_status',
+    'check_in',
+    'check_out',
+    'payment_status',
+    'total_price',
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_rows(check_in_from=None, check_in_to=None, status=None, chunk_size=2000):
+    bookings = Booking.objects.order_by('booking_id')
+    if check_in_from:
+        bookings = bookings.filter(check_in__gte=check_in_from)
+    if check_in_to:
+        bookings = bookings.filter(check_in__lte=check_in_to)
+    if status:
+        bookings = bookings.filter(booking_status=status)
+    return bookings.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object whose write() hands the encoded line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def iter_export(export_format, rows):
+    return iter_csv(rows) if export_format == 'csv' else iter_ndjson(rows)
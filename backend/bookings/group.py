@@ -0,0 +1,78 @@
+"""
+Group (block) bookings.
+
+A group is validated as a set with validate_bookings, which needs the same
+three queries for any group size, and inserted with one bulk_create. A group
+with any invalid item is rejected as a whole.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from hotel_management.cache import invalidate
+from reports.rollups import mark_stays
+from rooms.occupancy import occupancy_index
+from .models import OVERLAP_CONSTRAINT, Booking
+from .validators import validate_bookings
+
+MAX_GROUP_SIZE = 500
+
+
+class GroupBookingItemSerializer(serializers.Serializer):
+    room = serializers.IntegerField()
+    guest = serializers.IntegerField()
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    total_price = serializers.DecimalField(max_digits=10, decimal_places=2,
+                                           min_value=Decimal("50.00"), max_value=Decimal("500.00"))
+
+    def validate(self, data):
+        # Same rules as Booking.clean, checked without touching the database
+        if data['check_in'] >= data['check_out']:
+            raise serializers.ValidationError("Check-in date must be before check-out date.")
+        if data['check_in'] < date.today():
+            raise serializers.ValidationError("Check-in date cannot be in the past.")
+        return data
+
+
+class GroupBookingConflict(Exception):
+    def __init__(self, errors):
+        super().__init__("Group booking rejected.")
+        self.errors = errors  # item index -> list of messages
+
+
+def create_group_bookings(items):
+    """Validate and insert a group atomically. Raises GroupBookingConflict when any item is invalid."""
+    bookings = [
+        Booking(
+            room_id=item['room'],
+            guest_id=item['guest'],
+            booking_status='confirmed',
+            check_in=item['check_in'],
+            check_out=item['check_out'],
+            total_price=item['total_price'],
+        )
+        for item in items
+    ]
+    try:
+        with transaction.atomic():
+            # Locking the rooms serializes concurrent group bookings for the same rooms
+            errors = validate_bookings(bookings, lock_rooms=True)
+            if errors:
+                raise GroupBookingConflict(errors)
+            bookings = Booking.objects.bulk_create(bookings)
+    except IntegrityError as e:
+        # A concurrent single booking won the race for one of the rooms
+        if OVERLAP_CONSTRAINT in str(e):
+            raise GroupBookingConflict({
+                index: ["A room of this group was booked concurrently, please retry."] for index in range(len(items))
+            }) from e
+        raise
+
+    # bulk_create sends no model signals
+    occupancy_index.invalidate(item['room'] for item in items)
+    invalidate(Booking)
+    mark_stays((booking.check_in, booking.check_out) for booking in bookings)
+    return bookings
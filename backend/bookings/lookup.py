@@ -0,0 +1,54 @@
+"""
+Booking lookup for autocomplete widgets.
+
+A query is matched in one of four ways, each served by an index:
+
+- digits: the booking id (primary key)
+- an ISO date: the check-in day (booking_check_in_idx)
+- an email address: the guest's email (unique index)
+- anything else: a prefix of the guest's last name, or of "last first"
+  (guest_name_upper_idx). Both are LIKE 'PREFIX%' on the upper-cased names,
+  which PostgreSQL serves from the index whatever the database collation,
+  because the index is built with text_pattern_ops (guests migration 0003).
+
+Last names may have several words ("van der Berg"), so "last first" is
+tried with the split after each word of the query: "van der berg j"
+matches Jan van der Berg, and "van der" matches him as a last-name prefix.
+"""
+from datetime import date
+
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+from guests.models import Guest
+from .models import Booking
+
+LOOKUP_FIELDS = ['booking_id', 'check_in', 'check_out', 'room__room_number', 'guest__first_name', 'guest__last_name']
+
+
+def search_bookings(query):
+    """Bookings matching `query`, as values() rows with LOOKUP_FIELDS."""
+    query = ' '.join(query.split())
+    bookings = Booking.objects.values(*LOOKUP_FIELDS)
+    if not query:
+        return bookings.none()
+    if query.isdigit():
+        return bookings.filter(booking_id=int(query))
+    try:
+        return bookings.filter(check_in=date.fromisoformat(query))
+    except ValueError:
+        pass
+    if '@' in query:
+        return bookings.filter(guest__email__in={query, query.lower()})
+
+    words = query.upper().split(' ')
+    names = Q(last_upper__startswith=' '.join(words))
+    for split in range(1, len(words)):
+        names |= Q(last_upper=' '.join(words[:split]), first_upper__startswith=' '.join(words[split:]))
+    guests = Guest.objects.annotate(last_upper=Upper('last_name'), first_upper=Upper('first_name')).filter(names)
+    return bookings.filter(guest__in=guests.values('guest_id'))
+
+
+def booking_label(row):
+    return (f"#{row['booking_id']} {row['guest__first_name']} {row['guest__last_name']}, "
+            f"room {row['room__room_number']}, {row['check_in']} to {row['check_out']}")
@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.export import EXPORT_FORMATS, export_rows, iter_export
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = "Stream bookings as CSV or NDJSON without loading the table into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help="File to write to (defaults to stdout).")
+        parser.add_argument('--check-in-from', type=date.fromisoformat)
+        parser.add_argument('--check-in-to', type=date.fromisoformat)
+        parser.add_argument('--status', choices=[status for status, _ in Booking.STATUS_CHOICES])
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        rows = export_rows(
+            check_in_from=options['check_in_from'],
+            check_in_to=options['check_in_to'],
+            status=options['status'],
+            chunk_size=options['chunk_size'],
+        )
+        chunks = iter_export(options['format'], rows)
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,82 @@
+import bookings.models
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+# Rows the constraint would reject. Empty stays (check-in on the check-out
+# day) overlap nothing.
+OVERLAPPING_BOOKINGS = """
+    SELECT a.room_id, a.booking_id, a.check_in, a.check_out, b.booking_id, b.check_in, b.check_out
+    FROM bookings_booking a
+    JOIN bookings_booking b
+        ON b.room_id = a.room_id AND b.booking_id > a.booking_id
+        AND b.check_in < a.check_out AND a.check_in < b.check_out
+    WHERE a.booking_status = 'confirmed' AND b.booking_status = 'confirmed'
+        AND a.check_in < a.check_out AND b.check_in < b.check_out
+    ORDER BY a.room_id, a.booking_id, b.booking_id
+"""
+
+# daterange() fails on these, which would abort the ALTER TABLE
+INVERTED_BOOKINGS = """
+    SELECT room_id, booking_id, check_in, check_out
+    FROM bookings_booking
+    WHERE booking_status = 'confirmed' AND check_in > check_out
+    ORDER BY room_id, booking_id
+"""
+
+
+def conflicting_bookings(connection):
+    """A line per confirmed booking that keeps the constraint from being added."""
+    with connection.cursor() as cursor:
+        cursor.execute(OVERLAPPING_BOOKINGS)
+        problems = [
+            f"room {room_id}: booking {first} ({first_in} to {first_out}) overlaps "
+            f"booking {second} ({second_in} to {second_out})"
+            for room_id, first, first_in, first_out, second, second_in, second_out in cursor.fetchall()
+        ]
+        cursor.execute(INVERTED_BOOKINGS)
+        problems += [
+            f"room {room_id}: booking {booking_id} checks out ({check_out}) before it checks in ({check_in})"
+            for room_id, booking_id, check_in, check_out in cursor.fetchall()
+        ]
+    return problems
+
+
+def check_no_conflicts(apps, schema_editor):
+    # Exclusion constraints are PostgreSQL only; other backends keep relying on
+    # the overlap query in Booking.clean.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Fail with the offending bookings rather than PostgreSQL's first conflict;
+    # cancel or correct them, then migrate again
+    problems = conflicting_bookings(schema_editor.connection)
+    if problems:
+        raise RuntimeError(
+            "Cannot add the booking overlap constraint, these confirmed bookings violate it:\n  "
+            + "\n  ".join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_conflicts, migrations.RunPython.noop),
+        # Needs a superuser, or on PostgreSQL 13+ a database owner (btree_gist
+        # is a trusted extension); a no-op on other backends
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=bookings.models.OverlapConstraint(
+                condition=models.Q(('booking_status', 'confirmed')),
+                expressions=[
+                    (models.F('room'), '='),
+                    (bookings.models.DateRange('check_in', 'check_out'), '&&'),
+                ],
+                name='bookings_booking_no_confirmed_overlap',
+                violation_error_message='The room is already booked for the selected dates.',
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:32
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThanOrEqual
+
+
+def backfill_amount_paid(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    Payment = apps.get_model('payments', 'Payment')
+    paid = Coalesce(
+        Subquery(
+            Payment.objects
+            .filter(booking=OuterRef('pk'))
+            .values('booking')
+            .annotate(total=Sum('amount'))
+            .values('total')
+        ),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    Booking.objects.using(schema_editor.connection.alias).update(
+        amount_paid=paid,
+        payment_status=Case(When(GreaterThanOrEqual(paid, F('total_price')), then=Value(True)), default=Value(False)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_booking_no_confirmed_overlap'),
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='payment_status',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(backfill_amount_paid, migrations.RunPython.noop),
+    ]
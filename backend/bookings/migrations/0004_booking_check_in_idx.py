@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_amount_paid'),
+        ('guests', '0001_initial'),
+        ('rooms', '0002_room_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['check_in'], name='booking_check_in_idx'),
+        ),
+    ]
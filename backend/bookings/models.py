@@ -1,11 +1,53 @@
 
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Case, F, Func, Q, Value, When
 from django.core.exceptions import ValidationError
-from datetime import date, datetime
-from decimal import Decimal
 from guests.models import Guest
 from rooms.models import Room
 
+# Name of the PostgreSQL exclusion constraint added in migration 0002
+OVERLAP_CONSTRAINT = 'bookings_booking_no_confirmed_overlap'
+
+
+def overlap_enforced_by_database(using):
+    """Whether the database behind `using` carries the overlap exclusion constraint."""
+    return connections[using].vendor == 'postgresql'
+
+
+class DateRange(Func):
+    # Half-open, so a check-out and the next check-in can share a day
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+
+
+class OverlapConstraint(ExclusionConstraint):
+    """
+    Exclusion constraint created on PostgreSQL only; other backends rely on
+    the overlap query of validate_booking. Model validation is left to that
+    query too, which clean() runs on every backend: validating the constraint
+    as well would cost a second query and report the overlap twice.
+    """
+
+    def constraint_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().constraint_sql(model, schema_editor)
+
+    def create_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().create_sql(model, schema_editor)
+
+    def remove_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().remove_sql(model, schema_editor)
+
+    def validate(self, model, instance, exclude=None, using=None):
+        pass
+
 
 class Booking(models.Model):
     STATUS_CHOICES = [
@@ -20,44 +62,118 @@ class Booking(models.Model):
     booking_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     check_in = models.DateField()
     check_out = models.DateField()
-    payment_status = models.BooleanField(default=False)
+    # Derived from amount_paid >= total_price, see save()
+    payment_status = models.BooleanField(default=False, editable=False)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    # Sum of the booking's payments, kept up to date by payments/signals.py
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Admin date hierarchy and check-in range filters
+            models.Index(fields=['check_in'], name='booking_check_in_idx'),
+        ]
+        constraints = [
+            # Confirmed stays of the same room may not overlap
+            OverlapConstraint(
+                name=OVERLAP_CONSTRAINT,
+                expressions=[
+                    (F('room'), RangeOperators.EQUAL),
+                    (DateRange('check_in', 'check_out'), RangeOperators.OVERLAPS),
+                ],
+                condition=Q(booking_status='confirmed'),
+                violation_error_message="The room is already booked for the selected dates.",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored room so moving a booking also refreshes the old room's occupancy
+        instance._loaded_room_id = instance.__dict__.get('room_id')
+        # And the stored stay, so reports refresh the days it covered (see reports/signals.py)
+        if all(name in instance.__dict__ for name in ('booking_status', 'check_in', 'check_out')):
+            instance._loaded_stay = (instance.room_id, instance.booking_status, instance.check_in, instance.check_out)
+        # And the stored price, so a save only re-derives payment_status when it changes
+        if 'total_price' in instance.__dict__:
+            instance._loaded_total_price = instance.total_price
+        return instance
+
+    def clean_fields(self, exclude=None):
+        # validate_booking checks that the room and guest exist in its single
+        # query, so skip the per-field lookups ForeignKey.validate would run.
+        exclude = set(exclude or ()) | {'room', 'guest'}
+        super().clean_fields(exclude=exclude)
 
     def clean(self):
-        # Case 1: Ensure that check_in date is before check_out date
-        if self.check_in >= self.check_out:
-            raise ValidationError("Check-in date must be before check-out date.")
-
-        # Case 2: Ensure room availability for the selected dates
-        overlapping_bookings = Booking.objects.filter(
-            room=self.room,
-            check_in__lt=self.check_out,
-            check_out__gt=self.check_in,
-            booking_status='confirmed'  # Only confirmed bookings should be checked
-        )
-        # Exclude the current booking if it's being edited
-        if self.pk:  # Check if this is an existing booking
-            overlapping_bookings = overlapping_bookings.exclude(pk=self.pk)
+        from .validators import validate_booking
+
+        validate_booking(self)
 
-        if overlapping_bookings.exists():
-            raise ValidationError("The room is already booked for the selected dates.")
+    def _prepare_payment_fields(self, kwargs):
+        """
+        amount_paid is changed with F() updates as payments come and go, so an
+        update never writes back the copy loaded with the instance, and
+        payment_status is derived from the stored amount in the same statement
+        when the price changes or the caller asks for it. Otherwise the status
+        is left out of the update, like amount_paid. Returns whether
+        payment_status was set to that expression, in which case both fields
+        are reloaded after the save.
+        """
+        if self._state.adding:
+            self.payment_status = self.amount_paid >= self.total_price
+            return False
 
-        # Case 3: Validate the total_price
-        if self.total_price < Decimal("50.00"):
-            raise ValidationError("Total price cannot be less than 50.")
-        if self.total_price > Decimal("500.00"):
-            raise ValidationError("Total price cannot be more than 500.")
+        requested = kwargs.get('update_fields')
+        if requested is None:
+            deferred = self.get_deferred_fields()
+            update_fields = {field.attname for field in self._meta.concrete_fields
+                             if not field.primary_key and field.attname not in deferred}
+        else:
+            update_fields = set(requested)
+        update_fields -= {'amount_paid', 'payment_status'}
+        kwargs['update_fields'] = update_fields
+
+        # Compared with the price loaded from the database; unknown counts as changed
+        price_changed = (
+            'total_price' in update_fields
+            and getattr(self, '_loaded_total_price', None) != self.total_price
+        )
+        if price_changed or (requested is not None and 'payment_status' in requested):
+            self.payment_status = Case(When(amount_paid__gte=self.total_price, then=Value(True)), default=Value(False))
+            update_fields.add('payment_status')
+            return True
+        return False
 
-        # Case 4: Validate the room and guest status
-        if self.room.room_status not in ['Available']:
-            raise ValidationError("Room is not available for booking.")
+    def save(self, *args, **kwargs):
+        status_computed = self._prepare_payment_fields(kwargs)
+        try:
+            self._save_checking_overlap(*args, **kwargs)
+        except BaseException:
+            if status_computed:
+                # Deferred rather than left holding the expression
+                self.__dict__.pop('payment_status', None)
+            raise
+        if kwargs.get('update_fields') is None or 'total_price' in kwargs['update_fields']:
+            self._loaded_total_price = self.total_price
+        if status_computed:
+            # The status the database computed, and the amount it was computed from, in one query
+            self.refresh_from_db(fields=['amount_paid', 'payment_status'])
 
-        if not Guest.objects.filter(guest_id=self.guest.guest_id).exists():
-            raise ValidationError("Guest does not exist.")
+    def _save_checking_overlap(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Booking, instance=self)
+        if not overlap_enforced_by_database(using):
+            return super().save(*args, **kwargs)
 
-        # Case 5: Ensure the check_in date is not in the past
-        if self.check_in < date.today():
-            raise ValidationError("Check-in date cannot be in the past.")
+        # Run the insert in a savepoint so a rejected overlap leaves any outer
+        # transaction usable, and report it like the validation in clean() would.
+        try:
+            with transaction.atomic(using=using):
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if OVERLAP_CONSTRAINT in str(e):
+                raise ValidationError("The room is already booked for the selected dates.") from e
+            raise
 
-    def _str_(self):
+    def __str__(self):
         return f"Booking {self.booking_id} - {self.guest.first_name} {self.guest.last_name} ({self.booking_status}) ({self.payment_status})"
\ No newline at end of file
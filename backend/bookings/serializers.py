@@ -1,8 +1,37 @@
 from rest_framework import serializers
+
+from guests.serializers import GuestSerializer
+from hotel_management.serializers import SparseFieldsetMixin
+from payments.serializers import PaymentSerializer
+from rooms.serializers import RoomSerializer
 from .models import Booking
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Relations that can be nested in place of their ids with ?expand=
+    EXPANDABLE = {
+        'room': lambda: RoomSerializer(read_only=True),
+        'guest': lambda: GuestSerializer(read_only=True),
+        'payments': lambda: PaymentSerializer(many=True, read_only=True),
+    }
+
     class Meta:
         model = Booking
         fields = '__all__'
+
+    def __init__(self, *args, expand=(), fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            self.fields[name] = self.EXPANDABLE[name]()
+        # Expanded relations can be selected with ?fields= like any other field
+        self.restrict_to(fields)
+
+
+def expanded_queryset(queryset, expand):
+    """Load the relations named in `expand` up front so serializing a page takes a fixed number of queries."""
+    joined = [name for name in ('room', 'guest') if name in expand]
+    if joined:
+        queryset = queryset.select_related(*joined)
+    if 'payments' in expand:
+        queryset = queryset.prefetch_related('payments')
+    return queryset
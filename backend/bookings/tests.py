@@ -1,8 +1,22 @@
+import json
+from importlib import import_module
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from unittest import skipUnless
 from bookings.models import Booking
+from bookings.validators import validate_bookings
+from hotel_management.routers import route_reads
 from rooms.models import Room
 from guests.models import Guest
+from payments.models import Payment
 from datetime import date, datetime
 
 
@@ -56,6 +70,8 @@ class BookingTest(TestCase):
             payment_status=True,
             total_price=50.00,
         )
+        # Paid in full, so its payment_status is True
+        Payment.objects.create(booking=self.existing_booking, amount=50.00, payment_method="Credit Card")
 
 
     def test_create_valid_booking(self):
@@ -167,8 +183,589 @@ class BookingTest(TestCase):
         booking.save()
         self.assertEqual(Booking.objects.count(), 2)
     """
+    def test_overlapping_confirmed_booking_rejected(self):
+        """TEST CASE 8: Overlapping confirmed stay is rejected by clean() or by the database constraint"""
+        Booking.objects.create(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=150.00,
+        )
+        booking = Booking(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 4),
+            check_out=date(2030, 3, 8),
+            total_price=150.00,
+        )
+        with self.assertRaisesMessage(ValidationError, "The room is already booked for the selected dates."):
+            booking.full_clean()
+            booking.save()
+        self.assertEqual(Booking.objects.filter(room=self.room2).count(), 1)
+
+    def test_full_clean_uses_one_query(self):
+        """TEST CASE 14: Room status, guest and overlap are checked in a single query"""
+        booking = Booking(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=150.00,
+        )
+        with self.assertNumQueries(1):
+            booking.full_clean()
+        # The insert, plus marking its nights for the revenue rollups. On
+        # PostgreSQL the insert runs in a savepoint.
+        with self.assertNumQueries(4 if connection.vendor == 'postgresql' else 2):
+            booking.save()
+
+        # Editing the booking does not count it as an overlap with itself
+        booking.check_out = date(2030, 3, 6)
+        with self.assertNumQueries(1):
+            booking.full_clean()
+        # clean() is a read, and leaves replica routing alone
+        with route_reads(use_replica=True) as state:
+            booking.clean()
+        self.assertFalse(state.wrote)
+
+        # Rules that need no database are checked without a query
+        booking.total_price = 10.00
+        with self.assertNumQueries(0):
+            with self.assertRaisesMessage(ValidationError, "Total price cannot be less than 50."):
+                booking.full_clean()
+
+    def test_full_clean_reports_missing_references(self):
+        """TEST CASE 15: Unknown room or guest ids are rejected by the single query"""
+        booking = Booking(
+            room_id=999999,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=150.00,
+        )
+        with self.assertRaisesMessage(ValidationError, "Room does not exist."):
+            booking.full_clean()
+
+        booking.room, booking.guest_id = self.room2, 999999
+        with self.assertNumQueries(1):
+            with self.assertRaisesMessage(ValidationError, "Guest does not exist."):
+                booking.full_clean()
+
+        booking.guest, booking.room = self.guest, self.room1
+        with self.assertRaisesMessage(ValidationError, "Room is not available for booking."):
+            booking.full_clean()
+
+    def test_validate_bookings_uses_constant_queries(self):
+        """TEST CASE 16: A batch is validated with the same queries whatever its size"""
+        def batch(size):
+            return [
+                Booking(
+                    room=self.room2 if number % 2 else self.room3,
+                    guest=self.guest,
+                    booking_status="confirmed",
+                    check_in=date(2030, 5, 1 + 2 * number),
+                    check_out=date(2030, 5, 3 + 2 * number),
+                    total_price=150.00,
+                )
+                for number in range(size)
+            ]
+
+        for size in (2, 10):
+            with self.assertNumQueries(3):
+                self.assertEqual(validate_bookings(batch(size)), {})
+
+    def test_validate_bookings_reports_each_booking(self):
+        """TEST CASE 17: Batch validation reports every invalid booking by position"""
+        Booking.objects.create(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=150.00,
+        )
+
+        def booking(room, check_in, check_out, status="confirmed", total_price=150.00):
+            return Booking(room=room, guest=self.guest, booking_status=status,
+                           check_in=check_in, check_out=check_out, total_price=total_price)
+
+        errors = validate_bookings([
+            booking(self.room2, date(2030, 3, 4), date(2030, 3, 6)),
+            booking(self.room3, date(2030, 3, 1), date(2030, 3, 10)),
+            booking(self.room3, date(2030, 3, 2), date(2030, 3, 3), status="pending"),
+            booking(self.room3, date(2030, 3, 12), date(2030, 3, 14), status="pending"),
+            booking(self.room3, date(2030, 3, 12), date(2030, 3, 13), status="pending"),
+            booking(self.room1, date(2030, 3, 1), date(2030, 3, 2)),
+            booking(self.room2, date(2030, 3, 8), date(2030, 3, 9), total_price=600.00),
+        ])
+        self.assertEqual(errors, {
+            0: ["The room is already booked for the selected dates."],
+            # Confirmed bookings of the batch block pending ones; pending ones block nothing
+            2: ["Overlaps item 1 of this group."],
+            5: ["Room is not available for booking."],
+            6: ["Total price cannot be more than 500."],
+        })
+
+    @skipUnless(connection.vendor == 'postgresql', "Exclusion constraint is PostgreSQL only")
+    def test_overlap_constraint_without_clean(self):
+        """TEST CASE 9: Saving an overlapping confirmed stay without clean() still fails"""
+        Booking.objects.create(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=150.00,
+        )
+        with self.assertRaises(ValidationError):
+            Booking.objects.create(
+                room=self.room2,
+                guest=self.guest,
+                booking_status="confirmed",
+                check_in=date(2030, 3, 2),
+                check_out=date(2030, 3, 3),
+                total_price=150.00,
+            )
+        # Back-to-back stays and pending bookings are not overlaps
+        Booking.objects.create(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 5),
+            check_out=date(2030, 3, 7),
+            total_price=150.00,
+        )
+        Booking.objects.create(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="pending",
+            check_in=date(2030, 3, 2),
+            check_out=date(2030, 3, 3),
+            total_price=150.00,
+        )
+        self.assertEqual(Booking.objects.filter(room=self.room2).count(), 3)
+
+    @skipUnless(connection.vendor != 'postgresql', "The constraint keeps these rows out of PostgreSQL")
+    def test_overlap_constraint_migration_lists_conflicts(self):
+        """TEST CASE 18: The constraint migration names the bookings that would violate it"""
+        migration = import_module('bookings.migrations.0002_booking_no_confirmed_overlap')
+        stay = {"guest": self.guest, "total_price": 150.00}
+        first, second, _, _, inverted = Booking.objects.bulk_create([
+            Booking(room=self.room2, booking_status="confirmed", check_in=date(2030, 3, 1),
+                    check_out=date(2030, 3, 5), **stay),
+            Booking(room=self.room2, booking_status="confirmed", check_in=date(2030, 3, 4),
+                    check_out=date(2030, 3, 6), **stay),
+            # Back-to-back and pending stays are fine
+            Booking(room=self.room2, booking_status="confirmed", check_in=date(2030, 3, 6),
+                    check_out=date(2030, 3, 8), **stay),
+            Booking(room=self.room2, booking_status="pending", check_in=date(2030, 3, 2),
+                    check_out=date(2030, 3, 3), **stay),
+            Booking(room=self.room2, booking_status="confirmed", check_in=date(2030, 4, 5),
+                    check_out=date(2030, 4, 1), **stay),
+        ])
+        self.assertEqual(migration.conflicting_bookings(connection), [
+            f"room {self.room2.id}: booking {first.booking_id} (2030-03-01 to 2030-03-05) overlaps "
+            f"booking {second.booking_id} (2030-03-04 to 2030-03-06)",
+            f"room {self.room2.id}: booking {inverted.booking_id} checks out (2030-04-01) before it checks in (2030-04-05)",
+        ])
+
+    def test_booking_list_pagination(self):
+        """TEST CASE 10: Booking list is paged by booking_id"""
+        Booking.objects.create(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="pending",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=150.00,
+        )
+        first = self.client.get('/api/bookings/', {"page_size": 1}).json()
+        self.assertEqual([b['booking_id'] for b in first['results']], [self.existing_booking.booking_id])
+
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+
+    def test_export_bookings_csv(self):
+        """TEST CASE 11: Bookings stream as CSV with filters applied"""
+        Booking.objects.create(
+            room=self.room2,
+            guest=self.guest,
+            booking_status="pending",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=150.00,
+        )
+        response = self.client.get('/api/bookings/export/', {"status": "confirmed"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, [
+            "booking_id,room_id,guest_id,booking_status,check_in,check_out,payment_status,total_price",
+            f"{self.existing_booking.booking_id},{self.room1.id},10001,confirmed,2025-03-01,2025-03-05,True,50.00",
+        ])
+
+        response = self.client.get('/api/bookings/export/', {"check_in_from": "2026-01-01"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("pending", lines[1])
+
+    def test_export_bookings_ndjson(self):
+        """TEST CASE 12: Bookings stream as NDJSON, one object per line"""
+        response = self.client.get('/api/bookings/export/', {"output": "ndjson"})
+        self.assertEqual(response['Content-Type'], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows, [{
+            "booking_id": self.existing_booking.booking_id,
+            "room_id": self.room1.id,
+            "guest_id": 10001,
+            "booking_status": "confirmed",
+            "check_in": "2025-03-01",
+            "check_out": "2025-03-05",
+            "payment_status": True,
+            "total_price": "50.00",
+        }])
+        self.assertEqual(self.client.get('/api/bookings/export/', {"output": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get('/api/bookings/export/', {"check_in_to": "March"}).status_code, 400)
+
+    def test_export_bookings_command(self):
+        """TEST CASE 13: export_bookings command writes the same stream"""
+        out = StringIO()
+        call_command('export_bookings', '--format', 'ndjson', '--status', 'cancelled', stdout=out)
+        self.assertEqual(out.getvalue(), "")
+
+        call_command('export_bookings', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
     def tearDown(self):
         """Clean up after tests"""
         Booking.objects.all().delete()
         Room.objects.all().delete()
-        Guest.objects.all().delete()
\ No newline at end of file
+        Guest.objects.all().delete()
+
+class BookingListExpandTest(TestCase):
+
+    def setUp(self):
+        """Set up several bookings, each with its own room, guest and payments"""
+        caches['responses'].clear()
+        for number in range(5):
+            room = Room.objects.create(
+                room_number=f"20{number}A",
+                room_type="Double",
+                rate=100.00,
+                room_status="Available",
+                capacity=2
+            )
+            guest = Guest.objects.create(
+                first_name="Guest",
+                last_name=str(number),
+                email=f"guest{number}@example.com",
+                phone_number="1234567890"
+            )
+            booking = Booking.objects.create(
+                room=room,
+                guest=guest,
+                booking_status="confirmed",
+                check_in=date(2030, 4, 1),
+                check_out=date(2030, 4, 3),
+                total_price=200.00,
+            )
+            Payment.objects.create(booking=booking, amount=100.00, payment_method="PayPal")
+            Payment.objects.create(booking=booking, amount=100.00, payment_method="Credit Card")
+
+    def test_ids_without_expansion(self):
+        with self.assertNumQueries(1):
+            results = self.client.get('/api/bookings/').json()['results']
+        self.assertIsInstance(results[0]['room'], int)
+        self.assertIsInstance(results[0]['guest'], int)
+        self.assertNotIn('payments', results[0])
+
+    def test_expansion_uses_constant_queries(self):
+        # One joined query for the page and one for its payments, whatever the page size
+        for page_size in (2, 5):
+            caches['responses'].clear()
+            with self.assertNumQueries(2):
+                response = self.client.get('/api/bookings/', {"expand": "room,guest,payments", "page_size": page_size})
+            self.assertEqual(len(response.json()['results']), page_size)
+
+        booking = response.json()['results'][0]
+        self.assertEqual(booking['room']['room_number'], "200A")
+        self.assertEqual(booking['room']['type'], "Double")
+        self.assertEqual(booking['guest']['email'], "guest0@example.com")
+        self.assertEqual([p['payment_method'] for p in booking['payments']], ["PayPal", "Credit Card"])
+
+    def test_single_relation_expansion(self):
+        with self.assertNumQueries(1):
+            booking = self.client.get('/api/bookings/', {"expand": "guest"}).json()['results'][0]
+        self.assertEqual(booking['guest']['last_name'], "0")
+        self.assertIsInstance(booking['room'], int)
+
+    def test_sparse_fields_with_expansion(self):
+        with CaptureQueriesContext(connection) as queries:
+            results = self.client.get('/api/bookings/', {"fields": "booking_id,check_in,room",
+                                                         "expand": "room,payments"}).json()['results']
+        self.assertEqual(set(results[0]), {"booking_id", "check_in", "room"})
+        self.assertEqual(results[0]['room']['room_number'], "200A")
+        # payments were not asked for, so they are not prefetched
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"total_price"', queries[0]['sql'])
+
+        self.assertEqual(self.client.get('/api/bookings/', {"fields": "booking_id,invoice"}).status_code, 400)
+
+    def test_unknown_expansion(self):
+        self.assertEqual(self.client.get('/api/bookings/', {"expand": "room,invoices"}).status_code, 400)
+
+
+class GroupBookingTest(TestCase):
+
+    def setUp(self):
+        """Set up rooms, guests and one existing booking for group requests"""
+        caches['responses'].clear()
+        self.rooms = [
+            Room.objects.create(
+                room_number=f"30{number}A",
+                room_type="Double",
+                rate=100.00,
+                room_status="Available",
+                capacity=2
+            )
+            for number in range(6)
+        ]
+        self.maintenance_room = Room.objects.create(
+            room_number="399A",
+            room_type="Single",
+            rate=50.00,
+            room_status="Under Maintenance",
+            capacity=1
+        )
+        self.guest = Guest.objects.create(
+            first_name="Group",
+            last_name="Lead",
+            email="group.lead@example.com",
+            phone_number="1234567890"
+        )
+        Booking.objects.create(
+            room=self.rooms[0],
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 6, 10),
+            check_out=date(2030, 6, 12),
+            total_price=200.00,
+        )
+
+    def item(self, room, check_in=date(2030, 6, 1), check_out=date(2030, 6, 3), guest=None):
+        return {
+            "room": room.id if isinstance(room, Room) else room,
+            "guest": guest or self.guest.guest_id,
+            "check_in": check_in.isoformat(),
+            "check_out": check_out.isoformat(),
+            "total_price": "200.00",
+        }
+
+    def post(self, items):
+        return self.client.post('/api/bookings/group/', {"bookings": items}, content_type='application/json')
+
+    def test_group_created_with_constant_queries(self):
+        for rooms in (self.rooms[1:3], self.rooms[1:6]):
+            Booking.objects.filter(room__in=rooms).delete()
+            # Rooms, guests, overlapping bookings, the insert and the rollup days, plus the savepoint
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post([self.item(room) for room in rooms])
+            self.assertEqual(response.status_code, 201)
+            query_count = len([q for q in queries if 'SAVEPOINT' not in q['sql']])
+            self.assertEqual(query_count, 5)
+
+        results = response.json()['results']
+        self.assertEqual([result['index'] for result in results], list(range(5)))
+        self.assertTrue(all(result['status'] == "created" for result in results))
+        self.assertEqual(Booking.objects.filter(booking_id__in=[r['booking_id'] for r in results]).count(), 5)
+
+    def test_conflict_rejects_whole_group(self):
+        response = self.post([
+            self.item(self.rooms[1]),
+            self.item(self.rooms[0], date(2030, 6, 11), date(2030, 6, 13)),
+            self.item(self.rooms[2], date(2030, 6, 1), date(2030, 6, 5)),
+            self.item(self.rooms[2], date(2030, 6, 4), date(2030, 6, 6)),
+            # Back-to-back stays do not overlap
+            self.item(self.rooms[0], date(2030, 6, 13), date(2030, 6, 15)),
+        ])
+        self.assertEqual(response.status_code, 409)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results],
+                         ["valid", "rejected", "rejected", "rejected", "valid"])
+        self.assertEqual(results[1]['errors'], ["The room is already booked for the selected dates."])
+        self.assertEqual(results[2]['errors'], ["Overlaps item 3 of this group."])
+        self.assertEqual(results[3]['errors'], ["Overlaps item 2 of this group."])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_missing_and_unbookable_references(self):
+        response = self.post([
+            self.item(self.rooms[1], guest=999999),
+            self.item(999999),
+            self.item(self.maintenance_room),
+        ])
+        self.assertEqual(response.status_code, 409)
+        results = response.json()['results']
+        self.assertEqual(results[0]['errors'], ["Guest does not exist."])
+        self.assertEqual(results[1]['errors'], ["Room does not exist."])
+        self.assertEqual(results[2]['errors'], ["Room is not available for booking."])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_invalid_items(self):
+        response = self.post([
+            self.item(self.rooms[1]),
+            self.item(self.rooms[2], date(2030, 6, 5), date(2030, 6, 5)),
+            dict(self.item(self.rooms[3]), total_price="10.00"),
+        ])
+        self.assertEqual(response.status_code, 400)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ["valid", "rejected", "rejected"])
+        self.assertEqual(results[1]['errors'], ["Check-in date must be before check-out date."])
+        self.assertTrue(results[2]['errors'][0].startswith("total_price:"))
+
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.client.post('/api/bookings/group/', [], content_type='application/json').status_code, 400)
+
+
+class BookingAdminTest(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        self.number = 0
+
+    def add_bookings(self, count):
+        for _ in range(count):
+            self.number += 1
+            room = Room.objects.create(
+                room_number=f"40{self.number}A",
+                room_type="Double",
+                rate=100.00,
+                room_status="Available",
+                capacity=2
+            )
+            guest = Guest.objects.create(
+                first_name="Guest",
+                last_name=str(self.number),
+                email=f"admin-guest{self.number}@example.com",
+                phone_number="1234567890"
+            )
+            booking = Booking.objects.create(
+                room=room,
+                guest=guest,
+                booking_status="confirmed",
+                check_in=date(2030, 5, self.number),
+                check_out=date(2030, 5, self.number + 1),
+                total_price=100.00,
+            )
+            Payment.objects.create(booking=booking, amount=50.00, payment_method="PayPal")
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_change_lists_use_constant_queries(self):
+        for name in ('bookings_booking', 'payments_payment', 'guests_guest', 'rooms_room'):
+            url = reverse(f'admin:{name}_changelist')
+            self.add_bookings(2)
+            few = self.changelist_queries(url)
+            self.add_bookings(4)
+            self.assertEqual(self.changelist_queries(url), few, name)
+
+    def test_booking_str_names_guest(self):
+        self.add_bookings(1)
+        booking = Booking.objects.select_related('guest').get()
+        self.assertEqual(str(booking), f"Booking {booking.booking_id} - Guest 1 (confirmed) (False)")
+        response = self.client.get(reverse('admin:bookings_booking_changelist'), {"check_in__year": "2030"})
+        self.assertContains(response, "Guest 1 (active)")
+
+    def test_overlap_is_a_form_error(self):
+        self.add_bookings(1)
+        booking = Booking.objects.get()
+        response = self.client.post(reverse('admin:bookings_booking_add'), {
+            "room": booking.room_id,
+            "guest": booking.guest_id,
+            "booking_status": "confirmed",
+            "check_in": booking.check_in.isoformat(),
+            "check_out": booking.check_out.isoformat(),
+            "total_price": "100.00",
+        })
+        self.assertContains(response, "The room is already booked for the selected dates.")
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_room_autocomplete(self):
+        self.add_bookings(2)
+        response = self.client.get(reverse('admin:autocomplete'), {
+            "term": "401", "app_label": "bookings", "model_name": "booking", "field_name": "room",
+        })
+        self.assertEqual([result['text'] for result in response.json()['results']], ["Room 401A - Double"])
+
+
+class BookingLookupTest(TestCase):
+
+    def setUp(self):
+        room = Room.objects.create(
+            room_number="601A",
+            room_type="Suite",
+            rate=200.00,
+            room_status="Available",
+            capacity=3
+        )
+        self.bookings = {}
+        for number, (first_name, last_name, email) in enumerate([
+            ("Ada", "Lovelace", "ada@example.com"),
+            ("Alan", "Turing", "alan@example.com"),
+            ("Grace", "Hopper", "grace@example.com"),
+            ("Adam", "Lovell", "adam@example.com"),
+            ("Jan", "van der Berg", "jan@example.com"),
+            ("Siobhan", "O'Brien", "siobhan@example.com"),
+        ]):
+            guest = Guest.objects.create(first_name=first_name, last_name=last_name, email=email,
+                                         phone_number="1234567890")
+            self.bookings[last_name] = Booking.objects.create(
+                room=room,
+                guest=guest,
+                booking_status="confirmed",
+                check_in=date(2030, 7, 1 + 2 * number),
+                check_out=date(2030, 7, 2 + 2 * number),
+                total_price=200.00,
+            )
+
+    def lookup(self, query, **params):
+        return self.client.get('/api/bookings/lookup/', {"q": query, **params}).json()
+
+    def ids(self, query):
+        return [result['id'] for result in self.lookup(query)['results']]
+
+    def test_lookup_by_id_date_email_and_name(self):
+        ada, turing = self.bookings["Lovelace"], self.bookings["Turing"]
+        self.assertEqual(self.ids(str(ada.booking_id)), [ada.booking_id])
+        self.assertEqual(self.ids("2030-07-03"), [turing.booking_id])
+        self.assertEqual(self.ids("ALAN@example.com"), [turing.booking_id])
+        # Prefix of the last name, case-insensitive, newest first
+        self.assertEqual(self.ids("love"), [self.bookings["Lovell"].booking_id, ada.booking_id])
+        self.assertEqual(self.ids("lovelace a"), [ada.booking_id])
+        self.assertEqual(self.ids("lovelace b"), [])
+        self.assertEqual(self.ids(""), [])
+        # Punctuation and last names of several words
+        self.assertEqual(self.ids("o'"), [self.bookings["O'Brien"].booking_id])
+        berg = self.bookings["van der Berg"].booking_id
+        for query in ("van der", "van der berg", "VAN DER BERG j", "van  der berg jan"):
+            self.assertEqual(self.ids(query), [berg])
+        self.assertEqual(self.ids("van der berg k"), [])
+
+        result = self.lookup(str(ada.booking_id))['results'][0]
+        self.assertEqual(result['text'], f"#{ada.booking_id} Ada Lovelace, room 601A, 2030-07-01 to 2030-07-02")
+
+    def test_lookup_is_paginated(self):
+        with self.assertNumQueries(1):
+            first = self.lookup("lov", page_size=1)
+        self.assertEqual(first['results'][0]['id'], self.bookings["Lovell"].booking_id)
+        second = self.client.get(first['next']).json()
+        self.assertEqual([result['id'] for result in second['results']], [self.bookings["Lovelace"].booking_id])
@@ -0,0 +1,168 @@
+"""
+Booking validation.
+
+validate_booking checks a single booking with at most one query: the room's
+status, whether the guest exists and whether a confirmed booking overlaps the
+stay are read together as a room row annotated with two EXISTS subqueries.
+validate_bookings checks a batch with three queries whatever its size (rooms,
+guests and overlapping confirmed bookings) and finds overlaps between the
+bookings of the batch in memory.
+
+Rules that need no database (dates and price) are checked first, so an
+invalid booking is rejected without a query.
+"""
+import heapq
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import router
+from django.db.models import Exists, OuterRef
+
+from guests.models import Guest
+from rooms.models import Room
+
+ALREADY_BOOKED = "The room is already booked for the selected dates."
+
+
+def _rule_errors(booking):
+    """Messages for the rules that can be checked without the database."""
+    errors = []
+    if booking.check_in >= booking.check_out:
+        errors.append("Check-in date must be before check-out date.")
+    if booking.total_price < Decimal("50.00"):
+        errors.append("Total price cannot be less than 50.")
+    if booking.total_price > Decimal("500.00"):
+        errors.append("Total price cannot be more than 500.")
+    if booking.check_in < date.today():
+        errors.append("Check-in date cannot be in the past.")
+    return errors
+
+
+def validate_booking(booking):
+    """Raise ValidationError for the first rule `booking` breaks."""
+    from .models import Booking
+
+    errors = _rule_errors(booking)
+    if errors:
+        raise ValidationError(errors[0])
+    if booking.room_id is None:
+        raise ValidationError("Room does not exist.")
+
+    overlapping = Booking.objects.filter(
+        room=OuterRef('pk'),
+        check_in__lt=booking.check_out,
+        check_out__gt=booking.check_in,
+        booking_status='confirmed',
+    )
+    # Exclude the current booking if it's being edited
+    if booking.pk:
+        overlapping = overlapping.exclude(pk=booking.pk)
+    # Checked on PostgreSQL too, where the exclusion constraint is left to catch
+    # concurrent overlaps at save(), so forms report an overlap as an error.
+    # Validating is a read: db_for_write would mark the request as having
+    # written (see hotel_management/routers.py).
+    row = (
+        Room.objects.using(router.db_for_read(Booking, instance=booking))
+        .filter(pk=booking.room_id)
+        .annotate(
+            guest_exists=Exists(Guest.objects.filter(pk=booking.guest_id)),
+            overlaps=Exists(overlapping),
+        )
+        .values('room_status', 'guest_exists', 'overlaps')[:1]
+    )
+    row = next(iter(row), None)
+
+    if row is None:
+        raise ValidationError("Room does not exist.")
+    if row['overlaps']:
+        raise ValidationError(ALREADY_BOOKED)
+    if row['room_status'] not in ['Available']:
+        raise ValidationError("Room is not available for booking.")
+    if not row['guest_exists']:
+        raise ValidationError("Guest does not exist.")
+
+
+def validate_bookings(bookings, lock_rooms=False):
+    """
+    Check unsaved or edited bookings as a batch. Returns the messages of every
+    invalid booking by its position in `bookings`; a booking also fails when it
+    overlaps a confirmed booking of the same batch. With `lock_rooms` the rooms
+    are selected for update, which must happen inside a transaction.
+    """
+    from .models import Booking
+
+    bookings = list(bookings)
+    errors = {}
+
+    def add_error(index, message):
+        messages = errors.setdefault(index, [])
+        if message not in messages:
+            messages.append(message)
+
+    checked = []
+    for index, booking in enumerate(bookings):
+        rule_errors = _rule_errors(booking)
+        for message in rule_errors:
+            add_error(index, message)
+        if not rule_errors:
+            checked.append(index)
+    if not checked:
+        return errors
+
+    room_ids = {bookings[index].room_id for index in checked}
+    rooms = Room.objects.only('id', 'room_status')
+    if lock_rooms:
+        rooms = rooms.select_for_update()
+    rooms = rooms.in_bulk(room_ids - {None})
+    guest_ids = set(
+        Guest.objects
+        .filter(guest_id__in={bookings[index].guest_id for index in checked} - {None})
+        .values_list('guest_id', flat=True)
+    )
+    edited = {bookings[index].pk for index in checked if bookings[index].pk}
+    stored = (
+        Booking.objects
+        .filter(
+            room_id__in=list(rooms),
+            booking_status='confirmed',
+            check_in__lt=max(bookings[index].check_out for index in checked),
+            check_out__gt=min(bookings[index].check_in for index in checked),
+        )
+        .exclude(pk__in=edited)
+        .values_list('room_id', 'check_in', 'check_out')
+    )
+
+    # room id -> [(check_in, check_out, position or None when stored, blocks others)]
+    stays = {}
+    for room_id, check_in, check_out in stored:
+        stays.setdefault(room_id, []).append((check_in, check_out, None, True))
+
+    for index in checked:
+        booking = bookings[index]
+        room = rooms.get(booking.room_id)
+        if room is None:
+            add_error(index, "Room does not exist.")
+            continue
+        if room.room_status not in ['Available']:
+            add_error(index, "Room is not available for booking.")
+        if booking.guest_id not in guest_ids:
+            add_error(index, "Guest does not exist.")
+        stays.setdefault(room.pk, []).append(
+            (booking.check_in, booking.check_out, index, booking.booking_status == 'confirmed'))
+
+    for room_stays in stays.values():
+        # Sweep by check-in, keeping the stays not yet checked out in a heap by check-out
+        room_stays.sort(key=lambda stay: (stay[0], stay[2] is not None, stay[2] or 0))
+        active = []
+        for order, (check_in, check_out, owner, blocks) in enumerate(room_stays):
+            while active and active[0][0] <= check_in:
+                heapq.heappop(active)
+            for _, _, other, other_blocks in active:
+                if other_blocks and owner is not None:
+                    add_error(owner, ALREADY_BOOKED if other is None else f"Overlaps item {other} of this group.")
+                if blocks and other is not None:
+                    add_error(other, ALREADY_BOOKED if owner is None else f"Overlaps item {owner} of this group.")
+            heapq.heappush(active, (check_out, order, owner, blocks))
+
+    return errors
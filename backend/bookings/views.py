@@ -1,12 +1,131 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from hotel_management.cache import get_cached, set_cached
+from hotel_management.pagination import KeysetPagination
+from hotel_management.serializers import requested_fields
+from idempotency.decorators import idempotent
+
+from .export import EXPORT_FORMATS, export_rows, iter_export
+from .group import MAX_GROUP_SIZE, GroupBookingConflict, GroupBookingItemSerializer, create_group_bookings
+from .lookup import booking_label, search_bookings
 from .models import Booking
-from .serializers import BookingSerializer
+from .serializers import BookingSerializer, expanded_queryset
 
 
 class BookingList(APIView):
-    def get(self):
-        bookings = Booking.objects.all()
-        serializer = BookingSerializer(bookings, many=True)
-        return Response(serializer.data)
+    read_from_replica = True
+    cache_depends_on = ['bookings.Booking', 'rooms.Room', 'guests.Guest', 'payments.Payment']
+
+    def get(self, request):
+        expand = [name for name in request.GET.get('expand', '').split(',') if name]
+        unknown = set(expand) - set(BookingSerializer.EXPANDABLE)
+        if unknown:
+            return JsonResponse({"error": f"Cannot expand: {', '.join(sorted(unknown))}."}, status=400)
+
+        fields = requested_fields(request)
+        try:
+            columns = BookingSerializer(expand=expand, fields=fields).model_columns()
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=400)
+        # Relations left out of ?fields= need not be loaded; those that are
+        # followed with select_related() cannot be deferred
+        expand = [name for name in expand if fields is None or name in fields]
+        columns += [name for name in ('room', 'guest') if name in expand and name not in columns]
+
+        data = get_cached(request, self.cache_depends_on)
+        if data is None:
+            paginator = KeysetPagination(ordering='booking_id')
+            bookings = expanded_queryset(Booking.objects.only(*columns), expand)
+            bookings = paginator.paginate_queryset(bookings, request, view=self)
+            serializer = BookingSerializer(bookings, many=True, expand=expand, fields=fields)
+            data = paginator.get_paginated_response(serializer.data).data
+            set_cached(request, self.cache_depends_on, data)
+        return Response(data)
+
+
+class BookingExport(APIView):
+    def get(self, request):
+        # "format" is reserved by DRF for content negotiation
+        export_format = request.GET.get('output', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({"error": "output must be 'csv' or 'ndjson'."}, status=400)
+
+        try:
+            check_in_from = request.GET.get('check_in_from')
+            check_in_from = date.fromisoformat(check_in_from) if check_in_from else None
+            check_in_to = request.GET.get('check_in_to')
+            check_in_to = date.fromisoformat(check_in_to) if check_in_to else None
+        except ValueError:
+            return JsonResponse({"error": "Invalid date format."}, status=400)
+
+        status = request.GET.get('status')
+        if status and status not in dict(Booking.STATUS_CHOICES):
+            return JsonResponse({"error": f"Invalid booking status: {status}"}, status=400)
+
+        rows = export_rows(check_in_from=check_in_from, check_in_to=check_in_to, status=status)
+        response = StreamingHttpResponse(iter_export(export_format, rows), content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="bookings.{export_format}"'
+        return response
+
+
+class BookingLookup(APIView):
+    read_from_replica = True
+
+    def get(self, request):
+        # Newest first, a page at a time, so the widget never loads the whole table
+        paginator = KeysetPagination(ordering='-booking_id')
+        paginator.page_size = 20
+        rows = paginator.paginate_queryset(search_bookings(request.GET.get('q', '')), request, view=self)
+        return paginator.get_paginated_response([
+            {"id": row['booking_id'], "text": booking_label(row)} for row in rows
+        ])
+
+
+def _item_messages(errors):
+    """Flatten one item's serializer errors into readable messages."""
+    return [
+        message if field == 'non_field_errors' else f"{field}: {message}"
+        for field, messages in errors.items()
+        for message in messages
+    ]
+
+
+@method_decorator(idempotent, name='dispatch')
+class GroupBookingCreate(APIView):
+    def post(self, request):
+        items = request.data.get('bookings') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return JsonResponse({"error": "bookings must be a non-empty list."}, status=400)
+        if len(items) > MAX_GROUP_SIZE:
+            return JsonResponse({"error": f"A group can hold at most {MAX_GROUP_SIZE} bookings."}, status=400)
+
+        serializer = GroupBookingItemSerializer(data=items, many=True)
+        if not serializer.is_valid():
+            errors = serializer.errors
+            # Depending on the DRF version, a list with an entry per item or a dict of the invalid ones
+            if isinstance(errors, list):
+                errors = dict(enumerate(errors))
+            return Response({"results": [
+                {"index": index, "status": "rejected" if errors.get(index) else "valid",
+                 "errors": _item_messages(errors.get(index, {}))}
+                for index in range(len(items))
+            ]}, status=400)
+
+        try:
+            bookings = create_group_bookings(serializer.validated_data)
+        except GroupBookingConflict as e:
+            return Response({"results": [
+                {"index": index, "status": "rejected" if index in e.errors else "valid", "errors": e.errors.get(index, [])}
+                for index in range(len(items))
+            ]}, status=409)
+
+        return Response({"results": [
+            {"index": index, "status": "created", "booking_id": booking.booking_id}
+            for index, booking in enumerate(bookings)
+        ]}, status=201)
@@ -1,6 +1,14 @@
 from django.contrib import admin
 
 from guests.models import Guest
+from hotel_management.pagination import EstimatedCountPaginator
 
-# Register your models here.
-admin.site.register(Guest)
\ No newline at end of file
+
+@admin.register(Guest)
+class GuestAdmin(admin.ModelAdmin):
+    list_display = ('guest_id', 'first_name', 'last_name', 'email', 'guest_status')
+    list_filter = ('guest_status',)
+    # Exact and prefix matches, so a search does not scan for substrings
+    search_fields = ('=email', '^last_name', '^first_name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
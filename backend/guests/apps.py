@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GuestsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'guests'
+
+    def ready(self):
+        from hotel_management.cache import watch_model
+        watch_model(self.get_model('Guest'))
@@ -0,0 +1,130 @@
+"""
+Bulk guest import.
+
+The input CSV is streamed in batches. Names, email format, the 10-digit phone
+rule and status are checked in-process, emails repeated within the file are
+rejected, existing emails are looked up with one IN query per batch and the
+accepted guests of a batch are written with a single bulk_create, all in one
+transaction. Rejected rows can be copied to a side file with their error.
+"""
+import csv
+from dataclasses import dataclass
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from hotel_management.cache import invalidate
+from .models import Guest
+
+GUEST_IMPORT_COLUMNS = ['first_name', 'last_name', 'email', 'phone_number', 'address', 'guest_status']
+REQUIRED_GUEST_COLUMNS = ['first_name', 'last_name', 'email']
+
+
+@dataclass
+class GuestImportResult:
+    created: int = 0
+    rejected: int = 0
+
+
+def build_guest(row):
+    """Turn a CSV row into an unsaved Guest, applying the row-level rules of Guest.clean."""
+    values = {column: (row.get(column) or '').strip() for column in GUEST_IMPORT_COLUMNS}
+
+    if not values['first_name']:
+        raise ValidationError("First name cannot be empty.")
+    if not values['last_name']:
+        raise ValidationError("Last name cannot be empty.")
+    if not values['email']:
+        raise ValidationError("Email cannot be empty.")
+    try:
+        validate_email(values['email'])
+    except ValidationError:
+        raise ValidationError("Invalid email format.")
+
+    phone_number = values['phone_number']
+    if phone_number and not phone_number.isdigit():
+        raise ValidationError("Phone number must be numeric.")
+    if phone_number and len(phone_number) != 10:
+        raise ValidationError("Phone number must be exactly 10 digits long.")
+
+    guest_status = values['guest_status'] or 'active'
+    if guest_status not in dict(Guest.STATUS_CHOICES):
+        raise ValidationError(f"Invalid guest status: {guest_status}")
+
+    # validate_email accepts up to 320 characters, more than the email column holds
+    for column in ('first_name', 'last_name', 'email'):
+        if len(values[column]) > Guest._meta.get_field(column).max_length:
+            raise ValidationError(f"{column} is too long.")
+
+    return Guest(
+        first_name=values['first_name'],
+        last_name=values['last_name'],
+        email=values['email'],
+        phone_number=phone_number or None,
+        address=values['address'] or None,
+        guest_status=guest_status,
+    )
+
+
+def import_guests(csv_file, rejects=None, batch_size=2000):
+    """
+    Import guests from a text-mode CSV file with a header row.
+
+    `rejects` is an optional text file receiving every rejected row, with its
+    line number and the reason, as CSV.
+    """
+    reader = csv.DictReader(csv_file)
+    missing = set(REQUIRED_GUEST_COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise ValidationError(f"Missing columns: {', '.join(sorted(missing))}.")
+
+    reject_writer = None
+    if rejects is not None:
+        reject_writer = csv.DictWriter(rejects, fieldnames=['line', *reader.fieldnames, 'error'], extrasaction='ignore')
+        reject_writer.writeheader()
+
+    result = GuestImportResult()
+
+    def reject(line, row, message):
+        result.rejected += 1
+        if reject_writer:
+            reject_writer.writerow({**row, 'line': line, 'error': message})
+
+    seen = set()
+    numbered_rows = enumerate(reader, start=2)  # Line 1 is the header
+
+    with transaction.atomic():
+        while batch := list(islice(numbered_rows, batch_size)):
+            guests = []
+            for line, row in batch:
+                try:
+                    guest = build_guest(row)
+                except ValidationError as e:
+                    reject(line, row, e.messages[0])
+                    continue
+                if guest.email in seen:
+                    reject(line, row, "Duplicate email in file.")
+                    continue
+                seen.add(guest.email)
+                guests.append((line, row, guest))
+
+            existing = set(
+                Guest.objects
+                .filter(email__in=[guest.email for _, _, guest in guests])
+                .values_list('email', flat=True)
+            )
+            new_guests = []
+            for line, row, guest in guests:
+                if guest.email in existing:
+                    reject(line, row, "Email already exists.")
+                else:
+                    new_guests.append(guest)
+
+            result.created += len(Guest.objects.bulk_create(new_guests, batch_size=batch_size))
+
+    if result.created:
+        # bulk_create sends no model signals
+        invalidate(Guest)
+    return result
@@ -0,0 +1,33 @@
+from contextlib import ExitStack
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from guests.importers import GUEST_IMPORT_COLUMNS, import_guests
+
+
+class Command(BaseCommand):
+    help = f"Import guests from a CSV file with the columns: {', '.join(GUEST_IMPORT_COLUMNS)}."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--rejects', help="CSV file receiving rejected rows and the reason.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        try:
+            with ExitStack() as files:
+                csv_file = files.enter_context(open(options['csv_path'], newline='', encoding='utf-8-sig'))
+                rejects = None
+                if options['rejects']:
+                    rejects = files.enter_context(open(options['rejects'], 'w', newline='', encoding='utf-8'))
+                result = import_guests(csv_file, rejects=rejects, batch_size=options['batch_size'])
+        except OSError as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {result.created} guests, rejected {result.rejected} rows."))
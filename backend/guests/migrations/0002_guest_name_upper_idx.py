@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guests', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(django.db.models.functions.text.Upper('last_name'), django.db.models.functions.text.Upper('first_name'), name='guest_name_upper_idx'),
+        ),
+    ]
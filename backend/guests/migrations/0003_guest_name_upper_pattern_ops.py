@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# The name lookup filters with LIKE 'PREFIX%'. A btree index only serves that
+# under the C collation, unless it is built with the pattern operator class,
+# which compares strings character by character whatever the collation.
+PATTERN_OPS_INDEX = """
+    CREATE INDEX guest_name_upper_idx ON guests_guest
+    ((UPPER(last_name)) text_pattern_ops, (UPPER(first_name)) text_pattern_ops)
+"""
+
+PLAIN_INDEX = """
+    CREATE INDEX guest_name_upper_idx ON guests_guest ((UPPER(last_name)), (UPPER(first_name)))
+"""
+
+
+def use_pattern_ops(apps, schema_editor):
+    # Operator classes are PostgreSQL only
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS guest_name_upper_idx")
+    schema_editor.execute(PATTERN_OPS_INDEX)
+
+
+def use_default_ops(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS guest_name_upper_idx")
+    schema_editor.execute(PLAIN_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guests', '0002_guest_name_upper_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_pattern_ops, use_default_ops),
+    ]
@@ -1,11 +1,17 @@
 from django.core.validators import validate_email
 from django.db import models
+from django.db.models.functions import Upper
 from django.core.exceptions import ValidationError
 
 
 class Guest(models.Model):
     class Meta:
         app_label = 'guests'
+        indexes = [
+            # Case-insensitive name prefix search (bookings/lookup.py), with
+            # text_pattern_ops on PostgreSQL (migration 0003)
+            models.Index(Upper('last_name'), Upper('first_name'), name='guest_name_upper_idx'),
+        ]
     STATUS_CHOICES = [
         ('active', 'Active'),
         ('inactive', 'Inactive'),
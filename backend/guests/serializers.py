@@ -1,8 +1,10 @@
 from rest_framework import serializers
+
+from hotel_management.serializers import SparseFieldsetMixin
 from .models import Guest
 
 
-class GuestSerializer(serializers.ModelSerializer):
+class GuestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Guest
         fields = '__all__'
@@ -1,5 +1,16 @@
+import csv
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
+from guests.importers import import_guests
 from guests.models import Guest
 
 
@@ -145,3 +156,82 @@ class GuestTest(TestCase):
         self.assertEqual(guest.phone_number, "2012233210")
         self.assertEqual(guest.address, "")
         self.assertEqual(guest.guest_status, "active")
+
+    def test_guest_list_pagination(self):
+        # Test Case 10 - Guest list is paged by guest_id without counting rows
+        for number in range(3):
+            Guest.objects.create(
+                first_name="John",
+                last_name="Doe",
+                email=f"john{number}@example.com",
+                phone_number="2012233210"
+            )
+        first = self.client.get('/api/guests/', {"page_size": 2}).json()
+        self.assertEqual([guest['email'] for guest in first['results']], ["john0@example.com", "john1@example.com"])
+        self.assertNotIn('count', first)
+
+        with self.assertNumQueries(1):
+            second = self.client.get(first['next']).json()
+        self.assertEqual([guest['email'] for guest in second['results']], ["john2@example.com"])
+        self.assertIsNone(second['next'])
+
+    def test_guest_list_sparse_fields(self):
+        # Test Case 11 - ?fields= trims the output and the selected columns
+        caches['responses'].clear()
+        Guest.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@example.com",
+            phone_number="2012233210",
+            address="123 Main St"
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/guests/', {"fields": "first_name,email"})
+        self.assertEqual(response.json()['results'], [{"first_name": "John", "email": "johndoe@example.com"}])
+        self.assertNotIn("address", queries[-1]['sql'])
+        self.assertNotIn("updated_at", queries[-1]['sql'])
+
+        self.assertEqual(self.client.get('/api/guests/', {"fields": "first_name,password"}).status_code, 400)
+
+    def test_bulk_import_guests(self):
+        # Test Case 12 - Bulk import validates batches in-process and reports rejected rows
+        Guest.objects.create(first_name="Jane", last_name="Smith", email="jane@example.com")
+        rows = (
+            "first_name,last_name,email,phone_number\n"
+            "John,Doe,john@example.com,2012233210\n"
+            "Ann,Lee,ann@example.com,\n"
+            ",Doe,nofirst@example.com,2012233210\n"  # empty first name
+            "Bad,Email,invalidemail.com,2012233210\n"  # invalid email
+            "Short,Phone,short@example.com,12345\n"  # not 10 digits
+            "John,Again,john@example.com,2012233210\n"  # duplicate in file
+            "Jane,Smith,jane@example.com,2012233210\n"  # already stored
+            f"Long,Email,{'a' * 64}@{'b' * 60}.{'c' * 60}.{'d' * 60}.{'e' * 60}.com,\n"  # valid, but too long to store
+        )
+        rejects = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            result = import_guests(StringIO(rows), rejects=rejects, batch_size=4)
+        self.assertEqual((result.created, result.rejected), (2, 6))
+        statements = [query['sql'].split()[0] for query in queries]
+        self.assertEqual(statements.count("SELECT"), 2)  # one email lookup per batch
+        self.assertEqual(Guest.objects.get(email="ann@example.com").phone_number, None)
+
+        rejected = list(csv.DictReader(StringIO(rejects.getvalue())))
+        # Within a batch, rows failing validation come before stored emails
+        self.assertEqual([row['line'] for row in rejected], ["4", "5", "6", "7", "9", "8"])
+        self.assertEqual(rejected[3]['error'], "Duplicate email in file.")
+        self.assertEqual(rejected[4]['error'], "email is too long.")
+        self.assertEqual(rejected[5]['error'], "Email already exists.")
+
+    def test_import_guests_command(self):
+        # Test Case 13 - import_guests command writes the rejects file
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        source, rejects = os.path.join(directory, "guests.csv"), os.path.join(directory, "rejects.csv")
+        with open(source, "w") as csv_file:
+            csv_file.write("first_name,last_name,email\nJohn,Doe,john@example.com\nJohn,Doe,not-an-email\n")
+
+        out = StringIO()
+        call_command('import_guests', source, '--rejects', rejects, stdout=out)
+        self.assertIn("Imported 1 guests, rejected 1 rows.", out.getvalue())
+        with open(rejects) as rejects_file:
+            self.assertIn("Invalid email format.", rejects_file.read())
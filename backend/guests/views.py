@@ -1,14 +1,34 @@
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
 from rest_framework import generics, permissions
 from rest_framework.response import Response
-from rest_framework.views import APIView
+
+from hotel_management.cache import aget_cached, aset_cached
+from hotel_management.pagination import KeysetPagination
+from hotel_management.serializers import requested_fields
+from hotel_management.views import AsyncAPIView
 
 from .models import Guest
 from .serializers import GuestSerializer
 
 
-class GuestList(APIView):
-    def get(self):
-        guests = Guest.objects.all()
-        serializer = GuestSerializer(guests, many=True)
-        return Response(serializer.data)
+class GuestList(AsyncAPIView):
+    read_from_replica = True
+    cache_depends_on = ['guests.Guest']
+
+    async def get(self, request):
+        fields = requested_fields(request)
+        try:
+            columns = GuestSerializer(fields=fields).model_columns()
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=400)
+
+        data = await aget_cached(request, self.cache_depends_on)
+        if data is None:
+            paginator = KeysetPagination(ordering='guest_id')
+            guests = await paginator.apaginate_queryset(Guest.objects.only(*columns), request, view=self)
+            serializer = GuestSerializer(guests, many=True, fields=fields)
+            data = paginator.get_paginated_response(serializer.data).data
+            await aset_cached(request, self.cache_depends_on, data)
+        return Response(data)
 
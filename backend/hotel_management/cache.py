@@ -0,0 +1,198 @@
+"""
+Response cache for the read-only list endpoints.
+
+Payloads are stored in the cache named by RESPONSE_CACHE_ALIAS under a key
+built from the absolute request URL and a version token for every model the
+response depends on. Saving or deleting an instance of a watched model replaces
+that model's token, which makes every dependent entry unreachable at once;
+the size-bounded LRU of the cache backend then evicts them. The timeout only
+acts as a safety net for writes that bypass model signals (QuerySet.update()
+and bulk_create()); call invalidate() after those.
+
+A token also records when it was set, which serves as the Last-Modified
+time of the responses depending on it (see avalidators()).
+
+A response read from a replica may predate the write that last replaced a
+token, so it is kept for at most REPLICA_MAX_LAG seconds, and entries of
+requests that may read from a replica are keyed apart from the others.
+Requests whose reads must stay on the primary, because the client is pinned
+there after a write or the request itself wrote (see routers.py), bypass the
+cache: an entry another client built from a lagging replica under the token
+their write set would hide that write from them.
+"""
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .routers import current_routing
+
+VERSION_KEY = 'response-version:{}'
+
+
+class CacheStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(('hits', 'misses', 'evictions', 'invalidations'), 0)
+
+    def incr(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._counters = dict.fromkeys(self._counters, 0)
+
+
+stats = CacheStats()
+
+
+class InstrumentedLocMemCache(LocMemCache):
+    """Local-memory LRU cache that reports the entries it culls to `stats`."""
+
+    def _cull(self):
+        size = len(self._cache)
+        super()._cull()
+        stats.incr('evictions', size - len(self._cache))
+
+
+def _cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _label(model):
+    return model if isinstance(model, str) else model._meta.label
+
+
+def _new_version():
+    # The time of the change, then a random part so that changes within the
+    # same clock tick still replace the token
+    return f"{time.time():.6f}:{uuid.uuid4().hex}"
+
+
+def _versions(labels):
+    cache = _cache()
+    keys = [VERSION_KEY.format(label) for label in labels]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Never fall back to a fixed value: an evicted token must not make
+            # entries cached under an older token reachable again.
+            cache.add(key, _new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def _aversions(labels):
+    cache = _cache()
+    keys = [VERSION_KEY.format(label) for label in labels]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, _new_version(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def _bypassed():
+    routing = current_routing()
+    return routing is not None and (routing.pinned or routing.wrote)
+
+
+def _fingerprint(request, versions):
+    routing = current_routing()
+    source = 'replica' if routing is not None and routing.use_replica else 'primary'
+    fingerprint = ':'.join(versions + [source, request.build_absolute_uri()])
+    return 'response:' + hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()
+
+
+def _key(request, depends_on):
+    return _fingerprint(request, _versions(sorted(_label(model) for model in depends_on)))
+
+
+async def _akey(request, depends_on):
+    return _fingerprint(request, await _aversions(sorted(_label(model) for model in depends_on)))
+
+
+async def avalidators(request, depends_on):
+    """
+    ETag and Last-Modified (a timestamp) for the response to `request`, from
+    the tokens of the models it depends on. Unlike values read from the rows,
+    they move on deletes, and on update() and bulk_create() followed by
+    invalidate(). An evicted token comes back with the current time, which
+    only makes clients fetch again.
+    """
+    versions = await _aversions(sorted(_label(model) for model in depends_on))
+    digest = hashlib.md5(
+        ':'.join(versions + [request.get_full_path()]).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"', int(max(float(version.partition(':')[0]) for version in versions))
+
+
+def _timeout():
+    timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+    routing = current_routing()
+    if routing is not None and routing.read_from_replica:
+        timeout = min(timeout, getattr(settings, 'REPLICA_MAX_LAG', 5))
+    return timeout
+
+
+def get_cached(request, depends_on):
+    """The entry stored for this request, or None."""
+    if _bypassed():
+        return None
+    entry = _cache().get(_key(request, depends_on))
+    stats.incr('misses' if entry is None else 'hits')
+    return entry
+
+
+def set_cached(request, depends_on, entry):
+    if _bypassed():
+        return
+    _cache().set(_key(request, depends_on), entry, timeout=_timeout())
+
+
+async def aget_cached(request, depends_on):
+    """get_cached() for async views, through the cache backend's async API."""
+    if _bypassed():
+        return None
+    entry = await _cache().aget(await _akey(request, depends_on))
+    stats.incr('misses' if entry is None else 'hits')
+    return entry
+
+
+async def aset_cached(request, depends_on, entry):
+    if _bypassed():
+        return
+    await _cache().aset(await _akey(request, depends_on), entry, timeout=_timeout())
+
+
+def invalidate(*models):
+    """Drop every cached response that depends on any of `models`."""
+    def bump():
+        _cache().set_many({VERSION_KEY.format(_label(model)): _new_version() for model in models}, timeout=None)
+
+    stats.incr('invalidations')
+    bump()
+    # Again after commit, in case another request cached the state before it
+    transaction.on_commit(bump)
+
+
+def _model_changed(sender, **kwargs):
+    invalidate(sender)
+
+
+def watch_model(model):
+    """Invalidate responses depending on `model` whenever an instance is saved or deleted."""
+    post_save.connect(_model_changed, sender=model, dispatch_uid=f'response-cache-{_label(model)}-save')
+    post_delete.connect(_model_changed, sender=model, dispatch_uid=f'response-cache-{_label(model)}-delete')
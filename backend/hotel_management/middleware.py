@@ -0,0 +1,59 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from .routers import replica_aliases, route_reads
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let read-only views read from a replica, and keep a client's reads on the
+    primary for a while after it writes (see routers.py). Place it first, so
+    session and authentication writes made by later middleware are seen.
+    """
+    sync_capable = True
+    async_capable = True
+
+    cookie_name = 'primary_pinned'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with route_reads(**self.routing(request)) as state:
+            response = self.get_response(request)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        with route_reads(**self.routing(request)) as state:
+            response = await self.get_response(request)
+        return self.pin(request, response, state)
+
+    def routing(self, request):
+        if request.method not in ('GET', 'HEAD') or not replica_aliases():
+            return {'use_replica': False}
+        try:
+            view = resolve(request.path_info, urlconf=getattr(request, 'urlconf', None)).func
+        except Resolver404:
+            return {'use_replica': False}
+        return {
+            'use_replica': getattr(getattr(view, 'view_class', None), 'read_from_replica', False),
+            'pinned': self.cookie_name in request.COOKIES,
+        }
+
+    def pin(self, request, response, state):
+        if replica_aliases() and (state.wrote or request.method not in SAFE_METHODS):
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=getattr(settings, 'READ_YOUR_WRITES_TIMEOUT', 10),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,146 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over an indexed ordering of non-null columns that ends
+    in a unique one (normally the primary key).
+
+    The cursor holds every ordering column of the row a page starts after, and
+    the page is a range scan from that row on the whole ordering, fetching
+    page_size + 1 rows. Deep pages cost the same as the first one, ties on the
+    leading columns page correctly however many there are, and no COUNT(*) is
+    issued. The cursor is opaque to clients.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views, with the page read through async iteration."""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page([row async for row in queryset])
+
+    def _page_queryset(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        if reverse:
+            queryset = queryset.order_by(*(
+                column[1:] if column.startswith('-') else f'-{column}' for column in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self._after(json.loads(current_position), reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # One extra row tells whether a page follows
+        return queryset[offset:offset + self.page_size + 1]
+
+    def _after(self, position, reverse):
+        """
+        The rows past `position` in the direction of the page, as the row
+        comparison (a, b) > (x, y) spelled out per column, so that columns may
+        be sorted in different directions: a >= x AND (a > x OR a = x AND b > y).
+        The leading bound lets the index scan start at the position.
+        """
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise ValueError("The cursor does not match the ordering.")
+
+        after, ties = Q(), {}
+        for column, value in zip(self.ordering, position):
+            name = column.lstrip('-')
+            # (cursor reversed) XOR (column descending)
+            lookup = 'lt' if reverse != column.startswith('-') else 'gt'
+            after |= Q(**ties, **{f'{name}__{lookup}': value})
+            ties[name] = value
+
+        first = self.ordering[0]
+        lookup = 'lte' if reverse != first.startswith('-') else 'gte'
+        return Q(**{f"{first.lstrip('-')}__{lookup}": position[0]}) & after
+
+    def _set_page(self, results):
+        offset, reverse, current_position = self.cursor or (0, False, None)
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+        following_position = self._get_position_from_instance(results[-1], self.ordering) if has_following else None
+        has_preceding = current_position is not None or offset > 0
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = has_preceding, current_position
+            self.has_previous, self.previous_position = has_following, following_position
+        else:
+            self.has_next, self.next_position = has_following, following_position
+            self.has_previous, self.previous_position = has_preceding, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        # Every ordering column, not just the first, so no two rows share a
+        # position and the links never fall back to an offset
+        values = [
+            instance[column.lstrip('-')] if isinstance(instance, dict) else getattr(instance, column.lstrip('-'))
+            for column in ordering
+        ]
+        return json.dumps([str(value) for value in values])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin change lists over large tables.
+
+    An unfiltered queryset on PostgreSQL is counted from the planner's row
+    estimate in pg_class.reltuples, which is kept up to date by autovacuum,
+    instead of COUNT(*), which reads the whole table. Estimates below
+    ADMIN_ESTIMATED_COUNT_THRESHOLD, filtered querysets and other databases
+    are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+                        [connection.ops.quote_name(queryset.model._meta.db_table)],
+                    )
+                    row = cursor.fetchone()
+                # reltuples is -1 for a table that was never analyzed
+                if row and row[0] >= getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000):
+                    return int(row[0])
+        return super().count
@@ -0,0 +1,163 @@
+"""
+Read-replica database routing.
+
+Views with `read_from_replica = True` (the list, availability, calendar and
+report endpoints) read from one of the aliases in DATABASE_REPLICAS when
+they are requested with GET or HEAD. Every write, every read inside a
+transaction on the primary and every other request use the primary
+('default'). ReplicaRoutingMiddleware marks the requests, and gives clients
+read-your-writes:
+
+- once a request has written, its later reads go to the primary;
+- a response to a request that wrote, or used an unsafe method, sets a
+  cookie that keeps the client's reads on the primary for
+  READ_YOUR_WRITES_TIMEOUT seconds, long enough for a replica to catch up.
+
+A replica is skipped while it cannot be reached or is further behind than
+REPLICA_MAX_LAG seconds. Each process checks this at most once every
+REPLICA_CHECK_INTERVAL seconds per replica.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+# 0 while the replica has replayed everything it received, even when the
+# primary has been idle since the last replayed transaction
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+class RoutingState:
+    """How the reads of the current request are routed."""
+
+    def __init__(self, use_replica, pinned):
+        self.use_replica = use_replica
+        self.pinned = pinned  # The client wrote recently
+        self.wrote = False
+        self.replica = None  # Chosen on the first read, then kept for the request
+
+    @property
+    def read_from_replica(self):
+        return self.replica not in (None, PRIMARY)
+
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+@contextmanager
+def route_reads(use_replica=False, pinned=False):
+    """Route the reads made inside the block; ReplicaRoutingMiddleware wraps each request in it."""
+    state = RoutingState(use_replica, pinned)
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+def current_routing():
+    """The RoutingState of the current request, or None outside one."""
+    return _routing.get()
+
+
+def replica_lag(connection):
+    """Seconds the replica behind `connection` is behind the primary, 0 where unknown."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+        # Other backends report no lag, so only check that the replica answers
+        cursor.execute("SELECT 1")
+    return 0.0
+
+
+class ReplicaHealth:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked = {}  # alias -> (time.monotonic() of the check, usable)
+
+    def usable(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            checked = self._checked.get(alias)
+        if checked is not None and now - checked[0] < getattr(settings, 'REPLICA_CHECK_INTERVAL', 5):
+            return checked[1]
+
+        usable = self._check(alias)
+        with self._lock:
+            self._checked[alias] = (now, usable)
+        return usable
+
+    def clear(self):
+        with self._lock:
+            self._checked = {}
+
+    def _check(self, alias):
+        connection = connections[alias]
+        try:
+            lag = replica_lag(connection)
+        except DatabaseError as e:
+            logger.warning("Replica %s is unavailable, reading from the primary: %s", alias, e)
+            # Drop the broken connection so the next check reconnects
+            try:
+                connection.close()
+            except DatabaseError:
+                pass
+            return False
+
+        max_lag = getattr(settings, 'REPLICA_MAX_LAG', 5)
+        if lag > max_lag:
+            logger.warning("Replica %s is %.1fs behind (limit %ss), reading from the primary.", alias, lag, max_lag)
+            return False
+        return True
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or not state.use_replica or state.pinned or state.wrote:
+            return PRIMARY
+        # A transaction may read back its own uncommitted writes
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        if state.replica is None:
+            replicas = [alias for alias in replica_aliases() if replica_health.usable(alias)]
+            state.replica = random.choice(replicas) if replicas else PRIMARY
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
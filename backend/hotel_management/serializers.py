@@ -0,0 +1,37 @@
+from django.core.exceptions import ValidationError
+
+
+def requested_fields(request):
+    """Field names asked for with ?fields=a,b,c, or None when the parameter is absent."""
+    value = request.GET.get('fields')
+    if value is None:
+        return None
+    return [name for name in value.split(',') if name]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin accepting fields=[...] to output only those fields.
+
+    model_columns() lists the concrete model fields the remaining fields read,
+    so views can pass them to QuerySet.only() and skip loading the rest.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.restrict_to(fields)
+
+    def restrict_to(self, fields):
+        if fields is None:
+            return
+        unknown = set(fields) - set(self.fields)
+        if unknown:
+            raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        for name in list(self.fields):
+            if name not in fields:
+                self.fields.pop(name)
+
+    def model_columns(self):
+        concrete = {field.name for field in self.Meta.model._meta.concrete_fields}
+        columns = [field.source.split('.')[0] for field in self.fields.values()]
+        return [column for column in columns if column in concrete]
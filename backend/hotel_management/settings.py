@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -37,15 +39,19 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rooms',
     'guests',
     'bookings',
     'payments',
+    'idempotency',
+    'reports',
     'rest_framework',
     'corsheaders',
 ]
 
 MIDDLEWARE = [
+    'hotel_management.middleware.ReplicaRoutingMiddleware',  # First, to see session writes
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +66,8 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # Your React frontend address
 ]
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+
 ROOT_URLCONF = 'hotel_management.urls'
 
 TEMPLATES = [
@@ -82,6 +90,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'hotel_management.wsgi.application'
 
+# The room list, room availability and guest list views are async; serve
+# them from an ASGI server (e.g. `uvicorn hotel_management.asgi:application`)
+# so their database waits do not hold a worker thread.
+ASGI_APPLICATION = 'hotel_management.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -97,6 +110,58 @@ DATABASES = {
     }
 }
 
+# Read replicas (hotel_management/routers.py)
+# Add each streaming replica to DATABASES (with a short 'connect_timeout' in
+# its OPTIONS, so an unreachable one is skipped quickly) and list its alias
+# here. GET requests to the list, availability and report views then read
+# from a replica; everything else stays on 'default'.
+
+DATABASE_ROUTERS = ['hotel_management.routers.ReplicaRouter']
+
+DATABASE_REPLICAS = []
+
+REPLICA_MAX_LAG = 5  # Seconds a replica may be behind before reads go back to the primary
+
+REPLICA_CHECK_INTERVAL = 5  # Seconds between lag and availability checks of each replica, per process
+
+READ_YOUR_WRITES_TIMEOUT = 10  # Seconds a client's reads stay on the primary after it writes
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Swap the backends for a shared one (e.g. Redis) when running several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'hotel_management.cache.InstrumentedLocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,  # Least recently used entries are culled beyond this
+        },
+    },
+    # Room occupancy tokens (rooms/occupancy.py). Local memory is only correct
+    # with a single worker process: with several, use a backend they share
+    # (check --deploy warns otherwise). It should not evict entries in use;
+    # an evicted token only costs a reload of that room's bookings.
+    'occupancy': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'occupancy',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10_000_000,  # One token per room
+        },
+    },
+}
+
+# Read endpoint response cache (hotel_management/cache.py)
+
+RESPONSE_CACHE_ALIAS = 'responses'
+
+RESPONSE_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -138,3 +203,49 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Room occupancy index (rooms/occupancy.py)
+# Bookings further out than the horizon, or an index larger than the limit, are
+# checked against the database instead. Invalidation goes through the cache
+# named here, so multi-process deployments need a shared cache backend for it.
+
+OCCUPANCY_CACHE_ALIAS = 'occupancy'
+
+# Build the index in a background thread when the apps are ready, and in each
+# process forked from there. Enable it in the settings of the web servers;
+# management commands and the test runner load the apps too.
+OCCUPANCY_INDEX_BUILD_ON_START = False
+
+OCCUPANCY_INDEX_HORIZON_DAYS = 730
+
+OCCUPANCY_INDEX_MAX_BOOKINGS = 2_000_000
+
+# Payment processing (payments/worker.py)
+# Submitted payments are charged by `manage.py process_payments`. Swap the fake
+# gateway for a real provider's PaymentGateway in production.
+
+PAYMENT_GATEWAY = {
+    'BACKEND': 'payments.gateways.FakeGateway',
+    'OPTIONS': {
+        'latency': 0.5,
+    },
+}
+
+PAYMENT_MAX_ATTEMPTS = 5
+
+PAYMENT_RETRY_BACKOFF = 2  # Seconds before the first retry, doubled for each further one
+
+PAYMENT_CLAIM_TIMEOUT = 300  # Seconds after which a request claimed by a silent worker is claimed again
+
+# Idempotency-Key support (idempotency/decorators.py)
+# Expired keys are deleted by `manage.py sweep_idempotency_keys`.
+
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60  # Seconds a stored response is replayed for
+
+IDEMPOTENCY_PROCESSING_TIMEOUT = 60  # Seconds after which an unfinished request's key can be reused
+
+# Admin change lists (hotel_management/pagination.py)
+# Unfiltered lists of tables estimated above this many rows show the
+# PostgreSQL planner estimate instead of an exact COUNT(*).
+
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100_000
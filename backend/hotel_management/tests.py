@@ -0,0 +1,298 @@
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from unittest import skipUnless
+
+from bookings.models import Booking
+from guests.models import Guest
+from hotel_management.cache import stats
+from hotel_management.pagination import EstimatedCountPaginator, KeysetPagination
+from hotel_management.routers import replica_health, route_reads
+from payments.models import Payment
+from rest_framework.request import Request
+from rooms.models import Room
+
+
+class ResponseCacheTest(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        stats.reset()
+        self.room = Room.objects.create(
+            room_number="101A",
+            room_type="Single",
+            rate=80.00,
+            room_status="Available",
+            capacity=1
+        )
+        self.guest = Guest.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="1234567890"
+        )
+        self.booking = Booking.objects.create(
+            room=self.room,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=80.00,
+        )
+
+    def test_repeated_reads_are_served_from_cache(self):
+        for url in ('/api/rooms/', '/api/guests/', '/api/bookings/'):
+            first = self.client.get(url).json()
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).json(), first)
+        self.assertEqual(stats.snapshot()['hits'], 3)
+        self.assertEqual(stats.snapshot()['misses'], 3)
+
+    def test_query_parameters_are_part_of_the_key(self):
+        self.client.get('/api/guests/')
+        with self.assertNumQueries(1):
+            self.client.get('/api/guests/?page_size=1')
+
+    def test_model_signals_invalidate_dependent_responses(self):
+        self.client.get('/api/rooms/')
+        self.client.get('/api/guests/')
+        self.client.get('/api/bookings/')
+
+        self.guest.address = "1 Main St"
+        self.guest.save()
+        with self.assertNumQueries(0):
+            self.client.get('/api/rooms/')
+        self.assertEqual(self.client.get('/api/guests/').json()['results'][0]['address'], "1 Main St")
+
+        # Payments change what a booking looks like, rooms do not depend on them
+        self.client.get('/api/bookings/')
+        Payment.objects.create(booking=self.booking, amount=80.00, payment_method="PayPal")
+        with self.assertNumQueries(0):
+            self.client.get('/api/rooms/')
+        with self.assertNumQueries(1):
+            self.client.get('/api/bookings/')
+
+        self.room.delete()
+        self.assertEqual(self.client.get('/api/rooms/').json()['results'], [])
+        self.assertEqual(self.client.get('/api/bookings/').json()['results'], [])
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'occupancy': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'responses': {
+            'BACKEND': 'hotel_management.cache.InstrumentedLocMemCache',
+            'LOCATION': 'eviction-test',
+            'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 3},
+        },
+    })
+    def test_size_bound_evicts_least_recently_used(self):
+        for page_size in range(1, 7):
+            self.client.get('/api/guests/', {"page_size": page_size})
+        self.assertGreater(stats.snapshot()['evictions'], 0)
+        # The most recent entry survives
+        with self.assertNumQueries(0):
+            self.client.get('/api/guests/', {"page_size": 6})
+
+    def test_stats_endpoint_requires_staff(self):
+        self.assertEqual(self.client.get('/api/cache/stats/').status_code, 403)
+
+        self.client.force_login(User.objects.create_user("admin", is_staff=True))
+        response = self.client.get('/api/cache/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {"hits", "misses", "evictions", "invalidations"})
+
+
+class EstimatedCountPaginatorTest(TestCase):
+
+    def setUp(self):
+        for number in range(3):
+            Room.objects.create(
+                room_number=f"50{number}A",
+                room_type="Single",
+                rate=80.00,
+                room_status="Available",
+                capacity=1
+            )
+
+    def test_small_or_filtered_tables_are_counted_exactly(self):
+        self.assertEqual(EstimatedCountPaginator(Room.objects.order_by('id'), 2).count, 3)
+        self.assertEqual(EstimatedCountPaginator(Room.objects.filter(room_number="500A").order_by('id'), 2).count, 1)
+
+    @skipUnless(connection.vendor == 'postgresql', "pg_class estimates are PostgreSQL only")
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_large_table_uses_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE rooms_room")
+        with self.assertNumQueries(1):
+            count = EstimatedCountPaginator(Room.objects.order_by('id'), 2).count
+        self.assertGreaterEqual(count, 0)
+
+
+class AsyncKeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        # Repeated rates, so pages start and end inside runs of ties
+        for number, rate in enumerate([120, 60, 90, 60, 120, 60, 95, 120]):
+            Room.objects.create(room_number=f"KP{number}", room_type="Single", rate=rate,
+                                room_status="Available", capacity=1)
+
+    def page(self, url):
+        """Page ids and links for `url`, checking the async paginator agrees with the sync one."""
+        request = Request(RequestFactory().get(url))
+        paginators = KeysetPagination(ordering=('-rate', 'id')), KeysetPagination(ordering=('-rate', 'id'))
+        pages = (
+            paginators[0].paginate_queryset(Room.objects.all(), request),
+            async_to_sync(paginators[1].apaginate_queryset)(Room.objects.all(), request),
+        )
+        sync, async_ = (
+            ([room.id for room in page], paginator.get_next_link(), paginator.get_previous_link())
+            for paginator, page in zip(paginators, pages)
+        )
+        self.assertEqual(sync, async_)
+        return sync
+
+    def test_async_pages_match_sync_pages(self):
+        forward, url = [], '/api/rooms/?page_size=3'
+        while url:
+            ids, url, previous = self.page(url)
+            forward.append(ids)
+        self.assertEqual(sum(forward, []), list(Room.objects.order_by('-rate', 'id').values_list('id', flat=True)))
+
+        # Back from the last page through the previous links
+        backward = [forward[-1]]
+        while previous:
+            ids, _, previous = self.page(previous)
+            backward.append(ids)
+        self.assertEqual(backward, forward[::-1])
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(TransactionTestCase):
+    """
+    A second SQLite database stands in for a streaming replica. Nothing is
+    replicated to it, so the rooms a request sees show where it was routed.
+    """
+    # Resolved when the class is set up, after the replica is registered; the
+    # test runner, which checks and creates the databases it knows of, only
+    # sees 'default'
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        # configure_settings() fills in the defaults, and insists on a 'default' alias
+        connections.settings['replica'] = connections.configure_settings({
+            'default': {},
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(cls.directory, 'replica.sqlite3')},
+        })['replica']
+        call_command('migrate', database='replica', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        replica_health.clear()
+        self.addCleanup(replica_health.clear)
+        Room.objects.create(room_number="PRIMARY", room_type="Single", rate=80.00,
+                            room_status="Available", capacity=1)
+        Room.objects.using('replica').create(room_number="REPLICA", room_type="Single", rate=80.00,
+                                             room_status="Available", capacity=1)
+
+    def available_rooms(self):
+        check_in = date.today() + timedelta(days=7)
+        response = self.client.get('/api/rooms/available/', {
+            "check_in": check_in.isoformat(), "check_out": (check_in + timedelta(days=1)).isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return [room['room_number'] for room in response.json()]
+
+    def test_read_only_views_read_from_replica(self):
+        self.assertEqual(self.available_rooms(), ["REPLICA"])
+        self.assertNotIn('primary_pinned', self.client.cookies)
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.available_rooms(), ["PRIMARY"])
+
+    def test_reads_follow_writes_to_primary(self):
+        with route_reads(use_replica=True) as state:
+            self.assertEqual(list(Room.objects.values_list('room_number', flat=True)), ["REPLICA"])
+            with transaction.atomic():
+                self.assertEqual(list(Room.objects.values_list('room_number', flat=True)), ["PRIMARY"])
+            Room.objects.create(room_number="WRITTEN", room_type="Single", rate=80.00,
+                                room_status="Available", capacity=1)
+            self.assertTrue(state.wrote)
+            self.assertEqual(Room.objects.count(), 2)
+
+    def test_client_is_pinned_to_primary_after_writing(self):
+        room = Room.objects.get(room_number="PRIMARY")
+        guest = Guest.objects.create(first_name="Pin", last_name="Ned", email="pin@example.com",
+                                     phone_number="1234567890")
+        booking = Booking.objects.create(room=room, guest=guest, booking_status="confirmed",
+                                         check_in=date(2030, 1, 1), check_out=date(2030, 1, 2), total_price=80.00)
+
+        response = self.client.post('/api/payments/', {"booking": booking.booking_id, "amount": "80.00",
+                                                       "payment_method": "PayPal"})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.cookies['primary_pinned']['max-age'], 10)
+        self.assertEqual(self.available_rooms(), ["PRIMARY"])
+
+        # Once the pin expires the client reads from the replica again
+        del self.client.cookies['primary_pinned']
+        self.assertEqual(self.available_rooms(), ["REPLICA"])
+
+    def test_pinned_client_bypasses_responses_cached_from_replica(self):
+        caches['responses'].clear()
+        writer, reader = self.client, Client()
+        room = Room.objects.get(room_number="PRIMARY")
+        guest = Guest.objects.create(first_name="Pin", last_name="Ned", email="pin@example.com",
+                                     phone_number="1234567890")
+
+        # The write replaces the Booking token
+        response = writer.post('/api/bookings/group/', {"bookings": [{
+            "room": room.id, "guest": guest.guest_id, "check_in": "2030-01-01", "check_out": "2030-01-02",
+            "total_price": "80.00",
+        }]}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+        # Another client caches the list under the new token, read from the
+        # replica, which has not seen the booking
+        self.assertEqual(reader.get('/api/bookings/').json()['results'], [])
+        self.assertEqual(reader.get('/api/bookings/').json()['results'], [])
+
+        # The writer is pinned to the primary, and skips that entry
+        results = writer.get('/api/bookings/').json()['results']
+        self.assertEqual([booking['booking_id'] for booking in results], [response.json()['results'][0]['booking_id']])
+
+    def test_lagging_replica_is_skipped(self):
+        with override_settings(REPLICA_MAX_LAG=-1), self.assertLogs('hotel_management.routers', 'WARNING') as logs:
+            self.assertEqual(self.available_rooms(), ["PRIMARY"])
+        self.assertIn("behind", logs.output[0])
+        # The result of the check is kept for REPLICA_CHECK_INTERVAL
+        self.assertEqual(self.available_rooms(), ["PRIMARY"])
+        replica_health.clear()
+        self.assertEqual(self.available_rooms(), ["REPLICA"])
+
+    def test_unreachable_replica_is_skipped(self):
+        replica = connections['replica']
+        name = replica.settings_dict['NAME']
+        replica.close()
+        replica.settings_dict['NAME'] = os.path.join(self.directory, 'missing', 'replica.sqlite3')
+        try:
+            with self.assertLogs('hotel_management.routers', 'WARNING') as logs:
+                self.assertEqual(self.available_rooms(), ["PRIMARY"])
+            self.assertIn("unavailable", logs.output[0])
+        finally:
+            replica.close()
+            replica.settings_dict['NAME'] = name
@@ -1,15 +1,27 @@
 from django.contrib import admin
 from django.urls import path, include
 
-from bookings.views import BookingList
+from bookings.views import BookingList, BookingExport, BookingLookup, GroupBookingCreate
 from guests.views import GuestList
-from rooms.views import RoomList, RoomAvailability  # Import RoomAvailability
+from hotel_management.views import ResponseCacheStats
+from payments.views import PaymentSubmit, PaymentRequestStatus
+from reports.views import RevenueReport
+from rooms.views import RoomList, RoomAvailability, AvailableRoomList, RoomCalendar
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/rooms/', RoomList.as_view(), name='room-list'),
+    path('api/rooms/available/', AvailableRoomList.as_view(), name='room-available-list'),
+    path('api/rooms/calendar/', RoomCalendar.as_view(), name='room-calendar'),
     path('api/rooms/<int:room_id>/availability/', RoomAvailability.as_view(), name='room-availability'),
     path('api/bookings/', BookingList.as_view(), name='booking-list'),
+    path('api/bookings/export/', BookingExport.as_view(), name='booking-export'),
+    path('api/bookings/lookup/', BookingLookup.as_view(), name='booking-lookup'),
+    path('api/bookings/group/', GroupBookingCreate.as_view(), name='booking-group'),
     path('api/guests/', GuestList.as_view(), name='guest-list'),
+    path('api/payments/', PaymentSubmit.as_view(), name='payment-submit'),
+    path('api/payments/requests/<int:request_id>/', PaymentRequestStatus.as_view(), name='payment-request-status'),
+    path('api/reports/revenue/', RevenueReport.as_view(), name='revenue-report'),
+    path('api/cache/stats/', ResponseCacheStats.as_view(), name='response-cache-stats'),
     path('payments/', include('payments.urls')),
 ]
@@ -0,0 +1,50 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import stats
+
+
+class ResponseCacheStats(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        # Counters are kept per worker process
+        return Response(stats.snapshot())
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView for coroutine handlers (async def get), so a request served over
+    ASGI does not hold a worker thread while it waits on the database.
+
+    Authentication, permission and throttle checks are synchronous and may
+    query the database (session authentication loads the user), so they run
+    in a thread; the handler runs on the event loop and uses the async ORM.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            # OPTIONS and 405 responses come from APIView's synchronous handlers
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import IdempotencyKey
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('id', 'response_status', 'created_at', 'expires_at')
+    readonly_fields = ('id', 'request_hash', 'response_status', 'response_headers', 'created_at', 'expires_at')
+    exclude = ('response_body',)
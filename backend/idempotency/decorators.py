@@ -0,0 +1,111 @@
+"""
+Idempotency-Key support for views that create things.
+
+The first request carrying a given key stores a placeholder row, runs the view
+and stores its response. A repeat of the request (same method, path, user and
+key) is answered from the stored response after a single primary-key lookup,
+without running the view again. A repeat that arrives while the first request
+is still running gets a 409, and a key reused with a different body gets a
+422. Server errors are not stored, so the client can retry them.
+
+Rows are kept for IDEMPOTENCY_KEY_TTL seconds and removed by
+`manage.py sweep_idempotency_keys`.
+"""
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+# Response headers worth replaying
+STORED_HEADERS = ('Content-Type', 'Location', 'Retry-After')
+
+
+def _digest(*parts):
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+def _replay(record):
+    response = HttpResponse(bytes(record.response_body), status=record.response_status)
+    for header, value in record.response_headers.items():
+        response[header] = value
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _claim(record_id, request_hash, now):
+    """Store the placeholder for a new key. Returns the existing record instead when there is one."""
+    ttl = timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+    record = IdempotencyKey.objects.filter(pk=record_id).first()
+    if record is not None:
+        processing_timeout = timedelta(seconds=getattr(settings, 'IDEMPOTENCY_PROCESSING_TIMEOUT', 60))
+        expired = record.expires_at <= now
+        # A placeholder this old belongs to a request that died before storing its response
+        abandoned = record.response_status is None and record.created_at <= now - processing_timeout
+        if not (expired or abandoned):
+            return record
+        # Take the key over unless a concurrent request did so first
+        taken_over = IdempotencyKey.objects.filter(pk=record_id, created_at=record.created_at).update(
+            request_hash=request_hash, response_status=None, response_headers={}, response_body=b'',
+            created_at=now, expires_at=now + ttl,
+        )
+        return None if taken_over else IdempotencyKey.objects.filter(pk=record_id).first()
+
+    try:
+        IdempotencyKey.objects.create(id=record_id, request_hash=request_hash, created_at=now, expires_at=now + ttl)
+    except IntegrityError:
+        # A concurrent request with the same key got there first
+        return IdempotencyKey.objects.filter(pk=record_id).first()
+    return None
+
+
+def idempotent(view):
+    """Make POSTs to `view` safe to retry with an Idempotency-Key header."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if request.method != 'POST' or key is None:
+            return view(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return JsonResponse({"error": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters."}, status=400)
+
+        user = getattr(request, 'user', None)
+        user_id = str(user.pk) if user is not None and user.is_authenticated else ''
+        record_id = _digest(request.method, request.path, user_id, key)
+        request_hash = hashlib.sha256(request.body).hexdigest()
+        now = timezone.now()
+
+        record = _claim(record_id, request_hash, now)
+        if record is not None:
+            if record.request_hash != request_hash:
+                return JsonResponse({"error": f"{HEADER} was already used with a different request."}, status=422)
+            if record.response_status is None:
+                return JsonResponse({"error": f"A request with this {HEADER} is still being processed."}, status=409)
+            return _replay(record)
+
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+        except Exception:
+            IdempotencyKey.objects.filter(pk=record_id, created_at=now).delete()
+            raise
+
+        if response.status_code >= 500 or response.streaming:
+            IdempotencyKey.objects.filter(pk=record_id, created_at=now).delete()
+        else:
+            IdempotencyKey.objects.filter(pk=record_id, created_at=now).update(
+                response_status=response.status_code,
+                response_headers={header: response[header] for header in STORED_HEADERS if header in response},
+                response_body=response.content,
+            )
+        return response
+
+    return wrapper
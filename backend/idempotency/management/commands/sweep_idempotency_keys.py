@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from idempotency.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete expired idempotency keys in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        now = timezone.now()
+        deleted = 0
+        # Short deletes by primary key keep locks brief on a busy table
+        while ids := list(
+            IdempotencyKey.objects
+            .filter(expires_at__lte=now)
+            .values_list('pk', flat=True)[:options['batch_size']]
+        ):
+            deleted += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """The response given to a request that carried an Idempotency-Key header (see decorators.py)."""
+    # Digest of the method, path, user and key, so a replay is one primary-key lookup
+    id = models.CharField(max_length=64, primary_key=True)
+    request_hash = models.CharField(max_length=64)  # Digest of the request body
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)  # None while in progress
+    response_headers = models.JSONField(default=dict)
+    response_body = models.BinaryField(default=b'')
+    created_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Idempotency key {self.id} ({self.response_status or 'in progress'})"
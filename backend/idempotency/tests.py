@@ -0,0 +1,116 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from bookings.models import Booking
+from guests.models import Guest
+from idempotency.models import IdempotencyKey
+from payments.models import PaymentRequest
+from rooms.models import Room
+
+
+class IdempotencyKeyTest(TestCase):
+
+    def setUp(self):
+        self.room = Room.objects.create(
+            room_number="101A",
+            room_type="Single",
+            rate=80.00,
+            room_status="Available",
+            capacity=1
+        )
+        self.guest = Guest.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="1234567890"
+        )
+        self.booking = Booking.objects.create(
+            room=self.room,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 5),
+            total_price=80.00,
+        )
+
+    def pay(self, key, amount="80.00"):
+        return self.client.post('/api/payments/', {
+            "booking": self.booking.booking_id,
+            "amount": amount,
+            "payment_method": "PayPal",
+        }, content_type='application/json', headers={"Idempotency-Key": key})
+
+    def test_replay_returns_stored_response(self):
+        first = self.pay("key-1")
+        self.assertEqual(first.status_code, 202)
+
+        # One primary-key lookup, nothing created
+        with self.assertNumQueries(1):
+            replay = self.pay("key-1")
+        self.assertEqual(replay.status_code, 202)
+        self.assertEqual(replay.content, first.content)
+        self.assertEqual(replay['Content-Type'], first['Content-Type'])
+        self.assertEqual(replay['Idempotent-Replayed'], "true")
+        self.assertEqual(PaymentRequest.objects.count(), 1)
+
+        # Another key is another payment
+        self.assertEqual(self.pay("key-2").status_code, 202)
+        self.assertEqual(PaymentRequest.objects.count(), 2)
+
+    def test_key_reused_with_different_request(self):
+        self.pay("key-1")
+        self.assertEqual(self.pay("key-1", amount="90.00").status_code, 422)
+        self.assertEqual(PaymentRequest.objects.count(), 1)
+
+    def test_client_errors_are_replayed(self):
+        self.assertEqual(self.pay("key-1", amount="20000.00").status_code, 400)
+        self.assertEqual(self.pay("key-1", amount="20000.00").status_code, 400)
+        self.assertEqual(IdempotencyKey.objects.get().response_status, 400)
+
+    def test_request_in_progress(self):
+        self.pay("key-1")
+        IdempotencyKey.objects.update(response_status=None)
+        self.assertEqual(self.pay("key-1").status_code, 409)
+
+        # A placeholder left by a request that died is taken over
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self.pay("key-1").status_code, 202)
+        self.assertEqual(PaymentRequest.objects.count(), 2)
+
+    def test_group_booking_replay(self):
+        body = {"bookings": [{
+            "room": self.room.id,
+            "guest": self.guest.guest_id,
+            "check_in": "2030-06-01",
+            "check_out": "2030-06-03",
+            "total_price": "160.00",
+        }]}
+        responses = [
+            self.client.post('/api/bookings/group/', body, content_type='application/json',
+                             headers={"Idempotency-Key": "group-1"})
+            for _ in range(2)
+        ]
+        self.assertEqual([response.status_code for response in responses], [201, 201])
+        self.assertEqual(responses[0].json(), responses[1].json())
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_without_key_and_invalid_key(self):
+        self.client.post('/api/payments/', {"booking": self.booking.booking_id, "amount": "80.00",
+                                            "payment_method": "PayPal"}, content_type='application/json')
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.pay("x" * 256).status_code, 400)
+
+    def test_sweep_expired_keys(self):
+        self.pay("key-1")
+        self.pay("key-2")
+        IdempotencyKey.objects.filter(pk=IdempotencyKey.objects.first().pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1))
+
+        out = StringIO()
+        call_command('sweep_idempotency_keys', '--batch-size', '1', stdout=out)
+        self.assertIn("Deleted 1 expired", out.getvalue())
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
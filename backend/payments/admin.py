@@ -1,6 +1,20 @@
 from django.contrib import admin
-from .models import Payment
+from hotel_management.pagination import EstimatedCountPaginator
+from .models import Payment, PaymentRequest
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ('payment_id', 'booking', 'amount', 'payment_method')
+    list_select_related = ('booking__guest',)  # Booking.__str__ names the guest
+    raw_id_fields = ('booking',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(PaymentRequest)
+class PaymentRequestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'booking', 'amount', 'payment_method', 'status', 'attempts', 'updated_at')
+    list_select_related = ('booking__guest',)
+    raw_id_fields = ('booking',)
+    list_filter = ('status',)
+    readonly_fields = ('status', 'attempts', 'available_at', 'claimed_at', 'reference', 'error', 'payment')
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'payments'
+
+    def ready(self):
+        from hotel_management.cache import watch_model
+        from . import signals  # noqa: F401
+        watch_model(self.get_model('Payment'))
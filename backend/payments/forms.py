@@ -1,7 +1,10 @@
 from django import forms
 from .models import Payment
+from .widgets import BookingLookupWidget
 
 class PaymentForm(forms.ModelForm):
     class Meta:
         model = Payment
         fields = ['booking', 'amount', 'payment_method']
+        # A <select> would load and render every booking
+        widgets = {'booking': BookingLookupWidget}
@@ -0,0 +1,71 @@
+"""
+Payment gateways.
+
+The payment workers charge requests through the gateway configured by the
+PAYMENT_GATEWAY setting, a BACKEND dotted path plus OPTIONS passed to its
+constructor, like CACHES. A gateway must be safe to call from several threads.
+"""
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """A charge that did not go through. Retryable errors are tried again later."""
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class PaymentGateway:
+
+    def charge(self, payment_request):
+        """
+        Charge `payment_request` and return the provider's transaction reference,
+        or raise GatewayError. A request can be charged again after a worker
+        died mid-charge, so implementations should pass payment_request.pk to
+        the provider as an idempotency key.
+        """
+        raise NotImplementedError
+
+
+class FakeGateway(PaymentGateway):
+    """
+    Local stand-in for a payment provider. Every charge takes `latency` seconds
+    plus up to `jitter` more, and a `failure_rate` share of them fail, as
+    retryable errors unless `retryable` is False.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, retryable=True, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.retryable = retryable
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._charged = {}  # request id -> reference, so repeated charges are idempotent
+
+    def charge(self, payment_request):
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fails = self._random.random() < self.failure_rate
+        time.sleep(delay)
+
+        with self._lock:
+            if payment_request.pk in self._charged:
+                return self._charged[payment_request.pk]
+            if fails:
+                raise GatewayError("Payment declined by the fake gateway.", retryable=self.retryable)
+            reference = self._charged[payment_request.pk] = f"fake-{uuid.uuid4().hex}"
+            return reference
+
+
+def get_gateway():
+    config = getattr(settings, 'PAYMENT_GATEWAY', {})
+    backend = import_string(config.get('BACKEND', 'payments.gateways.FakeGateway'))
+    return backend(**config.get('OPTIONS', {}))
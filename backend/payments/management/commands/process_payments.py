@@ -0,0 +1,44 @@
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.gateways import get_gateway
+from payments.worker import run
+
+
+class Command(BaseCommand):
+    help = "Charge queued payment requests through the configured gateway with a pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when nothing is due.")
+        parser.add_argument('--once', action='store_true', help="Exit once nothing is due instead of polling.")
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--workers and --batch-size must be at least 1.")
+
+        gateway = get_gateway()
+        stop = threading.Event()
+        worker_options = dict(batch_size=options['batch_size'], poll_interval=options['poll_interval'],
+                              stop=stop, once=options['once'])
+        if options['workers'] == 1:
+            run(gateway, **worker_options)
+            return
+
+        # The gateway call releases the GIL while waiting on the provider, so threads suffice
+        threads = [
+            threading.Thread(target=run, args=(gateway,), kwargs=worker_options, name=f'payment-worker-{number}')
+            for number in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after the current batches...")
+            stop.set()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from payments.totals import reconcile_amount_paid
+
+
+class Command(BaseCommand):
+    help = "Recompute Booking.amount_paid and payment_status from the payments table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only count the bookings whose totals drifted.")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        count = reconcile_amount_paid(using=options['database'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"{count} bookings have drifted totals.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Reconciled {count} bookings."))
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from bookings.models import Booking
 
 
@@ -11,12 +12,22 @@ class Payment(models.Model):
     ]
 
     payment_id = models.AutoField(primary_key=True)
-    booking = models.ForeignKey(Booking, on_delete=models.CASCADE)
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="payments")
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHOD_CHOICES)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the stored payment adds to its booking's amount_paid (see signals.py)
+        if 'booking_id' in instance.__dict__ and 'amount' in instance.__dict__:
+            from .totals import stored_amount
+            instance._loaded_booking_id = instance.booking_id
+            instance._loaded_amount = stored_amount(instance.amount)
+        return instance
+
     def clean(self):
-        if not self.booking:
+        if not self.booking_id:
             raise ValidationError("Booking cannot be empty or invalid.")
 
         if self.amount == "":
@@ -33,5 +44,47 @@ class Payment(models.Model):
 
         super().clean()
 
-    def _str_(self):
-        return f"Payment {self.payment_id} - {self.booking} - {self.amount} {self.payment_method}"
\ No newline at end of file
+    def save(self, *args, **kwargs):
+        # Commit the payment together with the amount_paid update made by its post_save receiver
+        using = kwargs.get('using') or router.db_for_write(Payment, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Payment {self.payment_id} - {self.booking} - {self.amount} {self.payment_method}"
+
+
+class PaymentRequest(models.Model):
+    """A submitted payment, charged through the gateway by the payment workers (see worker.py)."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="payment_requests")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = models.CharField(max_length=20, choices=Payment.PAYMENT_METHOD_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)  # Not charged before, for retry backoff
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    reference = models.CharField(max_length=100, blank=True)  # Gateway transaction id
+    error = models.CharField(max_length=255, blank=True)
+    payment = models.OneToOneField(Payment, null=True, blank=True, on_delete=models.SET_NULL, related_name="request")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Workers look for due queued requests and stale claims
+            models.Index(fields=['status', 'available_at'], name='payment_request_queue_idx'),
+        ]
+
+    def clean(self):
+        # Same rules as a payment made directly
+        Payment(booking=self.booking, amount=self.amount, payment_method=self.payment_method).clean()
+
+    def __str__(self):
+        return f"Payment request {self.pk} - {self.booking_id} - {self.amount} {self.payment_method} ({self.status})"
@@ -0,0 +1,24 @@
+from django.core.exceptions import ValidationError
+from rest_framework import serializers
+from .models import Payment, PaymentRequest
+
+
+class PaymentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Payment
+        fields = ['payment_id', 'amount', 'payment_method']
+
+
+class PaymentRequestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PaymentRequest
+        fields = ['id', 'booking', 'amount', 'payment_method', 'status', 'attempts',
+                  'reference', 'error', 'payment', 'created_at', 'updated_at']
+        read_only_fields = ['status', 'attempts', 'reference', 'error', 'payment', 'created_at', 'updated_at']
+
+    def validate(self, data):
+        try:
+            PaymentRequest(**data).clean()
+        except ValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return data
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Payment
+from .totals import add_to_amount_paid, stored_amount
+
+
+@receiver(post_save, sender=Payment)
+def payment_saved(sender, instance, created, using, **kwargs):
+    amount = stored_amount(instance.amount)
+    loaded_booking_id = getattr(instance, '_loaded_booking_id', None)
+    if not created and loaded_booking_id is not None:
+        # Take back what the stored version of the payment contributed
+        if loaded_booking_id == instance.booking_id:
+            amount -= instance._loaded_amount
+        else:
+            add_to_amount_paid(loaded_booking_id, -instance._loaded_amount, using)
+    add_to_amount_paid(instance.booking_id, amount, using)
+    instance._loaded_booking_id, instance._loaded_amount = instance.booking_id, stored_amount(instance.amount)
+
+
+@receiver(post_delete, sender=Payment)
+def payment_deleted(sender, instance, using, **kwargs):
+    if getattr(instance, '_loaded_booking_id', None) is not None:
+        booking_id, amount = instance._loaded_booking_id, instance._loaded_amount
+    else:
+        booking_id, amount = instance.booking_id, stored_amount(instance.amount)
+    add_to_amount_paid(booking_id, -amount, using)
@@ -0,0 +1,45 @@
+// Fills the <datalist> of every booking lookup input from the lookup endpoint as the user types.
+(function () {
+  'use strict';
+
+  function attach(input) {
+    var options = document.getElementById(input.id + '_options');
+    var label = document.querySelector('.booking-lookup-label[data-for="' + input.id + '"]');
+    var timer = null;
+    var latest = 0;
+
+    input.setAttribute('list', options.id);
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var query = input.value.trim();
+        var request = ++latest;
+        if (!query) {
+          options.innerHTML = '';
+          return;
+        }
+        fetch(input.dataset.lookupUrl + '?q=' + encodeURIComponent(query))
+          .then(function (response) { return response.json(); })
+          .then(function (data) {
+            if (request !== latest) {
+              return;  // A newer query is on its way
+            }
+            options.innerHTML = '';
+            data.results.forEach(function (booking) {
+              var option = document.createElement('option');
+              option.value = booking.id;
+              option.label = booking.text;
+              options.appendChild(option);
+              if (String(booking.id) === input.value && label) {
+                label.textContent = booking.text;
+              }
+            });
+          });
+      }, 250);
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('input[data-lookup-url]').forEach(attach);
+  });
+})();
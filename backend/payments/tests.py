@@ -1,9 +1,17 @@
-from datetime import date
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
 
-from django.db import IntegrityError
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.core.exceptions import ValidationError
-from payments.models import Payment
+from payments.forms import PaymentForm
+from payments.gateways import FakeGateway, GatewayError
+from payments.models import Payment, PaymentRequest
+from payments.worker import claim, process_batch
 from bookings.models import Booking
 from guests.models import Guest
 from rooms.models import Room
@@ -171,4 +179,272 @@ class PaymentModelTest(TestCase):
         self.assertIsInstance(payment, Payment)
         self.assertEqual(payment.booking.booking_id, self.booking.booking_id)
         self.assertEqual(payment.amount, 50.005)
-        self.assertEqual(payment.payment_method, "Credit Card")
\ No newline at end of file
+        self.assertEqual(payment.payment_method, "Credit Card")
+
+class AmountPaidTest(TestCase):
+
+    def setUp(self):
+        """Set up a booking with nothing paid yet"""
+        room = Room.objects.create(
+            room_number="102A",
+            room_type="Double",
+            rate=100.00,
+            room_status="Available",
+            capacity=2
+        )
+        guest = Guest.objects.create(
+            first_name="Jane",
+            last_name="Doe",
+            email="jane.doe@example.com",
+            phone_number="1234567890"
+        )
+        self.booking = Booking.objects.create(
+            room=room,
+            guest=guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 3),
+            total_price=200.00
+        )
+        self.other_booking = Booking.objects.create(
+            room=room,
+            guest=guest,
+            booking_status="pending",
+            check_in=date(2030, 4, 1),
+            check_out=date(2030, 4, 3),
+            total_price=100.00
+        )
+
+    def assertPaid(self, booking, amount_paid, payment_status):
+        booking.refresh_from_db()
+        self.assertEqual(booking.amount_paid, Decimal(amount_paid))
+        self.assertEqual(booking.payment_status, payment_status)
+
+    def test_payments_update_amount_paid(self):
+        """Test Case 13 - Creating, changing and deleting payments keeps the paid total"""
+        self.assertPaid(self.booking, "0.00", False)
+
+        first = Payment.objects.create(booking=self.booking, amount=150.00, payment_method="PayPal")
+        self.assertPaid(self.booking, "150.00", False)
+
+        second = Payment.objects.create(booking=self.booking, amount="50.00", payment_method="Credit Card")
+        self.assertPaid(self.booking, "200.00", True)
+
+        first = Payment.objects.get(pk=first.pk)
+        first.amount = Decimal("100.00")
+        first.save()
+        self.assertPaid(self.booking, "150.00", False)
+
+        # Moving a payment to another booking moves its amount as well
+        second.booking = self.other_booking
+        second.save()
+        self.assertPaid(self.booking, "100.00", False)
+        self.assertPaid(self.other_booking, "50.00", False)
+
+        first.delete()
+        self.assertPaid(self.booking, "0.00", False)
+
+    def test_total_price_change_derives_payment_status(self):
+        """Test Case 14 - Saving a stale booking keeps amount_paid and re-derives payment_status"""
+        stale = Booking.objects.get(pk=self.booking.pk)
+        Payment.objects.create(booking=self.booking, amount=150.00, payment_method="PayPal")
+
+        stale.total_price = Decimal("150.00")
+        stale.save()
+        # Both were reloaded together by the save
+        with self.assertNumQueries(0):
+            self.assertEqual(stale.amount_paid, Decimal("150.00"))
+            self.assertTrue(stale.payment_status)
+
+        # Saves leaving the price alone, whole or not, neither write the status nor reload it
+        stale.booking_status = "pending"
+        for update_fields in (['booking_status'], None):
+            with CaptureQueriesContext(connection) as queries:
+                stale.save(update_fields=update_fields)
+            self.assertFalse([query for query in queries if query['sql'].startswith("SELECT")])
+            update = next(query['sql'] for query in queries if query['sql'].startswith("UPDATE"))
+            self.assertNotIn("payment_status", update)
+
+    def test_reconcile_amount_paid(self):
+        """Test Case 15 - The reconcile command repairs totals changed behind the signals' back"""
+        Payment.objects.create(booking=self.booking, amount=200.00, payment_method="PayPal")
+        Payment.objects.bulk_create([Payment(booking=self.other_booking, amount=100.00, payment_method="PayPal")])
+        Booking.objects.filter(pk=self.booking.pk).update(amount_paid=0, payment_status=False)
+
+        out = StringIO()
+        call_command('reconcile_amount_paid', '--dry-run', stdout=out)
+        self.assertIn("2 bookings", out.getvalue())
+
+        with self.assertNumQueries(1):
+            call_command('reconcile_amount_paid', stdout=out)
+        self.assertPaid(self.booking, "200.00", True)
+        self.assertPaid(self.other_booking, "100.00", True)
+
+        call_command('reconcile_amount_paid', '--dry-run', stdout=out)
+        self.assertIn("0 bookings", out.getvalue())
+
+
+@override_settings(PAYMENT_GATEWAY={'BACKEND': 'payments.gateways.FakeGateway'},
+                   PAYMENT_MAX_ATTEMPTS=2, PAYMENT_RETRY_BACKOFF=0)
+class PaymentQueueTest(TestCase):
+
+    def setUp(self):
+        """Set up a booking to pay for"""
+        room = Room.objects.create(
+            room_number="103A",
+            room_type="Double",
+            rate=100.00,
+            room_status="Available",
+            capacity=2
+        )
+        guest = Guest.objects.create(
+            first_name="Jane",
+            last_name="Roe",
+            email="jane.roe@example.com",
+            phone_number="1234567890"
+        )
+        self.booking = Booking.objects.create(
+            room=room,
+            guest=guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 1),
+            check_out=date(2030, 3, 3),
+            total_price=200.00
+        )
+
+    def submit(self, amount="200.00", payment_method="PayPal"):
+        return self.client.post('/api/payments/', {
+            "booking": self.booking.booking_id,
+            "amount": amount,
+            "payment_method": payment_method,
+        }, content_type='application/json')
+
+    def test_submit_queues_without_charging(self):
+        """Test Case 16 - Submitting a payment only queues it"""
+        response = self.submit()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], "queued")
+        self.assertEqual(response['Retry-After'], "1")
+        self.assertFalse(Payment.objects.exists())
+
+        status = self.client.get(response.json()['status_url'])
+        self.assertEqual(status.json()['id'], response.json()['id'])
+        self.assertEqual(self.client.get('/api/payments/requests/999999/').status_code, 404)
+
+    def test_submit_rejects_invalid_payment(self):
+        """Test Case 17 - Payment rules are checked before queueing"""
+        self.assertEqual(self.submit(amount="20000.00").status_code, 400)
+        self.assertEqual(self.submit(payment_method="Bitcoin").status_code, 400)
+        self.assertFalse(PaymentRequest.objects.exists())
+
+    def test_worker_records_successful_charge(self):
+        """Test Case 18 - A processed request creates the payment"""
+        request_id = self.submit().json()['id']
+        self.assertEqual(process_batch(FakeGateway()), 1)
+
+        status = self.client.get(f'/api/payments/requests/{request_id}/').json()
+        self.assertEqual(status['status'], "succeeded")
+        self.assertTrue(status['reference'].startswith("fake-"))
+        self.assertEqual(Payment.objects.get(pk=status['payment']).amount, Decimal("200.00"))
+        self.booking.refresh_from_db()
+        self.assertTrue(self.booking.payment_status)
+        # Nothing left to claim
+        self.assertEqual(process_batch(FakeGateway()), 0)
+
+    def test_worker_retries_then_fails(self):
+        """Test Case 19 - Retryable failures are queued again until the attempts run out"""
+        request_id = self.submit().json()['id']
+        gateway = FakeGateway(failure_rate=1.0)
+
+        process_batch(gateway)
+        payment_request = PaymentRequest.objects.get(pk=request_id)
+        self.assertEqual((payment_request.status, payment_request.attempts), ("queued", 1))
+        self.assertEqual(payment_request.error, "Payment declined by the fake gateway.")
+
+        process_batch(gateway)
+        payment_request.refresh_from_db()
+        self.assertEqual((payment_request.status, payment_request.attempts), ("failed", 2))
+        self.assertFalse(Payment.objects.exists())
+
+    def test_declined_charge_is_not_retried(self):
+        """Test Case 20 - Non-retryable failures fail at once"""
+        request_id = self.submit().json()['id']
+        process_batch(FakeGateway(failure_rate=1.0, retryable=False))
+        self.assertEqual(PaymentRequest.objects.get(pk=request_id).status, "failed")
+
+    def test_claims(self):
+        """Test Case 21 - Claimed requests are skipped until their claim goes stale"""
+        self.submit()
+        self.submit()
+        self.assertEqual(len(claim(batch_size=1)), 1)
+        self.assertEqual(len(claim(batch_size=5)), 1)
+        self.assertEqual(claim(), [])
+
+        PaymentRequest.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        reclaimed = claim()
+        self.assertEqual(len(reclaimed), 2)
+        self.assertTrue(all(payment_request.attempts == 2 for payment_request in reclaimed))
+
+    def test_process_payments_command(self):
+        """Test Case 22 - The command drains the queue"""
+        self.submit()
+        self.submit(amount="50.00")
+        call_command('process_payments', '--workers', '1', '--once', stdout=StringIO())
+        self.assertEqual(PaymentRequest.objects.filter(status="succeeded").count(), 2)
+        self.assertEqual(Payment.objects.count(), 2)
+
+    def test_fake_gateway_is_idempotent(self):
+        """Test Case 23 - Charging a request twice returns the same reference"""
+        payment_request = PaymentRequest.objects.create(booking=self.booking, amount=50, payment_method="PayPal")
+        gateway = FakeGateway()
+        self.assertEqual(gateway.charge(payment_request), gateway.charge(payment_request))
+        with self.assertRaises(GatewayError):
+            FakeGateway(failure_rate=1.0).charge(payment_request)
+
+
+class PaymentFormTest(TestCase):
+
+    def setUp(self):
+        room = Room.objects.create(
+            room_number="104A",
+            room_type="Double",
+            rate=100.00,
+            room_status="Available",
+            capacity=2
+        )
+        guest = Guest.objects.create(
+            first_name="Jane",
+            last_name="Poe",
+            email="jane.poe@example.com",
+            phone_number="1234567890"
+        )
+        self.bookings = [
+            Booking.objects.create(
+                room=room,
+                guest=guest,
+                booking_status="confirmed",
+                check_in=date(2030, 3, 1 + 2 * number),
+                check_out=date(2030, 3, 2 + 2 * number),
+                total_price=100.00
+            )
+            for number in range(5)
+        ]
+
+    def test_form_renders_no_booking_choices(self):
+        """Test Case 24 - The booking field is a lookup input, not a <select> of every booking"""
+        with self.assertNumQueries(0):
+            html = str(PaymentForm()['booking'])
+        self.assertIn('data-lookup-url="/api/bookings/lookup/"', html)
+        self.assertNotIn("<option", html)
+
+        # A bound value shows its label with one query
+        booking = self.bookings[0]
+        with self.assertNumQueries(1):
+            html = str(PaymentForm(initial={"booking": booking.booking_id})['booking'])
+        self.assertIn(f"#{booking.booking_id} Jane Poe", html)
+
+    def test_form_validates_booking_id(self):
+        """Test Case 25 - The submitted id is checked against the bookings table"""
+        form = PaymentForm({"booking": self.bookings[0].booking_id, "amount": "100.00", "payment_method": "PayPal"})
+        self.assertTrue(form.is_valid())
+        self.assertFalse(PaymentForm({"booking": 999999, "amount": "100.00", "payment_method": "PayPal"}).is_valid())
@@ -0,0 +1,65 @@
+"""
+Paid totals of bookings.
+
+Booking.amount_paid holds the sum of the booking's payments so balances can be
+read from the bookings table alone. Payment writes change it by the difference
+with a relative F() update in their own transaction (see signals.py), so
+concurrent payments for one booking cannot lose an update. payment_status is
+derived in the same statement; SQL evaluates every SET expression against the
+row as it was before the update.
+
+reconcile_amount_paid recomputes every total from the payments table and is
+meant for writes that bypass model signals (QuerySet.update(), bulk_create()
+and raw SQL).
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThanOrEqual
+
+from bookings.models import Booking
+from hotel_management.cache import invalidate
+from .models import Payment
+
+CENT = Decimal('0.01')
+
+
+def stored_amount(value):
+    """A payment amount as the database stores it."""
+    return Payment._meta.get_field('amount').to_python(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def add_to_amount_paid(booking_id, delta, using='default'):
+    if booking_id is None or not delta:
+        return
+    Booking.objects.using(using).filter(pk=booking_id).update(
+        amount_paid=F('amount_paid') + delta,
+        payment_status=Case(When(amount_paid__gte=F('total_price') - delta, then=Value(True)), default=Value(False)),
+    )
+    # update() sends no model signals
+    invalidate(Booking)
+
+
+def reconcile_amount_paid(using='default', dry_run=False):
+    """Recompute the totals that drifted from the payments with one statement. Returns how many did."""
+    paid = Coalesce(
+        Subquery(
+            Payment.objects
+            .filter(booking=OuterRef('pk'))
+            .values('booking')
+            .annotate(total=Sum('amount'))
+            .values('total')
+        ),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    settled = Case(When(GreaterThanOrEqual(paid, F('total_price')), then=Value(True)), default=Value(False))
+    drifted = Booking.objects.using(using).filter(~Q(amount_paid=paid) | ~Q(payment_status=settled))
+
+    if dry_run:
+        return drifted.count()
+    fixed = drifted.update(amount_paid=paid, payment_status=settled)
+    if fixed:
+        invalidate(Booking)
+    return fixed
@@ -1,14 +1,27 @@
-from django.shortcuts import render, redirect
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from idempotency.decorators import idempotent
 from .forms import PaymentForm
-from .models import Payment
+from .models import PaymentRequest
+from .serializers import PaymentRequestSerializer
+
+# Seconds clients are asked to wait before polling a pending request again
+POLL_INTERVAL = 1
 
 
+@idempotent
 def process_payment(request):
     if request.method == 'POST':
         form = PaymentForm(request.POST)
         if form.is_valid():
-            form.save()
-            return redirect('payment_success')  # Redirect to a success page
+            # Queue the payment for the payment workers instead of charging it here
+            payment_request = PaymentRequest.objects.create(**form.cleaned_data)
+            return redirect(f"{reverse('payment_success')}?request={payment_request.pk}")
     else:
         form = PaymentForm()
 
@@ -16,4 +29,30 @@ def process_payment(request):
 
 
 def payment_success(request):
-    return render(request, 'payments/payment_success.html')
+    payment_request = None
+    if request.GET.get('request', '').isdigit():
+        payment_request = PaymentRequest.objects.filter(pk=request.GET['request']).first()
+    return render(request, 'payments/payment_success.html', {'payment_request': payment_request})
+
+
+def _status_response(payment_request, status=200):
+    data = PaymentRequestSerializer(payment_request).data
+    data['status_url'] = reverse('payment-request-status', args=[payment_request.pk])
+    response = Response(data, status=status)
+    if payment_request.status in ('queued', 'processing'):
+        response['Retry-After'] = str(POLL_INTERVAL)
+    return response
+
+
+@method_decorator(idempotent, name='dispatch')
+class PaymentSubmit(APIView):
+    def post(self, request):
+        serializer = PaymentRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse({"error": serializer.errors}, status=400)
+        return _status_response(serializer.save(), status=202)
+
+
+class PaymentRequestStatus(APIView):
+    def get(self, request, request_id):
+        return _status_response(get_object_or_404(PaymentRequest, pk=request_id))
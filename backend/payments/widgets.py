@@ -0,0 +1,32 @@
+from django import forms
+from django.urls import reverse_lazy
+
+from bookings.lookup import LOOKUP_FIELDS, booking_label
+from bookings.models import Booking
+
+
+class BookingLookupWidget(forms.TextInput):
+    """
+    Booking id input completed from /api/bookings/lookup/.
+
+    Unlike a <select>, it renders no choices, so the form costs at most one
+    query (the label of the current value) whatever the size of the table.
+    """
+    template_name = 'payments/widgets/booking_lookup.html'
+    lookup_url = reverse_lazy('booking-lookup')
+
+    class Media:
+        js = ['payments/booking_lookup.js']
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs'].update({
+            'data-lookup-url': str(self.lookup_url),
+            'autocomplete': 'off',
+            'placeholder': "Booking id, guest name or email, or check-in date",
+        })
+        row = None
+        if value not in (None, '') and str(value).isdigit():
+            row = Booking.objects.filter(pk=value).values(*LOOKUP_FIELDS).first()
+        context['widget']['label'] = booking_label(row) if row else ''
+        return context
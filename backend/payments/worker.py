@@ -0,0 +1,108 @@
+"""
+Payment workers.
+
+Submitting a payment only stores a PaymentRequest row; the gateway is called
+here, outside the request/response cycle, so a slow provider does not hold up
+web workers. A worker claims a batch of due requests with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of worker threads or
+processes never claim the same request twice, then charges them without
+holding a lock and records the outcome.
+
+Claims older than PAYMENT_CLAIM_TIMEOUT seconds are taken to belong to a
+worker that died and are claimed again. Retryable gateway errors are retried
+after PAYMENT_RETRY_BACKOFF seconds, doubled for every attempt, until
+PAYMENT_MAX_ATTEMPTS is reached.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .gateways import GatewayError
+from .models import Payment, PaymentRequest
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def claim(batch_size=10):
+    """Mark up to `batch_size` due requests as processing and return them."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting('PAYMENT_CLAIM_TIMEOUT', 300))
+    with transaction.atomic():
+        ids = list(
+            PaymentRequest.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(status='queued', available_at__lte=now) | Q(status='processing', claimed_at__lt=stale))
+            .order_by('available_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        PaymentRequest.objects.filter(id__in=ids).update(status='processing', claimed_at=now,
+                                                          attempts=F('attempts') + 1)
+    return list(PaymentRequest.objects.filter(id__in=ids).order_by('available_at', 'id'))
+
+
+def _finish(payment_request, **changes):
+    """Record an outcome unless the claim expired and another worker took the request over."""
+    return PaymentRequest.objects.filter(
+        pk=payment_request.pk,
+        status='processing',
+        claimed_at=payment_request.claimed_at,
+    ).update(updated_at=timezone.now(), **changes)
+
+
+def process(payment_request, gateway):
+    try:
+        reference = gateway.charge(payment_request)
+    except Exception as e:
+        retryable = e.retryable if isinstance(e, GatewayError) else True
+        if not isinstance(e, GatewayError):
+            logger.exception("Payment gateway failed on request %s.", payment_request.pk)
+        if retryable and payment_request.attempts < _setting('PAYMENT_MAX_ATTEMPTS', 5):
+            delay = _setting('PAYMENT_RETRY_BACKOFF', 2) * 2 ** (payment_request.attempts - 1)
+            _finish(payment_request, status='queued', error=str(e)[:255],
+                    available_at=timezone.now() + timedelta(seconds=delay))
+        else:
+            _finish(payment_request, status='failed', error=str(e)[:255])
+        return
+
+    with transaction.atomic():
+        payment = Payment.objects.create(
+            booking_id=payment_request.booking_id,
+            amount=payment_request.amount,
+            payment_method=payment_request.payment_method,
+        )
+        if not _finish(payment_request, status='succeeded', reference=reference, error='', payment=payment):
+            # Another worker owns the request now; it will record the same charge
+            transaction.set_rollback(True)
+
+
+def process_batch(gateway, batch_size=10):
+    """Claim and charge one batch. Returns how many requests were claimed."""
+    requests = claim(batch_size)
+    for payment_request in requests:
+        process(payment_request, gateway)
+    return len(requests)
+
+
+def run(gateway, batch_size=10, poll_interval=1.0, stop=None, once=False):
+    """Process batches until `stop` is set, or with `once` until the queue has nothing due."""
+    stop = stop or threading.Event()
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            if not process_batch(gateway, batch_size):
+                if once:
+                    return
+                stop.wait(poll_interval)
+    finally:
+        close_old_connections()
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import DailyNights, DailyRevenue
+
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(admin.ModelAdmin):
+    list_display = ('day', 'room_type', 'payment_method', 'revenue', 'payments')
+    list_filter = ('room_type', 'payment_method')
+    date_hierarchy = 'day'
+
+
+@admin.register(DailyNights)
+class DailyNightsAdmin(admin.ModelAdmin):
+    list_display = ('day', 'room_type', 'nights_sold')
+    list_filter = ('room_type',)
+    date_hierarchy = 'day'
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.rollups import mark_all, refresh
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily revenue and nights rollups of the days changed since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rebuild every day, not only the changed ones.")
+        parser.add_argument('--batch-size', type=int, default=366, help="Days recomputed per transaction.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        started = time.perf_counter()
+        if options['full']:
+            mark_all()
+        refreshed = refresh(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {refreshed} days in {time.perf_counter() - started:.2f}s."
+        ))
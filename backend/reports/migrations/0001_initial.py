@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtyDay',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyNights',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('room_type', models.CharField(max_length=50)),
+                ('nights_sold', models.PositiveIntegerField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'room_type'), name='daily_nights_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('room_type', models.CharField(max_length=50)),
+                ('payment_method', models.CharField(max_length=20)),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('payments', models.PositiveIntegerField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'room_type', 'payment_method'), name='daily_revenue_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class DailyRevenue(models.Model):
+    """Payments for stays checking in on `day`, per room type and payment method."""
+    day = models.DateField()
+    room_type = models.CharField(max_length=50)
+    payment_method = models.CharField(max_length=20)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    payments = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'room_type', 'payment_method'], name='daily_revenue_unique'),
+        ]
+
+
+class DailyNights(models.Model):
+    """Confirmed room nights sold for the night starting on `day`, per room type."""
+    day = models.DateField()
+    room_type = models.CharField(max_length=50)
+    nights_sold = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'room_type'], name='daily_nights_unique'),
+        ]
+
+
+class DirtyDay(models.Model):
+    """A day whose rollup rows are out of date (see rollups.py)."""
+    day = models.DateField(primary_key=True)
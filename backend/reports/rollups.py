@@ -0,0 +1,118 @@
+"""
+Daily revenue and occupancy rollups.
+
+DailyRevenue sums payments by the check-in day of their booking, room type and
+payment method; DailyNights counts the confirmed nights sold per day and room
+type. Reports read these small tables instead of joining payments, bookings
+and rooms.
+
+Writes to payments, bookings and rooms only record the days they affect as
+DirtyDay rows (see signals.py). refresh() then recomputes the rollups of those
+days alone, a batch at a time, so the work follows the amount of change rather
+than the size of the history. Writes that bypass model signals must call
+mark_days() or mark_stays() themselves.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+
+from bookings.models import Booking
+from payments.models import Payment
+from rooms.models import Room
+from .models import DailyNights, DailyRevenue, DirtyDay
+
+
+def _days(check_in, check_out):
+    return (check_in + timedelta(days=offset) for offset in range((check_out - check_in).days))
+
+
+def mark_days(days):
+    DirtyDay.objects.bulk_create([DirtyDay(day=day) for day in set(days) if day is not None],
+                                 ignore_conflicts=True)
+
+
+def mark_stays(stays):
+    """Mark every night of the given (check_in, check_out) stays."""
+    mark_days(day for check_in, check_out in stays if check_in and check_out
+              for day in _days(check_in, max(check_out, check_in + timedelta(days=1))))
+
+
+def mark_all():
+    """Mark every day with a booking, to rebuild the rollups from scratch."""
+    span = Booking.objects.aggregate(first=Min('check_in'), last=Max('check_out'))
+    if span['first'] is not None:
+        mark_stays([(span['first'], span['last'])])
+
+
+def _nights(days):
+    """Confirmed nights sold per (day, room type) for the sorted `days`."""
+    first, end = days[0], days[-1] + timedelta(days=1)
+    stays = list(
+        Booking.objects
+        .filter(booking_status='confirmed', check_in__lt=end, check_out__gt=first)
+        .values_list('room__room_type', 'check_in', 'check_out')
+    )
+    span = (end - first).days
+    room_types = [room_type for room_type, _ in Room.ROOM_TYPE_CHOICES]
+    # +1 on the first night and -1 after the last one, summed along the days
+    diff = np.zeros((len(room_types), span + 1), dtype=np.int64)
+    for room_type, check_in, check_out in stays:
+        row = room_types.index(room_type)
+        diff[row, max((check_in - first).days, 0)] += 1
+        diff[row, min((check_out - first).days, span)] -= 1
+    sold = np.cumsum(diff[:, :span], axis=1)
+
+    columns = [(day - first).days for day in days]
+    return [
+        DailyNights(day=day, room_type=room_type, nights_sold=int(sold[row, column]))
+        for row, room_type in enumerate(room_types)
+        for day, column in zip(days, columns)
+        if sold[row, column]
+    ]
+
+
+def _revenue(days):
+    rows = (
+        Payment.objects
+        .filter(booking__check_in__in=days)
+        .values('booking__check_in', 'booking__room__room_type', 'payment_method')
+        .annotate(revenue=Sum('amount'), payments=Count('pk'))
+        .order_by()
+    )
+    return [
+        DailyRevenue(day=row['booking__check_in'], room_type=row['booking__room__room_type'],
+                     payment_method=row['payment_method'], revenue=row['revenue'], payments=row['payments'])
+        for row in rows
+    ]
+
+
+def refresh_batch(batch_size=366):
+    """Recompute the rollups of up to `batch_size` dirty days. Returns how many were refreshed."""
+    with transaction.atomic():
+        days = list(
+            DirtyDay.objects
+            .select_for_update(skip_locked=True)
+            .order_by('day')
+            .values_list('day', flat=True)[:batch_size]
+        )
+        if not days:
+            return 0
+        # Days marked again from here on stay dirty for the next batch
+        DirtyDay.objects.filter(day__in=days).delete()
+
+        revenue, nights = _revenue(days), _nights(days)
+        DailyRevenue.objects.filter(day__in=days).delete()
+        DailyRevenue.objects.bulk_create(revenue)
+        DailyNights.objects.filter(day__in=days).delete()
+        DailyNights.objects.bulk_create(nights)
+    return len(days)
+
+
+def refresh(batch_size=366):
+    """Refresh every dirty day. Returns how many were refreshed."""
+    refreshed = 0
+    while count := refresh_batch(batch_size):
+        refreshed += count
+    return refreshed
@@ -0,0 +1,38 @@
+from django.db.models import Max, Min
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from payments.models import Payment
+from rooms.models import Room
+from .rollups import mark_days, mark_stays
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def booking_changed(sender, instance, created=False, **kwargs):
+    stay = (instance.room_id, instance.booking_status, instance.check_in, instance.check_out)
+    loaded = getattr(instance, '_loaded_stay', None)
+    if loaded != stay or created or kwargs['signal'] is post_delete:
+        # Both the nights the booking covered and those it covers now
+        mark_stays([loaded[2:] if loaded else (None, None), stay[2:]])
+    instance._loaded_stay = stay
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def payment_changed(sender, instance, **kwargs):
+    booking_ids = {instance.booking_id, getattr(instance, '_loaded_booking_id', None)} - {None}
+    mark_days(Booking.objects.filter(pk__in=booking_ids).values_list('check_in', flat=True))
+
+
+@receiver(post_save, sender=Room)
+def room_changed(sender, instance, created, **kwargs):
+    # Not written when left out of update_fields, and never loaded
+    if 'room_type' not in instance.__dict__:
+        return
+    loaded = getattr(instance, '_loaded_room_type', None)
+    if not created and loaded != instance.room_type:
+        # The room's nights move to another type
+        span = Booking.objects.filter(room_id=instance.pk).aggregate(first=Min('check_in'), last=Max('check_out'))
+        if span['first'] is not None:
+            mark_stays([(span['first'], span['last'])])
+    instance._loaded_room_type = instance.room_type
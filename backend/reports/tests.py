@@ -0,0 +1,154 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from bookings.models import Booking
+from guests.models import Guest
+from payments.models import Payment
+from reports.models import DailyNights, DailyRevenue, DirtyDay
+from reports.rollups import refresh
+from rooms.models import Room
+
+
+class RevenueRollupTest(TestCase):
+
+    def setUp(self):
+        self.single = Room.objects.create(
+            room_number="101A",
+            room_type="Single",
+            rate=80.00,
+            room_status="Available",
+            capacity=1
+        )
+        self.suite = Room.objects.create(
+            room_number="301A",
+            room_type="Suite",
+            rate=200.00,
+            room_status="Available",
+            capacity=3
+        )
+        guest = Guest.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="1234567890"
+        )
+        self.march = Booking.objects.create(
+            room=self.single,
+            guest=guest,
+            booking_status="confirmed",
+            check_in=date(2030, 3, 30),
+            check_out=date(2030, 4, 2),
+            total_price=240.00,
+        )
+        self.april = Booking.objects.create(
+            room=self.suite,
+            guest=guest,
+            booking_status="confirmed",
+            check_in=date(2030, 4, 1),
+            check_out=date(2030, 4, 3),
+            total_price=400.00,
+        )
+        Payment.objects.create(booking=self.march, amount=100.00, payment_method="PayPal")
+        Payment.objects.create(booking=self.march, amount=140.00, payment_method="Credit Card")
+        Payment.objects.create(booking=self.april, amount=400.00, payment_method="PayPal")
+        refresh()
+        self.client.force_login(User.objects.create_user("finance", is_staff=True))
+
+    def report(self, **params):
+        return self.client.get('/api/reports/revenue/', {"start": "2030-01-01", "end": "2030-12-31", **params})
+
+    def test_rollups(self):
+        self.assertFalse(DirtyDay.objects.exists())
+        self.assertEqual(
+            list(DailyRevenue.objects.order_by('day', 'payment_method')
+                 .values_list('day', 'room_type', 'payment_method', 'revenue', 'payments')),
+            [
+                (date(2030, 3, 30), "Single", "Credit Card", Decimal("140.00"), 1),
+                (date(2030, 3, 30), "Single", "PayPal", Decimal("100.00"), 1),
+                (date(2030, 4, 1), "Suite", "PayPal", Decimal("400.00"), 1),
+            ],
+        )
+        self.assertEqual(
+            list(DailyNights.objects.order_by('day', 'room_type').values_list('day', 'room_type', 'nights_sold')),
+            [
+                (date(2030, 3, 30), "Single", 1),
+                (date(2030, 3, 31), "Single", 1),
+                (date(2030, 4, 1), "Single", 1),
+                (date(2030, 4, 1), "Suite", 1),
+                (date(2030, 4, 2), "Suite", 1),
+            ],
+        )
+
+    def test_only_changed_days_are_refreshed(self):
+        Payment.objects.create(booking=self.april, amount=50.00, payment_method="PayPal")
+        self.assertEqual(list(DirtyDay.objects.values_list('day', flat=True)), [date(2030, 4, 1)])
+        self.assertEqual(refresh(), 1)
+        self.assertEqual(DailyRevenue.objects.get(day=date(2030, 4, 1)).revenue, Decimal("450.00"))
+
+        # Cancelling a booking refreshes every night it covered
+        self.march.booking_status = "cancelled"
+        self.march.save()
+        self.assertEqual(refresh(), 3)
+        self.assertEqual(DailyNights.objects.filter(room_type="Single").count(), 0)
+
+        # Saving without changing the stay marks nothing
+        self.april.save()
+        self.assertFalse(DirtyDay.objects.exists())
+
+    def test_room_type_change(self):
+        # Saving a room without changing its type compares in memory
+        suite = Room.objects.get(pk=self.suite.pk)
+        suite.rate = 320.00
+        with self.assertNumQueries(1):
+            suite.save()
+        self.assertEqual(refresh(), 0)
+
+        suite.room_type = "Double"
+        suite.save()
+        self.assertEqual(refresh(), 2)
+        self.assertEqual(DailyRevenue.objects.get(day=date(2030, 4, 1)).room_type, "Double")
+
+    def test_report_by_month(self):
+        with self.assertNumQueries(5):  # Session, user, revenue, nights, pending days
+            response = self.report()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['revenue'], [
+            {"period": "2030-03-01", "room_type": "Single", "payment_method": "Credit Card",
+             "revenue": "140.00", "payments": 1},
+            {"period": "2030-03-01", "room_type": "Single", "payment_method": "PayPal",
+             "revenue": "100.00", "payments": 1},
+            {"period": "2030-04-01", "room_type": "Suite", "payment_method": "PayPal",
+             "revenue": "400.00", "payments": 1},
+        ])
+        self.assertEqual(data['nights'], [
+            {"period": "2030-03-01", "room_type": "Single", "nights_sold": 2},
+            {"period": "2030-04-01", "room_type": "Single", "nights_sold": 1},
+            {"period": "2030-04-01", "room_type": "Suite", "nights_sold": 2},
+        ])
+        self.assertEqual(data['pending_days'], 0)
+
+    def test_report_filters_and_errors(self):
+        data = self.report(group_by="year", payment_method="PayPal").json()
+        self.assertEqual([(row['room_type'], row['revenue']) for row in data['revenue']],
+                         [("Single", "100.00"), ("Suite", "400.00")])
+        self.assertEqual(self.report(group_by="week").status_code, 400)
+        self.assertEqual(self.report(start="2031-01-01").status_code, 400)
+        self.assertEqual(self.report(end="soon").status_code, 400)
+
+        self.client.logout()
+        self.assertEqual(self.report().status_code, 403)
+
+    def test_full_rebuild_command(self):
+        DailyRevenue.objects.all().delete()
+        DailyNights.objects.all().delete()
+        out = StringIO()
+        call_command('refresh_revenue_rollups', '--full', '--batch-size', '2', stdout=out)
+        self.assertIn("Refreshed 4 days", out.getvalue())
+        self.assertEqual(DailyRevenue.objects.count(), 3)
+        self.assertEqual(DailyNights.objects.count(), 5)
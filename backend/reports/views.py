@@ -0,0 +1,75 @@
+from datetime import date
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncYear
+from django.http import JsonResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import DailyNights, DailyRevenue, DirtyDay
+
+PERIODS = {
+    'day': lambda: F('day'),
+    'month': lambda: TruncMonth('day'),
+    'year': lambda: TruncYear('day'),
+}
+
+
+class RevenueReport(APIView):
+    read_from_replica = True
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        today = date.today()
+        try:
+            start = date.fromisoformat(request.GET.get('start') or today.replace(month=1, day=1).isoformat())
+            end = date.fromisoformat(request.GET.get('end') or today.replace(month=12, day=31).isoformat())
+        except ValueError:
+            return JsonResponse({"error": "start and end must be dates (YYYY-MM-DD)."}, status=400)
+        if start > end:
+            return JsonResponse({"error": "start must not be after end."}, status=400)
+
+        group_by = request.GET.get('group_by', 'month')
+        if group_by not in PERIODS:
+            return JsonResponse({"error": f"group_by must be one of {', '.join(PERIODS)}."}, status=400)
+
+        revenue = DailyRevenue.objects.filter(day__range=(start, end))
+        nights = DailyNights.objects.filter(day__range=(start, end))
+        if request.GET.get('room_type'):
+            revenue = revenue.filter(room_type=request.GET['room_type'])
+            nights = nights.filter(room_type=request.GET['room_type'])
+        if request.GET.get('payment_method'):
+            revenue = revenue.filter(payment_method=request.GET['payment_method'])
+
+        revenue = (
+            revenue
+            .annotate(period=PERIODS[group_by]())
+            .values('period', 'room_type', 'payment_method')
+            .annotate(total=Sum('revenue'), count=Sum('payments'))
+            .order_by('period', 'room_type', 'payment_method')
+        )
+        nights = (
+            nights
+            .annotate(period=PERIODS[group_by]())
+            .values('period', 'room_type')
+            .annotate(sold=Sum('nights_sold'))
+            .order_by('period', 'room_type')
+        )
+
+        return Response({
+            "start": start,
+            "end": end,
+            "group_by": group_by,
+            "revenue": [
+                {"period": row['period'], "room_type": row['room_type'], "payment_method": row['payment_method'],
+                 "revenue": f"{row['total']:.2f}", "payments": row['count']}
+                for row in revenue
+            ],
+            "nights": [
+                {"period": row['period'], "room_type": row['room_type'], "nights_sold": row['sold']}
+                for row in nights
+            ],
+            # Days in the range with changes not yet rolled up by refresh_revenue_rollups
+            "pending_days": DirtyDay.objects.filter(day__range=(start, end)).count(),
+        })
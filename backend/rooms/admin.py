@@ -1,14 +1,26 @@
-from django.contrib import admin
+import io
+from datetime import timedelta
+
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
 from django.urls import path
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.utils.html import format_html
-from .forms import RoomAvailabilityForm  # Import the form
+from hotel_management.pagination import EstimatedCountPaginator
+from .calendar import OccupancyCalendar
+from .forms import RoomAvailabilityForm, RoomGridForm, RoomImportForm  # Import the forms
+from .importers import import_rooms
 from .models import Room
 
 
 class RoomAdmin(admin.ModelAdmin):
     list_display = ('room_number', 'room_type', 'check_availability_link')  # Display the link
+    change_list_template = 'admin/rooms/room/change_list.html'  # Adds the "Import rooms" button
+    list_filter = ('room_type', 'room_status')
+    search_fields = ('^room_number',)  # Also used by the booking autocomplete
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def check_availability_link(self, obj):
         url = reverse('admin:check_room_availability', args=[obj.id])  # Create a dynamic URL
@@ -20,6 +32,8 @@ class RoomAdmin(admin.ModelAdmin):
         urls = super().get_urls()
         custom_urls = [
             path('room/check_availability/<int:room_id>/', self.admin_site.admin_view(self.check_availability), name='check_room_availability'),
+            path('room/availability/', self.admin_site.admin_view(self.availability_grid), name='room_availability_grid'),
+            path('room/import/', self.admin_site.admin_view(self.import_rooms), name='import_rooms'),
         ]
         return custom_urls + urls
 
@@ -45,6 +59,58 @@ class RoomAdmin(admin.ModelAdmin):
 
         return render(request, 'admin/check_availability.html', {'form': form, 'room': room})
 
+    def availability_grid(self, request):
+        """
+        Nightly availability of every room matching the filters. The rooms and
+        their confirmed bookings over the range are read with one query each
+        and rasterised by OccupancyCalendar, whatever the number of rooms.
+        """
+        form = RoomGridForm(request.GET or None)
+        context = {'form': form, 'opts': self.model._meta}
+        if form.is_valid():
+            check_in = form.cleaned_data['check_in']
+            days = (form.cleaned_data['check_out'] - check_in).days
+            calendar = OccupancyCalendar(check_in, days, rooms=form.filter_rooms(Room.objects.all()))
+            rows = [
+                {
+                    'room': room,
+                    'nights': row.tolist(),
+                    'maintenance': room['room_status'] == 'Under Maintenance',
+                    'free': bool(row.all()),
+                }
+                for room, row in zip(calendar.rooms, calendar.free)
+            ]
+            context.update({
+                'nights': [check_in + timedelta(days=night) for night in range(days)],
+                'rows': rows,
+                'free_rooms': sum(row['free'] for row in rows),
+            })
+        return render(request, 'admin/availability_grid.html', context)
+
+
+    def import_rooms(self, request):
+        if request.method == 'POST':
+            form = RoomImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                # Decode the upload as a stream instead of reading it into memory
+                csv_file = io.TextIOWrapper(form.cleaned_data['csv_file'].file, encoding='utf-8-sig', newline='')
+                try:
+                    result = import_rooms(csv_file, created_by=request.user.get_username())
+                except ValidationError as e:
+                    form.add_error('csv_file', e)
+                else:
+                    self.message_user(request, f"Imported {result.created} rooms.", messages.SUCCESS)
+                    if result.errors:
+                        self.message_user(request, f"Rejected {len(result.errors)} rows.", messages.WARNING)
+                    return render(request, 'admin/import_rooms.html', {
+                        'form': RoomImportForm(),
+                        'errors': result.errors,
+                        'opts': self.model._meta,
+                    })
+        else:
+            form = RoomImportForm()
+
+        return render(request, 'admin/import_rooms.html', {'form': form, 'opts': self.model._meta})
 
 
 admin.site.register(Room, RoomAdmin)
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class RoomsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rooms'
+
+    def ready(self):
+        from django.conf import settings
+        from hotel_management.cache import watch_model
+        from . import checks, signals  # noqa: F401
+        from .occupancy import occupancy_index
+        watch_model(self.get_model('Room'))
+        if getattr(settings, 'OCCUPANCY_INDEX_BUILD_ON_START', False):
+            occupancy_index.build_on_start()
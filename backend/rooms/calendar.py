@@ -0,0 +1,88 @@
+"""
+Room x night availability calendar.
+
+Confirmed bookings overlapping the requested window are loaded in one query and
+rasterised into a boolean occupancy matrix (rooms x nights). Each booking adds
++1 at its first night and -1 after its last night of a difference matrix, so a
+cumulative sum along the nights axis fills every stay without a Python loop.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+from bookings.models import Booking
+from .models import Room
+
+
+class OccupancyCalendar:
+
+    def __init__(self, start, days, rooms=None):
+        self.start = start
+        self.days = days
+        self.end = start + timedelta(days=days)
+
+        rooms = Room.objects.all() if rooms is None else rooms
+        self.rooms = list(rooms.order_by('id').values('id', 'room_number', 'room_type', 'room_status'))
+        self.room_ids = np.fromiter((room['id'] for room in self.rooms), dtype=np.int64, count=len(self.rooms))
+        self.occupied = self._rasterise(rooms)
+
+    def _rasterise(self, rooms):
+        bookings = list(
+            Booking.objects
+            .filter(
+                room__in=rooms,
+                booking_status='confirmed',
+                check_in__lt=self.end,
+                check_out__gt=self.start,
+            )
+            .values_list('room_id', 'check_in', 'check_out')
+        )
+
+        diff = np.zeros((len(self.rooms), self.days + 1), dtype=np.int32)
+        if bookings:
+            room_ids, check_ins, check_outs = zip(*bookings)
+            first_day = self.start.toordinal()
+            room_ids = np.array(room_ids, dtype=np.int64)
+            rows = np.minimum(np.searchsorted(self.room_ids, room_ids), max(len(self.rooms) - 1, 0))
+            # Skip bookings of rooms created after the room list was read
+            known = self.room_ids[rows] == room_ids if len(self.rooms) else np.zeros(len(room_ids), dtype=bool)
+            rows = rows[known]
+            starts = np.clip(np.array([d.toordinal() for d in check_ins])[known] - first_day, 0, self.days)
+            ends = np.clip(np.array([d.toordinal() for d in check_outs])[known] - first_day, 0, self.days)
+            # add.at accumulates repeated (row, column) pairs, unlike fancy-index assignment
+            np.add.at(diff, (rows, starts), 1)
+            np.add.at(diff, (rows, ends), -1)
+
+        occupied = np.cumsum(diff[:, :self.days], axis=1) > 0
+
+        # Rooms under maintenance cannot be sold on any night
+        maintenance = np.array([room['room_status'] == 'Under Maintenance' for room in self.rooms], dtype=bool)
+        occupied[maintenance] = True
+        return occupied
+
+    @property
+    def free(self):
+        return ~self.occupied
+
+    def bitstrings(self):
+        """One string per room, '1' for a free night and '0' for an occupied one."""
+        encoded = (self.free.astype(np.uint8) + ord('0')).tobytes().decode('ascii')
+        return [encoded[i * self.days:(i + 1) * self.days] for i in range(len(self.rooms))]
+
+    def run_lengths(self):
+        """One list of [free, nights] runs per room."""
+        runs = []
+        for row in self.free:
+            changes = np.flatnonzero(row[1:] != row[:-1]) + 1
+            bounds = np.concatenate(([0], changes, [self.days]))
+            runs.append([[bool(row[begin]), int(end - begin)] for begin, end in zip(bounds[:-1], bounds[1:])])
+        return runs
+
+    def free_counts_by_type(self):
+        """Free rooms per night for each room type."""
+        room_types = np.array([room['room_type'] for room in self.rooms])
+        free = self.free
+        return {
+            room_type: free[room_types == room_type].sum(axis=0).tolist()
+            for room_type, _ in Room.ROOM_TYPE_CHOICES
+        }
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_occupancy_cache(app_configs, **kwargs):
+    """The occupancy index is only invalidated across processes through a shared cache."""
+    alias = getattr(settings, 'OCCUPANCY_CACHE_ALIAS', 'default')
+    if not isinstance(caches[alias], LocMemCache):
+        return []
+    return [Warning(
+        f"The occupancy cache '{alias}' is local to each process.",
+        hint=(
+            "With several worker processes, a booking made through one is not seen by the "
+            "occupancy index of the others. Point OCCUPANCY_CACHE_ALIAS at a shared, "
+            "non-evicting cache, such as django.core.cache.backends.redis.RedisCache."
+        ),
+        id='rooms.W001',
+    )]
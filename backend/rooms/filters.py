@@ -0,0 +1,64 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+
+from .models import Room
+
+# Orderings accepted by ?ordering=. Each ends in the primary key, which makes
+# the keyset cursor (the whole ordering tuple) unique on non-unique columns.
+ROOM_ORDERINGS = {
+    'id': ('id',),
+    'room_number': ('room_number', 'id'),
+    'rate': ('rate', 'id'),
+    'capacity': ('capacity', 'id'),
+}
+
+
+def filter_rooms(queryset, params):
+    """
+    Apply the catalog query parameters to a Room queryset.
+
+    Returns the filtered queryset and the ordering to paginate it by. Equality
+    filters on room_status and room_type lead the composite index on
+    (room_status, room_type, rate), so a rate range under them is an index scan.
+    """
+    room_status = params.get('room_status')
+    if room_status:
+        if room_status not in dict(Room.ROOM_STATUS_CHOICES):
+            raise ValidationError(f"Invalid room status: {room_status}")
+        queryset = queryset.filter(room_status=room_status)
+
+    room_type = params.get('room_type')
+    if room_type:
+        if room_type not in dict(Room.ROOM_TYPE_CHOICES):
+            raise ValidationError(f"Invalid room type: {room_type}")
+        queryset = queryset.filter(room_type=room_type)
+
+    for param, lookup in (('rate_min', 'rate__gte'), ('rate_max', 'rate__lte')):
+        value = params.get(param)
+        if value:
+            try:
+                rate = Decimal(value)
+            except InvalidOperation:
+                raise ValidationError(f"{param} must be a number.")
+            # NaN and Infinity parse, but are no rate to compare with
+            if not rate.is_finite():
+                raise ValidationError(f"{param} must be a number.")
+            queryset = queryset.filter(**{lookup: rate})
+
+    min_capacity = params.get('min_capacity')
+    if min_capacity:
+        try:
+            queryset = queryset.filter(capacity__gte=int(min_capacity))
+        except ValueError:
+            raise ValidationError("min_capacity must be an integer.")
+
+    ordering = params.get('ordering', 'id')
+    descending = ordering.startswith('-')
+    if ordering.lstrip('-') not in ROOM_ORDERINGS:
+        raise ValidationError(f"Invalid ordering: {ordering}. Choose from {', '.join(ROOM_ORDERINGS)}.")
+    ordering = ROOM_ORDERINGS[ordering.lstrip('-')]
+    if descending:
+        ordering = tuple(f'-{field}' for field in ordering)
+
+    return queryset, ordering
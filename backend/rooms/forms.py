@@ -3,6 +3,8 @@
 from django import forms
 from datetime import datetime
 
+from .models import Room
+
 
 class RoomAvailabilityForm(forms.Form):
     check_in = forms.DateTimeField(
@@ -18,3 +20,52 @@ class RoomAvailabilityForm(forms.Form):
         check_in = self.cleaned_data['check_in']
         check_out = self.cleaned_data['check_out']
         return room.is_room_available(check_in, check_out)
+
+
+class RoomImportForm(forms.Form):
+    csv_file = forms.FileField(
+        label="Rooms CSV",
+        help_text="Columns: room_number, room_type, rate, room_status, capacity"
+    )
+
+
+class RoomGridForm(forms.Form):
+    room_type = forms.ChoiceField(
+        choices=[('', 'All types')] + Room.ROOM_TYPE_CHOICES,
+        required=False,
+        label="Room Type"
+    )
+    room_number = forms.CharField(
+        max_length=50,
+        required=False,
+        label="Room Number Starts With",
+        help_text="E.g. 3 for the third floor"
+    )
+    check_in = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        label="Check-In Date"
+    )
+    check_out = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        label="Check-Out Date"
+    )
+
+    max_nights = 62
+
+    def clean(self):
+        cleaned_data = super().clean()
+        check_in = cleaned_data.get('check_in')
+        check_out = cleaned_data.get('check_out')
+        if check_in and check_out:
+            if check_in >= check_out:
+                raise forms.ValidationError("Check-in date must be before check-out date.")
+            if (check_out - check_in).days > self.max_nights:
+                raise forms.ValidationError(f"The grid shows at most {self.max_nights} nights.")
+        return cleaned_data
+
+    def filter_rooms(self, rooms):
+        if self.cleaned_data['room_type']:
+            rooms = rooms.filter(room_type=self.cleaned_data['room_type'])
+        if self.cleaned_data['room_number']:
+            rooms = rooms.filter(room_number__startswith=self.cleaned_data['room_number'])
+        return rooms
@@ -0,0 +1,111 @@
+"""
+Bulk room import.
+
+Rows are read from a CSV stream in batches. Every row is validated in-process
+with the rules of Room.clean, room numbers are checked for duplicates within
+the file and against the database with one IN query per batch, and the valid
+rows of a batch are inserted with a single bulk_create. The whole import runs
+in one transaction.
+"""
+import csv
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from hotel_management.cache import invalidate
+from .models import Room
+from .occupancy import occupancy_index
+
+ROOM_IMPORT_COLUMNS = ['room_number', 'room_type', 'rate', 'room_status', 'capacity']
+
+
+@dataclass
+class RoomImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)  # (line number, room number, message)
+
+
+def build_room(row):
+    """Turn a CSV row into an unsaved Room, raising ValidationError like Room.full_clean would."""
+    room_number = (row.get('room_number') or '').strip()
+    if not room_number:
+        raise ValidationError("Room number cannot be empty.")
+    if len(room_number) > Room._meta.get_field('room_number').max_length:
+        raise ValidationError("Room number is too long.")
+
+    try:
+        rate = Decimal((row.get('rate') or '').strip())
+    except InvalidOperation:
+        raise ValidationError("Price must be a decimal.")
+    # NaN, sNaN and Infinity parse, but cannot be compared with the rate limits
+    if not rate.is_finite():
+        raise ValidationError("Price must be a decimal.")
+
+    try:
+        capacity = int((row.get('capacity') or '').strip())
+    except ValueError:
+        raise ValidationError("Room capacity must be an integer.")
+
+    room = Room(
+        room_number=room_number,
+        room_type=(row.get('room_type') or '').strip(),
+        rate=rate,
+        room_status=(row.get('room_status') or '').strip(),
+        capacity=capacity,
+        created_by=row.get('created_by') or None,
+    )
+    room.clean()
+    return room
+
+
+def import_rooms(csv_file, batch_size=1000, created_by=None):
+    """Import rooms from a text-mode CSV file with a header row."""
+    reader = csv.DictReader(csv_file)
+    missing = set(ROOM_IMPORT_COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise ValidationError(f"Missing columns: {', '.join(sorted(missing))}.")
+
+    result = RoomImportResult()
+    seen = set()
+    # Line 1 is the header
+    numbered_rows = enumerate(reader, start=2)
+
+    with transaction.atomic():
+        while batch := list(islice(numbered_rows, batch_size)):
+            rooms = []
+            for line, row in batch:
+                try:
+                    room = build_room(row)
+                except ValidationError as e:
+                    result.errors.append((line, row.get('room_number'), e.messages[0]))
+                    continue
+                if room.room_number in seen:
+                    result.errors.append((line, room.room_number, "Duplicate room number in file."))
+                    continue
+                seen.add(room.room_number)
+                room.created_by = room.created_by or created_by
+                rooms.append((line, room))
+
+            existing = set(
+                Room.objects
+                .filter(room_number__in=[room.room_number for _, room in rooms])
+                .values_list('room_number', flat=True)
+            )
+            new_rooms = []
+            for line, room in rooms:
+                if room.room_number in existing:
+                    result.errors.append((line, room.room_number, "Room number already exists."))
+                else:
+                    new_rooms.append(room)
+
+            created = Room.objects.bulk_create(new_rooms, batch_size=batch_size)
+            result.created += len(created)
+            # bulk_create sends no model signals
+            occupancy_index.invalidate([room.pk for room in created])
+
+    if result.created:
+        invalidate(Room)
+    return result
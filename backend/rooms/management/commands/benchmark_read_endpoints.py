@@ -0,0 +1,205 @@
+import asyncio
+import io
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from urllib.parse import urlencode
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from guests.models import Guest
+from hotel_management import cache as response_cache
+from rooms.models import Room
+from rooms.occupancy import occupancy_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of the room list, room availability and guest list "
+        "endpoints under concurrent requests, served by the WSGI handler from a "
+        "thread pool and by the ASGI handler from one event loop. Requests go "
+        "straight to the handlers, so server and network overhead are left out. "
+        "Benchmark rooms and guests are committed for the run and deleted after it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Requests sent to each handler.")
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help="Requests in flight: WSGI threads, or pending ASGI coroutines.")
+        parser.add_argument('--rooms', type=int, default=200)
+        parser.add_argument('--guests', type=int, default=200)
+        parser.add_argument('--host', default='localhost', help="Host header, must be in ALLOWED_HOSTS.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if min(options['requests'], options['concurrency'], options['rooms'], options['guests']) < 1:
+            raise CommandError("--requests, --concurrency, --rooms and --guests must be at least 1.")
+
+        room_ids = self._create_rooms(options['rooms'])
+        try:
+            self._create_guests(options['guests'])
+            occupancy_index.rebuild()
+            paths = self._paths(room_ids, options['requests'], random.Random(options['seed']))
+            # The handlers behind hotel_management/wsgi.py and asgi.py
+            results = [
+                ("WSGI", self._run_wsgi(get_wsgi_application(), paths, options['host'], options['concurrency'])),
+                ("ASGI", asyncio.run(self._run_asgi(
+                    get_asgi_application(), paths, options['host'], options['concurrency']))),
+            ]
+        finally:
+            Room.objects.filter(room_number__startswith="BENCH-").delete()
+            Guest.objects.filter(email__endswith="@bench.invalid").delete()
+
+        for label, (seconds, latencies, failures) in results:
+            quantiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else latencies * 19
+            self.stdout.write(
+                f"{label}  {len(latencies) / seconds:8.1f} req/s  "
+                f"p50 {quantiles[9] * 1000:7.1f} ms  p95 {quantiles[18] * 1000:7.1f} ms  "
+                f"{failures} failed"
+            )
+        (_, (wsgi_seconds, _, _)), (_, (asgi_seconds, _, _)) = results
+        self.stdout.write(self.style.SUCCESS(
+            f"ASGI/WSGI throughput: {wsgi_seconds / asgi_seconds:.2f}x at concurrency {options['concurrency']}"))
+
+    def _create_rooms(self, count):
+        room_types = [room_type for room_type, _ in Room.ROOM_TYPE_CHOICES]
+        rooms = Room.objects.bulk_create([
+            Room(
+                room_number=f"BENCH-{number}",
+                room_type=room_types[number % len(room_types)],
+                rate=Decimal("50.00") + number % 450,
+                room_status="Available",
+                capacity=number % 5 + 1,
+            )
+            for number in range(count)
+        ], batch_size=5000)
+        # bulk_create sends no signals
+        response_cache.invalidate(Room)
+        return list(Room.objects.filter(room_number__startswith="BENCH-").values_list('id', flat=True))
+
+    def _create_guests(self, count):
+        Guest.objects.bulk_create([
+            Guest(
+                first_name="Bench",
+                last_name=f"Guest{number}",
+                email=f"guest{number}@bench.invalid",
+                phone_number="1234567890",
+            )
+            for number in range(count)
+        ], batch_size=5000)
+        response_cache.invalidate(Guest)
+
+    @staticmethod
+    def _paths(room_ids, count, rng):
+        """
+        An even mix of the three endpoints. Every URL is unique, so each request
+        misses the response cache and reaches the database.
+        """
+        check_in = date.today() + timedelta(days=7)
+        stay = {"check_in": check_in.isoformat(), "check_out": (check_in + timedelta(days=2)).isoformat()}
+        paths = []
+        for number in range(count):
+            kind = number % 3
+            if kind == 0:
+                path, query = '/api/rooms/', {"page_size": 50, "min_capacity": rng.randint(1, 5)}
+            elif kind == 1:
+                path, query = f'/api/rooms/{rng.choice(room_ids)}/availability/', dict(stay)
+            else:
+                path, query = '/api/guests/', {"page_size": 50}
+            query['bench'] = number
+            paths.append((path, urlencode(query)))
+        return paths
+
+    @staticmethod
+    def _run_wsgi(wsgi_application, paths, host, concurrency):
+        def request(path_and_query):
+            path, query = path_and_query
+            status = []
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': query,
+                'SERVER_NAME': host,
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': host,
+                'wsgi.version': (1, 0),
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': io.BytesIO(),
+                'wsgi.errors': sys.stderr,
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            started = time.perf_counter()
+            body = wsgi_application(environ, lambda response_status, headers: status.append(response_status))
+            try:
+                b''.join(body)
+            finally:
+                body.close()
+            return time.perf_counter() - started, status[0].startswith('200')
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(request, paths))
+        return Command._summary(time.perf_counter() - started, results)
+
+    @staticmethod
+    async def _run_asgi(asgi_application, paths, host, concurrency):
+        slots = asyncio.Semaphore(concurrency)
+
+        async def request(path_and_query):
+            path, query = path_and_query
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': query.encode(),
+                'root_path': '',
+                'headers': [(b'host', host.encode())],
+                'server': (host, 80),
+                'client': ('127.0.0.1', 0),
+            }
+            received = False
+            finished = asyncio.Event()
+            status = []
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # The handler listens for a disconnect while the view runs
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+                elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                    finished.set()
+
+            async with slots:
+                started = time.perf_counter()
+                await asgi_application(scope, receive, send)
+                return time.perf_counter() - started, status == [200]
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request(path) for path in paths))
+        return Command._summary(time.perf_counter() - started, results)
+
+    @staticmethod
+    def _summary(seconds, results):
+        latencies = sorted(latency for latency, _ in results)
+        failures = sum(not ok for _, ok in results)
+        return seconds, latencies, failures
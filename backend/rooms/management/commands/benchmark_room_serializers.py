@@ -0,0 +1,62 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rooms.models import Room
+from rooms.serializers import RoomSerializer, room_values, serialize_room_values
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-row cost of RoomSerializer against the values() fast path. "
+        "Benchmark rooms are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=3, help="Best of this many runs is reported.")
+
+    def handle(self, *args, **options):
+        count, repeat = options['rooms'], options['repeat']
+        if count < 1 or repeat < 1:
+            raise CommandError("--rooms and --repeat must be at least 1.")
+
+        with transaction.atomic():
+            room_types = [room_type for room_type, _ in Room.ROOM_TYPE_CHOICES]
+            Room.objects.bulk_create(
+                [
+                    Room(
+                        room_number=f"BENCH-{number}",
+                        room_type=room_types[number % len(room_types)],
+                        rate=Decimal("50.00") + number % 450,
+                        room_status="Available",
+                        capacity=number % 5 + 1,
+                    )
+                    for number in range(count)
+                ],
+                batch_size=5000,
+            )
+            rooms = Room.objects.filter(room_number__startswith="BENCH-").order_by('id')
+
+            model_serializer = self._best_of(repeat, lambda: RoomSerializer(rooms.all(), many=True).data)
+            values_path = self._best_of(repeat, lambda: serialize_room_values(room_values(rooms.all())))
+
+            if RoomSerializer(rooms[:100], many=True).data != serialize_room_values(room_values(rooms[:100])):
+                raise CommandError("The values() path no longer matches RoomSerializer's output.")
+
+            transaction.set_rollback(True)
+
+        for label, seconds in (("ModelSerializer", model_serializer), ("values() fast path", values_path)):
+            self.stdout.write(f"{label:<20} {seconds:8.3f}s total  {seconds / count * 1e6:8.2f} us/row")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {model_serializer / values_path:.1f}x for {count} rooms"))
+
+    @staticmethod
+    def _best_of(repeat, run):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,27 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from rooms.importers import ROOM_IMPORT_COLUMNS, import_rooms
+
+
+class Command(BaseCommand):
+    help = f"Import rooms from a CSV file with the columns: {', '.join(ROOM_IMPORT_COLUMNS)}."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--created-by', help="Recorded as created_by on rows that do not set it.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        try:
+            with open(options['csv_path'], newline='', encoding='utf-8-sig') as csv_file:
+                result = import_rooms(csv_file, batch_size=options['batch_size'], created_by=options['created_by'])
+        except (OSError, ValidationError) as e:
+            raise CommandError(str(e.messages[0] if isinstance(e, ValidationError) else e))
+
+        for line, room_number, message in result.errors:
+            self.stderr.write(f"Line {line} ({room_number or 'no room number'}): {message}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {result.created} rooms, rejected {len(result.errors)} rows."))
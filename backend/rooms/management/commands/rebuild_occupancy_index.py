@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from rooms.occupancy import occupancy_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the room occupancy index in this process and report its size and build time. "
+        "Web processes build their own index in the background when they start and once a day, "
+        "so this is for sizing OCCUPANCY_INDEX_HORIZON_DAYS and OCCUPANCY_INDEX_MAX_BOOKINGS."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        occupancy_index.rebuild()
+        elapsed = time.perf_counter() - started
+
+        stats = occupancy_index.stats()
+        if not stats['enabled']:
+            self.stdout.write(self.style.WARNING(
+                "Occupancy index disabled: the booking window exceeds OCCUPANCY_INDEX_MAX_BOOKINGS."
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {stats['bookings']} bookings across {stats['rooms']} rooms "
+            f"({stats['floor']} to {stats['ceiling']}) in {elapsed:.2f}s, {stats['bytes'] / 1024:.0f} KiB."
+        ))
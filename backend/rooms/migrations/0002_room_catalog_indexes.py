@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['room_status', 'room_type', 'rate'], name='room_status_type_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['capacity'], name='room_capacity_idx'),
+        ),
+    ]
@@ -1,11 +1,29 @@
 import decimal
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
 from django.db import models
 
 
+class RoomQuerySet(models.QuerySet):
+
+    def available_between(self, check_in, check_out):
+        """
+        Rooms that can be booked for the stay [check_in, check_out).
+
+        Excludes rooms under maintenance and rooms with an overlapping confirmed
+        booking, using a single NOT EXISTS anti-join against Booking.
+        """
+        from bookings.models import Booking
+
+        overlapping_bookings = Booking.objects.filter(
+            room=models.OuterRef('pk'),
+            check_in__lt=check_out,  # Booking starts before check-out date
+            check_out__gt=check_in,  # Booking ends after check-in date
+            booking_status='confirmed'
+        )
+        return self.exclude(room_status='Under Maintenance').filter(~models.Exists(overlapping_bookings))
 
 
 class Room(models.Model):
@@ -32,7 +50,24 @@ class Room(models.Model):
     last_changed_by = models.CharField(max_length=100, blank=True, null=True)
     last_changed_date = models.DateTimeField(auto_now=True)  # Automatically set when updated
 
+    objects = RoomQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Catalog filters: equality on status and type, range on rate
+            models.Index(fields=['room_status', 'room_type', 'rate'], name='room_status_type_rate_idx'),
+            models.Index(fields=['capacity'], name='room_capacity_idx'),
+        ]
+
     # Room Model related validation error raised messages
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored type, so reports refresh the room's nights when it changes (see reports/signals.py)
+        if 'room_type' in instance.__dict__:
+            instance._loaded_room_type = instance.room_type
+        return instance
+
     def clean(self):
         if self.room_type not in dict(self.ROOM_TYPE_CHOICES):
             raise ValidationError("Invalid room type. Must be Single, Double, or Suite.")
@@ -56,35 +91,29 @@ class Room(models.Model):
             raise ValidationError("Room capacity cannot exceed 5.")
         super().clean()
 
-
-
-
-
-
-
-
-    """
-    @property
     def is_room_available(self, check_in, check_out):
-
+        """
         Checks if the room is available for the given check-in and check-out dates.
 
-        :param check_in: The check-in date (datetime object)
-        :param check_out: The check-out date (datetime object)
+        :param check_in: The check-in date (date or datetime object)
+        :param check_out: The check-out date (date or datetime object)
         :return: Boolean availability and error message if any
+        """
+        from .occupancy import occupancy_index
 
         try:
-            from bookings.models import Booking
-            # Ensure room exists (the room object is already available in `self`).
-            if not self:
-                raise ValidationError("Error: Room ID is required.")
-
-            if not isinstance(check_in, datetime) or not isinstance(check_out, datetime):
+            if not isinstance(check_in, date) or not isinstance(check_out, date):
                 raise ValidationError("Error: Check-in and check-out must be valid datetime objects.")
 
+            # Bookings are stored per night, so only the date part is relevant
+            if isinstance(check_in, datetime):
+                check_in = check_in.date()
+            if isinstance(check_out, datetime):
+                check_out = check_out.date()
+
             # Ensure the dates are not in the past
-            current_date = datetime.now()
-            if check_in < current_date or check_out < current_date:
+            today = date.today()
+            if check_in < today or check_out < today:
                 raise ValidationError("Error: Check-in and check-out dates must not be in the past.")
 
             # Ensure check_in date is before check_out date
@@ -103,22 +132,16 @@ class Room(models.Model):
                 raise ValidationError("Error: Room is currently under maintenance and cannot be booked.")
 
             # Check for overlapping bookings
-            overlapping_bookings = Booking.objects.filter(
-                room=self,
-                check_in__lt=check_out,  # Booking starts before check-out date
-                check_out__gt=check_in  # Booking ends after check-in date
-            )
-
-            if overlapping_bookings.exists():
+            if not occupancy_index.is_free(self.pk, check_in, check_out):
                 raise ValidationError("Error: Room is unavailable for the selected dates.")
 
             # If no issues, return True indicating the room is available
-            return True
+            return True, None
 
         except ValidationError as e:
             # Return False and the error message
-            return False, str(e)
-    """
+            return False, e.messages[0]
+
     def __str__(self):
 
         return f"Room {self.room_number} - {self.room_type}"
@@ -0,0 +1,275 @@
+"""
+In-process index of confirmed room occupancy.
+
+Each room keeps two sorted arrays holding the check-in and check-out days (as
+date ordinals) of its confirmed bookings. The number of bookings overlapping a
+stay [check_in, check_out) is then
+
+    bisect_left(starts, check_out) - bisect_right(ends, check_in)
+
+which answers an availability check in O(log n) without touching the database.
+
+Writes to Booking and Room bump a per-room generation token in the cache named
+by OCCUPANCY_CACHE_ALIAS (see rooms/signals.py). Before answering for a room
+the index compares the token it loaded the room with against the cached one
+and reloads that room from the database when they differ. A missing token is
+never taken as current, as it may have been evicted after a write: a fresh one
+is stored and the room reloaded. Only a cache shared by every worker process
+keeps their indexes in step; with a per-process cache a process never sees
+the writes made by the others (see rooms/checks.py).
+
+With OCCUPANCY_INDEX_BUILD_ON_START the index is built in a background thread
+once the apps are ready, and again in each process forked from there (see
+build_on_start()); it is rebuilt on the first question of each day. Until the
+first build is done the database answers; during a daily rebuild the previous
+index keeps answering, since its tokens are still checked.
+
+Memory is bounded by only indexing bookings inside a window of
+OCCUPANCY_INDEX_HORIZON_DAYS from the day the index was built and by
+OCCUPANCY_INDEX_MAX_BOOKINGS; questions outside the window, or an index that
+would exceed the limit, fall back to a database query.
+
+The index always loads from the primary database: a room reloaded from a
+lagging replica would be stored under its new token and stay stale.
+"""
+import logging
+import os
+import threading
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'occupancy:room:{}'
+
+
+def _generation_key(room_id):
+    return GENERATION_KEY.format(room_id)
+
+
+def _tokens():
+    return caches[getattr(settings, 'OCCUPANCY_CACHE_ALIAS', 'default')]
+
+
+class OccupancyIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # One build at a time
+        self._building = False  # A background build has been started
+        self._starts = {}  # room id -> array of check-in ordinals, sorted
+        self._ends = {}  # room id -> array of check-out ordinals, sorted
+        self._generations = {}  # room id -> cache token the room was loaded with
+        self._floor = None  # first day covered, None until built
+        self._ceiling = None  # first day no longer covered
+        self._built_on = None
+        self._size = 0
+        self._enabled = True
+        self._fork_hook = False
+
+    @property
+    def horizon_days(self):
+        return getattr(settings, 'OCCUPANCY_INDEX_HORIZON_DAYS', 730)
+
+    @property
+    def max_bookings(self):
+        return getattr(settings, 'OCCUPANCY_INDEX_MAX_BOOKINGS', 2_000_000)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self._enabled,
+                'rooms': len(self._starts),
+                'bookings': self._size,
+                'floor': self._floor,
+                'ceiling': self._ceiling,
+                'bytes': sum(a.buffer_info()[1] * a.itemsize for a in self._starts.values()) * 2,
+            }
+
+    def rebuild(self):
+        """Load every confirmed booking inside the coverage window from the database."""
+        with self._build_lock:
+            self._build()
+
+    def build_in_background(self):
+        """Start building the index in a thread, unless a build is already under way."""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._build_if_outdated, name='occupancy-index-build', daemon=True).start()
+
+    def build_on_start(self):
+        """
+        Build in the background now, and again in every process forked from this
+        one: threads do not survive a fork, and preloading servers fork their
+        workers after the apps are ready.
+        """
+        if not self._fork_hook:
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_hook = True
+        self.build_in_background()
+
+    def _after_fork(self):
+        # The parent's build thread is gone, and may have held either lock
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._building = False
+        self.build_in_background()
+
+    def _build_if_outdated(self):
+        try:
+            with self._build_lock:
+                if self._built_on != date.today():
+                    self._build()
+        except Exception:
+            logger.exception("Occupancy index build failed.")
+        finally:
+            with self._lock:
+                self._building = False
+            connections.close_all()
+
+    def _build(self):
+        from bookings.models import Booking
+        from rooms.models import Room
+
+        floor = date.today()
+        ceiling = floor + timedelta(days=self.horizon_days)
+
+        # Read the tokens before the bookings so a write racing with the rebuild
+        # leaves its room marked stale rather than silently missing.
+        room_ids = list(Room.objects.using(DEFAULT_DB_ALIAS).values_list('id', flat=True))
+        tokens = _tokens().get_many([_generation_key(room_id) for room_id in room_ids])
+
+        bookings = (
+            Booking.objects.using(DEFAULT_DB_ALIAS)
+            .filter(booking_status='confirmed', check_out__gt=floor, check_in__lt=ceiling)
+            .order_by('room_id', 'check_in')
+            .values_list('room_id', 'check_in', 'check_out')
+        )
+
+        starts, ends, size = {}, {}, 0
+        for room_id, check_in, check_out in bookings.iterator(chunk_size=10000):
+            size += 1
+            if size > self.max_bookings:
+                logger.warning("Occupancy index disabled: more than %s bookings in the window.", self.max_bookings)
+                with self._lock:
+                    self._reset(enabled=False)
+                return
+            starts.setdefault(room_id, array('l')).append(check_in.toordinal())
+            insort(ends.setdefault(room_id, array('l')), check_out.toordinal())
+
+        with self._lock:
+            self._starts = starts
+            self._ends = ends
+            self._generations = {
+                room_id: tokens.get(_generation_key(room_id)) for room_id in room_ids
+            }
+            self._floor, self._ceiling = floor, ceiling
+            self._built_on = floor
+            self._size = size
+            self._enabled = True
+
+    def clear(self):
+        with self._lock:
+            self._reset(enabled=True)
+
+    def _reset(self, enabled):
+        self._starts, self._ends, self._generations = {}, {}, {}
+        self._floor = self._ceiling = self._built_on = None
+        self._size = 0
+        self._enabled = enabled
+
+    def invalidate(self, room_ids):
+        """
+        Mark rooms as changed. Called for every write to their bookings, again
+        once the writing transaction commits so readers that reloaded the room
+        in between pick up the committed state.
+        """
+        room_ids = [room_id for room_id in set(room_ids) if room_id is not None]
+        if not room_ids:
+            return
+        self._bump(room_ids)
+        transaction.on_commit(lambda: self._bump(room_ids))
+
+    def _bump(self, room_ids):
+        _tokens().set_many({_generation_key(room_id): uuid.uuid4().hex for room_id in room_ids}, timeout=None)
+
+    def is_free(self, room_id, check_in, check_out):
+        """True when no confirmed booking of the room overlaps [check_in, check_out)."""
+        built_on = self._built_on
+        if built_on is not None and built_on != date.today():
+            # The previous day's index keeps answering while it is rebuilt
+            self.build_in_background()
+
+        with self._lock:
+            floor, ceiling = self._floor, self._ceiling
+        start, end = check_in.toordinal(), check_out.toordinal()
+        if floor is None or start < floor.toordinal() or end > ceiling.toordinal():
+            return not self._overlaps_in_database(room_id, check_in, check_out)
+
+        tokens = _tokens()
+        key = _generation_key(room_id)
+        token = tokens.get(key)
+        if token is None:
+            tokens.add(key, uuid.uuid4().hex, timeout=None)
+            token = tokens.get(key)
+        with self._lock:
+            current = token is not None and self._generations.get(room_id) == token
+            if current:
+                return self._count_overlaps(room_id, start, end) == 0
+
+        # A transaction may hold uncommitted writes for this room; answer it
+        # from the database without publishing its view to other requests.
+        if connection.in_atomic_block:
+            return not self._overlaps_in_database(room_id, check_in, check_out)
+
+        self._reload_room(room_id, token)
+        with self._lock:
+            return self._count_overlaps(room_id, start, end) == 0
+
+    def _count_overlaps(self, room_id, start, end):
+        starts = self._starts.get(room_id)
+        if not starts:
+            return 0
+        return bisect_left(starts, end) - bisect_right(self._ends[room_id], start)
+
+    def _reload_room(self, room_id, token):
+        from bookings.models import Booking
+
+        rows = list(
+            Booking.objects.using(DEFAULT_DB_ALIAS)
+            .filter(room_id=room_id, booking_status='confirmed',
+                    check_out__gt=self._floor, check_in__lt=self._ceiling)
+            .values_list('check_in', 'check_out')
+        )
+        starts = array('l', sorted(check_in.toordinal() for check_in, _ in rows))
+        ends = array('l', sorted(check_out.toordinal() for _, check_out in rows))
+
+        with self._lock:
+            self._size += len(rows) - len(self._starts.get(room_id, ()))
+            if rows:
+                self._starts[room_id], self._ends[room_id] = starts, ends
+            else:
+                self._starts.pop(room_id, None)
+                self._ends.pop(room_id, None)
+            self._generations[room_id] = token
+
+    def _overlaps_in_database(self, room_id, check_in, check_out):
+        from bookings.models import Booking
+
+        return Booking.objects.filter(
+            room_id=room_id,
+            check_in__lt=check_out,
+            check_out__gt=check_in,
+            booking_status='confirmed'
+        ).exists()
+
+
+occupancy_index = OccupancyIndex()
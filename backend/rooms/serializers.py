@@ -1,8 +1,68 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
 from rest_framework import serializers
+
+from hotel_management.serializers import SparseFieldsetMixin
 from .models import Room
 
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    type = serializers.CharField(source='room_type')
+    price = serializers.DecimalField(source='rate', max_digits=10, decimal_places=2)
+    status = serializers.CharField(source='room_status')
+
     class Meta:
         model = Room
         fields = ['id', 'room_number', 'type', 'price', 'status', 'capacity']
+
+
+def _price(value):
+    # Same representation as RoomSerializer's DecimalField
+    return f"{value.quantize(Decimal('0.01')):f}"
+
+
+# API name -> (model field, conversion applied to the stored value)
+ROOM_VALUE_FIELDS = {
+    'id': ('id', None),
+    'room_number': ('room_number', None),
+    'type': ('room_type', None),
+    'price': ('rate', _price),
+    'status': ('room_status', None),
+    'capacity': ('capacity', None),
+}
+
+
+def _room_value_fields(fields):
+    if fields is None:
+        return list(ROOM_VALUE_FIELDS)
+    unknown = set(fields) - set(ROOM_VALUE_FIELDS)
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+    return [name for name in ROOM_VALUE_FIELDS if name in fields]
+
+
+def room_values(queryset, fields=None, extra=()):
+    """
+    Restrict a Room queryset to the columns behind the given API fields (all by
+    default), as dicts. `extra` model fields are selected too, e.g. the
+    ordering a keyset paginator reads its cursor from.
+    """
+    columns = [ROOM_VALUE_FIELDS[name][0] for name in _room_value_fields(fields)]
+    columns += [column for column in extra if column not in columns]
+    return queryset.values(*columns)
+
+
+def serialize_room_values(rows, fields=None):
+    """
+    Produce RoomSerializer's output from room_values() rows.
+
+    Read-only fast path for list endpoints: no serializer, field or model
+    instance is created per row, each row is a plain dict renamed to the API
+    field names.
+    """
+    fields = [(name, *ROOM_VALUE_FIELDS[name]) for name in _room_value_fields(fields)]
+    return [
+        {name: convert(row[source]) if convert else row[source] for name, source, convert in fields}
+        for row in rows
+    ]
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Room
+from .occupancy import occupancy_index
+
+
+@receiver([post_save, post_delete], sender='bookings.Booking')
+def booking_changed(sender, instance, **kwargs):
+    # A booking moved to another room changes the occupancy of both rooms
+    occupancy_index.invalidate([instance.room_id, getattr(instance, '_loaded_room_id', None)])
+    instance._loaded_room_id = instance.room_id
+
+
+@receiver([post_save, post_delete], sender=Room)
+def room_changed(sender, instance, created=False, **kwargs):
+    # Room ids can be reused after a delete, so new and removed rooms start over
+    if created or kwargs['signal'] is post_delete:
+        occupancy_index.invalidate([instance.pk])
@@ -1,8 +1,27 @@
-from datetime import date, datetime
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
 
+from django.contrib.auth.models import User
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from asgiref.sync import iscoroutinefunction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils.http import parse_http_date
+from hotel_management import cache as response_cache
+from rooms.checks import check_occupancy_cache
+from rooms.importers import import_rooms
 from rooms.models import Room
+from rooms.serializers import RoomSerializer, room_values, serialize_room_values
+from rooms.occupancy import occupancy_index
 from bookings.models import Booking
 from guests.models import Guest
 
@@ -530,4 +549,759 @@ class RoomTest(TestCase):
         check_in = datetime(2026, 3, 5)
         check_out = datetime(2026, 3, 6)
         self.assertTrue(self.room2.is_room_available(check_in, check_out, self.room2.id))
-    """
\ No newline at end of file
+    """
+
+class AvailableRoomListTest(TestCase):
+
+    def setUp(self):
+        """Set up rooms and a confirmed booking for availability search tests"""
+        self.single = Room.objects.create(
+            room_number="301A",
+            room_type="Single",
+            rate=80.00,
+            room_status="Available",
+            capacity=1
+        )
+        self.double = Room.objects.create(
+            room_number="302A",
+            room_type="Double",
+            rate=120.00,
+            room_status="Available",
+            capacity=2
+        )
+        self.suite = Room.objects.create(
+            room_number="303A",
+            room_type="Suite",
+            rate=250.00,
+            room_status="Available",
+            capacity=4
+        )
+        self.maintenance = Room.objects.create(
+            room_number="304A",
+            room_type="Suite",
+            rate=250.00,
+            room_status="Under Maintenance",
+            capacity=4
+        )
+        self.guest = Guest.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="1234567890"
+        )
+        Booking.objects.create(
+            room=self.double,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=date(2030, 6, 10),
+            check_out=date(2030, 6, 15),
+            total_price=240.00,
+        )
+        # Pending and cancelled bookings must not block a room
+        Booking.objects.create(
+            room=self.suite,
+            guest=self.guest,
+            booking_status="cancelled",
+            check_in=date(2030, 6, 10),
+            check_out=date(2030, 6, 15),
+            total_price=250.00,
+        )
+
+    def _room_numbers(self, **params):
+        response = self.client.get('/api/rooms/available/', params)
+        self.assertEqual(response.status_code, 200)
+        return [room['room_number'] for room in response.json()]
+
+    def test_overlapping_confirmed_booking_excluded(self):
+        self.assertEqual(self._room_numbers(check_in="2030-06-12", check_out="2030-06-20"), ["301A", "303A"])
+
+    def test_adjacent_stay_is_available(self):
+        self.assertEqual(self._room_numbers(check_in="2030-06-15", check_out="2030-06-18"), ["301A", "302A", "303A"])
+
+    def test_room_type_and_capacity_filters(self):
+        self.assertEqual(self._room_numbers(check_in="2030-07-01", check_out="2030-07-03", room_type="Suite"), ["303A"])
+        self.assertEqual(self._room_numbers(check_in="2030-07-01", check_out="2030-07-03", min_capacity=2), ["302A", "303A"])
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/rooms/available/', {"check_in": "2030-06-12", "check_out": "2030-06-20"})
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/rooms/available/').status_code, 400)
+        self.assertEqual(self.client.get('/api/rooms/available/', {"check_in": "soon", "check_out": "later"}).status_code, 400)
+        self.assertEqual(self.client.get('/api/rooms/available/', {"check_in": "2030-06-20", "check_out": "2030-06-12"}).status_code, 400)
+        self.assertEqual(self.client.get('/api/rooms/available/', {"check_in": "2030-06-12", "check_out": "2030-06-20", "min_capacity": "two"}).status_code, 400)
+
+    def test_serialized_field_names(self):
+        response = self.client.get('/api/rooms/available/', {"check_in": "2030-07-01", "check_out": "2030-07-03"})
+        self.assertEqual(response.json()[0], {
+            "id": self.single.id,
+            "room_number": "301A",
+            "type": "Single",
+            "price": "80.00",
+            "status": "Available",
+            "capacity": 1,
+        })
+
+
+class OccupancyIndexTest(TestCase):
+
+    def setUp(self):
+        """Set up rooms with confirmed bookings and build a fresh occupancy index"""
+        caches['occupancy'].clear()
+        self.room = Room.objects.create(
+            room_number="401A",
+            room_type="Double",
+            rate=120.00,
+            room_status="Available",
+            capacity=2
+        )
+        self.other_room = Room.objects.create(
+            room_number="402A",
+            room_type="Double",
+            rate=120.00,
+            room_status="Available",
+            capacity=2
+        )
+        self.guest = Guest.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="1234567890"
+        )
+        self.today = date.today()
+        self.booking = Booking.objects.create(
+            room=self.room,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=self.today + timedelta(days=10),
+            check_out=self.today + timedelta(days=15),
+            total_price=240.00,
+        )
+        occupancy_index.rebuild()
+
+    def tearDown(self):
+        occupancy_index.clear()
+
+    def days(self, start, end):
+        return self.today + timedelta(days=start), self.today + timedelta(days=end)
+
+    def test_answers_from_index_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(occupancy_index.is_free(self.room.id, *self.days(12, 14)))
+            self.assertFalse(occupancy_index.is_free(self.room.id, *self.days(8, 11)))
+            self.assertFalse(occupancy_index.is_free(self.room.id, *self.days(5, 20)))
+            self.assertTrue(occupancy_index.is_free(self.room.id, *self.days(15, 18)))
+            self.assertTrue(occupancy_index.is_free(self.room.id, *self.days(5, 10)))
+            self.assertTrue(occupancy_index.is_free(self.other_room.id, *self.days(12, 14)))
+
+    def test_new_booking_is_visible_immediately(self):
+        Booking.objects.create(
+            room=self.other_room,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=self.today + timedelta(days=12),
+            check_out=self.today + timedelta(days=14),
+            total_price=240.00,
+        )
+        self.assertFalse(occupancy_index.is_free(self.other_room.id, *self.days(13, 16)))
+
+    def test_moved_and_cancelled_bookings(self):
+        self.booking.room = self.other_room
+        self.booking.save()
+        self.assertTrue(occupancy_index.is_free(self.room.id, *self.days(12, 14)))
+        self.assertFalse(occupancy_index.is_free(self.other_room.id, *self.days(12, 14)))
+
+        self.booking.booking_status = "cancelled"
+        self.booking.save()
+        self.assertTrue(occupancy_index.is_free(self.other_room.id, *self.days(12, 14)))
+
+    def test_outside_window_falls_back_to_database(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(occupancy_index.is_free(self.room.id, *self.days(800, 805)))
+
+    def test_is_room_available(self):
+        self.assertEqual(self.room.is_room_available(*self.days(15, 18)), (True, None))
+        self.assertEqual(
+            self.room.is_room_available(*self.days(12, 14)),
+            (False, "Error: Room is unavailable for the selected dates.")
+        )
+        self.assertFalse(self.room.is_room_available(*self.days(-3, 2))[0])
+        self.assertFalse(self.room.is_room_available(*self.days(20, 40))[0])
+        self.assertFalse(self.room.is_room_available("invalid_date", self.today)[0])
+
+        self.room.room_status = "Under Maintenance"
+        self.assertFalse(self.room.is_room_available(*self.days(15, 18))[0])
+
+    def test_room_availability_endpoint(self):
+        check_in, check_out = self.days(12, 14)
+        response = self.client.get(f'/api/rooms/{self.room.id}/availability/',
+                                   {"check_in": check_in.isoformat(), "check_out": check_out.isoformat()})
+        self.assertEqual(response.status_code, 400)
+
+        check_in, check_out = self.days(16, 18)
+        response = self.client.get(f'/api/rooms/{self.room.id}/availability/',
+                                   {"check_in": f"{check_in.isoformat()}T15:00", "check_out": f"{check_out.isoformat()}T11:00"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_evicted_token_is_not_taken_as_current(self):
+        # Loaded before any write to the room, then the write's token is evicted
+        caches['occupancy'].clear()
+        occupancy_index.rebuild()
+        self.assertTrue(occupancy_index.is_free(self.other_room.id, *self.days(12, 14)))
+        Booking.objects.create(
+            room=self.other_room,
+            guest=self.guest,
+            booking_status="confirmed",
+            check_in=self.today + timedelta(days=12),
+            check_out=self.today + timedelta(days=14),
+            total_price=240.00,
+        )
+        caches['occupancy'].clear()
+        self.assertFalse(occupancy_index.is_free(self.other_room.id, *self.days(12, 14)))
+
+    def test_database_answers_until_index_is_built(self):
+        occupancy_index.clear()
+        with self.assertNumQueries(1):
+            self.assertFalse(occupancy_index.is_free(self.room.id, *self.days(12, 14)))
+        self.assertIsNone(occupancy_index.stats()['floor'])
+
+    def test_memory_limit_disables_index(self):
+        with self.settings(OCCUPANCY_INDEX_MAX_BOOKINGS=0), self.assertLogs('rooms.occupancy', 'WARNING'):
+            occupancy_index.rebuild()
+            self.assertFalse(occupancy_index.stats()['enabled'])
+            self.assertFalse(occupancy_index.is_free(self.room.id, *self.days(12, 14)))
+
+
+class OccupancyIndexCommitTest(TransactionTestCase):
+
+    def tearDown(self):
+        occupancy_index.clear()
+
+    def test_committed_booking_reloads_room(self):
+        room = Room.objects.create(
+            room_number="501A",
+            room_type="Single",
+            rate=80.00,
+            room_status="Available",
+            capacity=1
+        )
+        guest = Guest.objects.create(
+            first_name="Jane",
+            last_name="Doe",
+            email="jane.doe@example.com",
+            phone_number="1234567890"
+        )
+        check_in, check_out = date.today() + timedelta(days=3), date.today() + timedelta(days=6)
+        occupancy_index.rebuild()
+        self.assertTrue(occupancy_index.is_free(room.id, check_in, check_out))
+
+        Booking.objects.create(
+            room=room,
+            guest=guest,
+            booking_status="confirmed",
+            check_in=check_in,
+            check_out=check_out,
+            total_price=240.00,
+        )
+        self.assertFalse(occupancy_index.is_free(room.id, check_in, check_out))
+        # Reloaded into the index, so the next answer needs no query
+        with self.assertNumQueries(0):
+            self.assertFalse(occupancy_index.is_free(room.id, check_in, check_out))
+
+
+class OccupancyIndexBuildTest(TransactionTestCase):
+
+    def setUp(self):
+        occupancy_index.clear()
+
+    def tearDown(self):
+        occupancy_index.clear()
+
+    def test_background_build(self):
+        room = Room.objects.create(room_number="601A", room_type="Single", rate=80.00,
+                                   room_status="Available", capacity=1)
+        guest = Guest.objects.create(first_name="Jane", last_name="Doe", email="jane.doe@example.com",
+                                     phone_number="1234567890")
+        check_in, check_out = date.today() + timedelta(days=3), date.today() + timedelta(days=6)
+        Booking.objects.create(room=room, guest=guest, booking_status="confirmed",
+                               check_in=check_in, check_out=check_out, total_price=240.00)
+
+        # A second start while the first build runs is ignored
+        occupancy_index.build_in_background()
+        occupancy_index.build_in_background()
+        threads = [thread for thread in threading.enumerate() if thread.name == 'occupancy-index-build']
+        self.assertLessEqual(len(threads), 1)
+        for thread in threads:
+            thread.join(timeout=10)
+
+        self.assertEqual(occupancy_index.stats()['bookings'], 1)
+        with self.assertNumQueries(0):
+            self.assertFalse(occupancy_index.is_free(room.id, check_in, check_out))
+
+    def test_forked_process_builds_its_own_index(self):
+        # As left in a child forked while the parent's build thread ran
+        occupancy_index._building = True
+        occupancy_index._after_fork()
+        for thread in threading.enumerate():
+            if thread.name == 'occupancy-index-build':
+                thread.join(timeout=10)
+        self.assertEqual(occupancy_index.stats()['floor'], date.today())
+
+
+class OccupancyCacheCheckTest(TestCase):
+
+    def test_process_local_cache_is_reported_on_deploy(self):
+        self.assertEqual([warning.id for warning in check_occupancy_cache(None)], ['rooms.W001'])
+        with override_settings(OCCUPANCY_CACHE_ALIAS='shared', CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'shared': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        }):
+            self.assertEqual(check_occupancy_cache(None), [])
+
+
+class RoomCalendarTest(TestCase):
+
+    def setUp(self):
+        """Set up rooms and bookings around a fixed calendar window"""
+        self.single = Room.objects.create(
+            room_number="601A",
+            room_type="Single",
+            rate=80.00,
+            room_status="Available",
+            capacity=1
+        )
+        self.double = Room.objects.create(
+            room_number="602A",
+            room_type="Double",
+            rate=120.00,
+            room_status="Available",
+            capacity=2
+        )
+        self.maintenance = Room.objects.create(
+            room_number="603A",
+            room_type="Double",
+            rate=120.00,
+            room_status="Under Maintenance",
+            capacity=2
+        )
+        guest = Guest.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="1234567890"
+        )
+        # Starts before the window and ends on its second night
+        Booking.objects.create(room=self.single, guest=guest, booking_status="confirmed",
+                               check_in=date(2030, 5, 28), check_out=date(2030, 6, 2), total_price=100.00)
+        Booking.objects.create(room=self.single, guest=guest, booking_status="confirmed",
+                               check_in=date(2030, 6, 4), check_out=date(2030, 6, 6), total_price=100.00)
+        # Runs past the end of the window
+        Booking.objects.create(room=self.double, guest=guest, booking_status="confirmed",
+                               check_in=date(2030, 6, 6), check_out=date(2030, 6, 20), total_price=100.00)
+        Booking.objects.create(room=self.double, guest=guest, booking_status="pending",
+                               check_in=date(2030, 6, 1), check_out=date(2030, 6, 3), total_price=100.00)
+
+    def test_bitstrings_and_free_counts(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/rooms/calendar/', {"start": "2030-06-01", "days": 7})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([room['free'] for room in data['rooms']], ["0110011", "1111100", "0000000"])
+        self.assertEqual(data['free_counts'], {
+            "Single": [0, 1, 1, 0, 0, 1, 1],
+            "Double": [1, 1, 1, 1, 1, 0, 0],
+            "Suite": [0, 0, 0, 0, 0, 0, 0],
+        })
+
+    def test_run_length_encoding(self):
+        response = self.client.get('/api/rooms/calendar/', {"start": "2030-06-01", "days": 7, "encoding": "rle"})
+        self.assertEqual(response.json()['rooms'][0]['free'], [[False, 1], [True, 2], [False, 2], [True, 2]])
+        self.assertEqual(response.json()['rooms'][2]['free'], [[False, 7]])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/rooms/calendar/', {"start": "June"}).status_code, 400)
+        self.assertEqual(self.client.get('/api/rooms/calendar/', {"days": 0}).status_code, 400)
+        self.assertEqual(self.client.get('/api/rooms/calendar/', {"days": 1000}).status_code, 400)
+        self.assertEqual(self.client.get('/api/rooms/calendar/', {"encoding": "hex"}).status_code, 400)
+
+
+class RoomListPaginationTest(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        for number in range(1, 6):
+            Room.objects.create(
+                room_number=f"70{number}A",
+                room_type="Single",
+                rate=80.00,
+                room_status="Available",
+                capacity=1
+            )
+
+    def test_pages_follow_cursor(self):
+        url, room_numbers = '/api/rooms/?page_size=2', []
+        while url:
+            # The page itself; the validators come from the response cache
+            with self.assertNumQueries(1):
+                data = self.client.get(url).json()
+            self.assertLessEqual(len(data['results']), 2)
+            room_numbers += [room['room_number'] for room in data['results']]
+            url = data['next']
+        self.assertEqual(room_numbers, ["701A", "702A", "703A", "704A", "705A"])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/rooms/', {"page_size": 100000})
+        self.assertEqual(len(response.json()['results']), 5)
+        self.assertNotIn('count', response.json())
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/rooms/', {"cursor": "not-a-cursor"}).status_code, 404)
+
+
+class RoomListConditionalGetTest(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.room = Room.objects.create(
+            room_number="801A",
+            room_type="Single",
+            rate=80.00,
+            room_status="Available",
+            capacity=1
+        )
+
+    def test_matching_etag_returns_not_modified(self):
+        response = self.client.get('/api/rooms/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        # Validators are cached with the payload, so a revalidation needs no query
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/rooms/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_changes_invalidate_etag(self):
+        etag = self.client.get('/api/rooms/')['ETag']
+
+        self.room.rate = 90.00
+        self.room.save()
+        response = self.client.get('/api/rooms/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        self.room.delete()
+        self.assertEqual(self.client.get('/api/rooms/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_each_page_has_its_own_etag(self):
+        etag = self.client.get('/api/rooms/')['ETag']
+        self.assertEqual(self.client.get('/api/rooms/?page_size=1', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get('/api/rooms/')['Last-Modified']
+        self.assertEqual(self.client.get('/api/rooms/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_last_modified_follows_changes_that_keep_row_timestamps(self):
+        older = Room.objects.create(room_number="802A", room_type="Single", rate=80.00,
+                                    room_status="Available", capacity=1)
+        # Rows last changed long ago: the newest row timestamp would never move
+        Room.objects.update(last_changed_date=datetime(2020, 1, 1, tzinfo=dt_timezone.utc))
+        response_cache.invalidate(Room)
+
+        def update_rates():
+            Room.objects.update(rate=95.00)
+            response_cache.invalidate(Room)
+
+        def import_room():
+            import_rooms(StringIO("room_number,room_type,rate,room_status,capacity\n803A,Single,80.00,Available,1\n"))
+
+        for change in (older.delete, update_rates, import_room):
+            since = int(time.time())
+            change()
+            response = self.client.get('/api/rooms/')
+            self.assertGreaterEqual(parse_http_date(response['Last-Modified']), since)
+
+
+class RoomValuesSerializationTest(TestCase):
+
+    def setUp(self):
+        Room.objects.create(room_number="901A", room_type="Single", rate=80, room_status="Available", capacity=1)
+        Room.objects.create(room_number="902A", room_type="Suite", rate=249.5, room_status="Booked", capacity=4)
+        Room.objects.create(room_number="903A", room_type="Double", rate=100.00,
+                            room_status="Under Maintenance", capacity=2)
+
+    def test_matches_model_serializer(self):
+        rooms = Room.objects.order_by('id')
+        self.assertEqual(serialize_room_values(room_values(rooms)), RoomSerializer(rooms, many=True).data)
+
+    def test_fetches_only_exposed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(room_values(Room.objects.all()))
+        self.assertNotIn("created_date", queries[0]['sql'])
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_room_serializers', '--rooms', '20', '--repeat', '1', stdout=out)
+        self.assertIn("us/row", out.getvalue())
+        self.assertFalse(Room.objects.filter(room_number__startswith="BENCH-").exists())
+
+
+class RoomListFilterTest(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        for number, room_type, rate, status, capacity in [
+            ("111A", "Single", 60.00, "Available", 1),
+            ("112A", "Single", 90.00, "Available", 1),
+            ("113A", "Double", 120.00, "Available", 2),
+            ("114A", "Double", 120.00, "Booked", 3),
+            ("115A", "Suite", 300.00, "Available", 5),
+        ]:
+            Room.objects.create(room_number=number, room_type=room_type, rate=rate,
+                                room_status=status, capacity=capacity)
+
+    def _room_numbers(self, **params):
+        response = self.client.get('/api/rooms/', params)
+        self.assertEqual(response.status_code, 200)
+        return [room['room_number'] for room in response.json()['results']]
+
+    def test_equality_and_range_filters(self):
+        self.assertEqual(self._room_numbers(room_type="Double"), ["113A", "114A"])
+        self.assertEqual(self._room_numbers(room_status="Available", room_type="Double"), ["113A"])
+        self.assertEqual(self._room_numbers(rate_min="90", rate_max="120"), ["112A", "113A", "114A"])
+        self.assertEqual(self._room_numbers(min_capacity=3), ["114A", "115A"])
+
+    def test_ordering_pages_through_ties(self):
+        self.assertEqual(self._room_numbers(ordering="-rate"), ["115A", "114A", "113A", "112A", "111A"])
+
+        url, room_numbers = '/api/rooms/?ordering=rate&page_size=2', []
+        while url:
+            data = self.client.get(url).json()
+            room_numbers += [room['room_number'] for room in data['results']]
+            url = data['next']
+        self.assertEqual(room_numbers, ["111A", "112A", "113A", "114A", "115A"])
+
+    def test_pages_through_more_ties_than_an_offset_can_skip(self):
+        # The ordering column alone would need a cursor offset past DRF's cap of 1000
+        Room.objects.bulk_create([
+            Room(room_number=f"T{number:04}", room_type="Double", rate=100.00, room_status="Available", capacity=2)
+            for number in range(1300)
+        ])
+        expected = list(Room.objects.filter(capacity=2).order_by('-id').values_list('room_number', flat=True))
+
+        url, pages = '/api/rooms/?ordering=-capacity&min_capacity=2&page_size=100', []
+        while url:
+            data = self.client.get(url).json()
+            pages.append([room['room_number'] for room in data['results'] if room['capacity'] == 2])
+            url, previous = data['next'], data['previous']
+        self.assertEqual(sum(pages, []), expected)
+
+        backward = [pages[-1]]
+        while previous:
+            data = self.client.get(previous).json()
+            backward.append([room['room_number'] for room in data['results'] if room['capacity'] == 2])
+            previous = data['previous']
+        self.assertEqual(backward, pages[::-1])
+
+    def test_invalid_parameters(self):
+        for params in ({"room_type": "Penthouse"}, {"room_status": "Closed"}, {"rate_min": "cheap"},
+                       {"rate_min": "NaN"}, {"rate_max": "Infinity"}, {"rate_min": "-Infinity"},
+                       {"min_capacity": "2.5"}, {"ordering": "created_by"}):
+            self.assertEqual(self.client.get('/api/rooms/', params).status_code, 400)
+
+
+class RoomListFieldsTest(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        Room.objects.create(room_number="121A", room_type="Single", rate=60.00, room_status="Available", capacity=1)
+        Room.objects.create(room_number="122A", room_type="Suite", rate=300.00, room_status="Available", capacity=5)
+
+    def test_only_requested_fields_are_selected_and_returned(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/rooms/', {"fields": "room_number,price"})
+        self.assertEqual(response.json()['results'], [
+            {"room_number": "121A", "price": "60.00"},
+            {"room_number": "122A", "price": "300.00"},
+        ])
+        page_query = queries[-1]['sql']
+        self.assertNotIn("room_type", page_query)
+        self.assertNotIn("capacity", page_query)
+
+    def test_ordering_column_is_loaded_for_the_cursor(self):
+        data = self.client.get('/api/rooms/', {"fields": "room_number", "ordering": "-capacity", "page_size": 1}).json()
+        self.assertEqual(data['results'], [{"room_number": "122A"}])
+        self.assertEqual(self.client.get(data['next']).json()['results'], [{"room_number": "121A"}])
+
+    def test_unknown_field(self):
+        self.assertEqual(self.client.get('/api/rooms/', {"fields": "room_number,rate"}).status_code, 400)
+        self.assertEqual(self.client.get('/api/rooms/available/', {"check_in": "2030-01-01", "check_out": "2030-01-02",
+                                                                   "fields": "floor"}).status_code, 400)
+
+    def test_model_serializer_fields(self):
+        room = Room.objects.get(room_number="121A")
+        self.assertEqual(RoomSerializer(room, fields=["type", "capacity"]).data, {"type": "Single", "capacity": 1})
+        self.assertEqual(RoomSerializer(fields=["type", "price"]).model_columns(), ["room_type", "rate"])
+
+
+class RoomImportTest(TestCase):
+
+    header = "room_number,room_type,rate,room_status,capacity\n"
+
+    def setUp(self):
+        Room.objects.create(room_number="EXIST", room_type="Single", rate=60.00, room_status="Available", capacity=1)
+
+    def test_batches_use_one_lookup_and_one_insert(self):
+        rows = "".join(f"B{number},Double,120.00,Available,2\n" for number in range(50))
+        with CaptureQueriesContext(connection) as queries:
+            result = import_rooms(StringIO(self.header + rows), batch_size=25)
+        self.assertEqual(result.created, 50)
+        self.assertEqual(result.errors, [])
+        statements = [query['sql'].split()[0] for query in queries]
+        self.assertEqual(statements.count("SELECT"), 2)
+        self.assertEqual(statements.count("INSERT"), 2)
+        self.assertEqual(Room.objects.filter(room_number__startswith="B").count(), 50)
+
+    def test_rows_are_rejected_with_line_numbers(self):
+        rows = (
+            "C1,Single,80.00,Available,1\n"
+            "C2,Penthouse,80.00,Available,1\n"  # invalid type
+            "C3,Single,20.00,Available,1\n"  # rate below minimum
+            "C4,Single,80.00,Available,six\n"  # capacity not an integer
+            "C1,Single,80.00,Available,1\n"  # duplicate within the file
+            "EXIST,Single,80.00,Available,1\n"  # already in the database
+            ",Single,80.00,Available,1\n"  # missing room number
+            "C5,Single,NaN,Available,1\n"  # rates that are not finite numbers
+            "C6,Single,sNaN,Available,1\n"
+            "C7,Single,Infinity,Available,1\n"
+        )
+        result = import_rooms(StringIO(self.header + rows), batch_size=3)
+        self.assertEqual(result.created, 1)
+        self.assertEqual([(line, number) for line, number, _ in result.errors],
+                         [(3, "C2"), (4, "C3"), (5, "C4"), (6, "C1"), (7, "EXIST"), (8, ""),
+                          (9, "C5"), (10, "C6"), (11, "C7")])
+        self.assertEqual(result.errors[3][2], "Duplicate room number in file.")
+        self.assertEqual({message for _, _, message in result.errors[6:]}, {"Price must be a decimal."})
+
+    def test_missing_columns(self):
+        with self.assertRaises(ValidationError):
+            import_rooms(StringIO("room_number,rate\nD1,80.00\n"))
+
+    def test_import_rooms_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write(self.header + "E1,Suite,250.00,Available,4\nE2,Suite,900.00,Available,4\n")
+        self.addCleanup(os.remove, csv_file.name)
+
+        out, err = StringIO(), StringIO()
+        call_command('import_rooms', csv_file.name, '--created-by', 'importer', stdout=out, stderr=err)
+        self.assertIn("Imported 1 rooms, rejected 1 rows.", out.getvalue())
+        self.assertIn("Line 3 (E2)", err.getvalue())
+        self.assertEqual(Room.objects.get(room_number="E1").created_by, "importer")
+
+    def test_admin_upload(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        upload = SimpleUploadedFile("rooms.csv", (self.header + "F1,Double,100.00,Available,2\n").encode())
+        response = self.client.post(reverse('admin:import_rooms'), {"csv_file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Room.objects.filter(room_number="F1", created_by="admin").exists())
+        self.assertContains(self.client.get(reverse('admin:rooms_room_changelist')), "Import rooms")
+
+
+class RoomAvailabilityGridTest(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        guest = Guest.objects.create(first_name="Grid", last_name="Guest", email="grid@example.com",
+                                     phone_number="1234567890")
+        self.rooms = {
+            number: Room.objects.create(room_number=number, room_type=room_type, rate=100.00,
+                                        room_status=status, capacity=2)
+            for number, room_type, status in [
+                ("301", "Double", "Available"),
+                ("302", "Double", "Available"),
+                ("303", "Double", "Under Maintenance"),
+                ("304", "Suite", "Available"),
+                ("401", "Double", "Available"),
+            ]
+        }
+        Booking.objects.create(room=self.rooms["301"], guest=guest, booking_status="confirmed",
+                               check_in=date(2030, 6, 2), check_out=date(2030, 6, 4), total_price=200.00)
+        Booking.objects.create(room=self.rooms["302"], guest=guest, booking_status="pending",
+                               check_in=date(2030, 6, 2), check_out=date(2030, 6, 4), total_price=200.00)
+
+    def grid(self, **params):
+        params = {"check_in": "2030-06-01", "check_out": "2030-06-05", **params}
+        return self.client.get(reverse('admin:room_availability_grid'), params)
+
+    def test_grid_for_a_floor_and_type(self):
+        # Session and user, then one query for the rooms and one for their bookings
+        with self.assertNumQueries(4):
+            response = self.grid(room_number="3", room_type="Double")
+        self.assertEqual(response.status_code, 200)
+        rows = {row['room']['room_number']: row for row in response.context['rows']}
+        self.assertEqual(list(rows), ["301", "302", "303"])
+        self.assertEqual(rows["301"]['nights'], [True, False, False, True])
+        self.assertTrue(rows["302"]['free'])  # Pending bookings do not block the room
+        self.assertTrue(rows["303"]['maintenance'])
+        self.assertFalse(rows["303"]['free'])
+        self.assertEqual(response.context['free_rooms'], 1)
+        self.assertContains(response, 'class="night booked"', count=2)
+        self.assertContains(response, 'class="night maintenance"', count=4)
+
+    def test_invalid_range(self):
+        response = self.grid(check_out="2030-06-01")
+        self.assertNotIn('rows', response.context)
+        self.assertContains(response, "Check-in date must be before check-out date.")
+        self.assertFormError(self.grid(check_out="2030-09-01").context['form'], None,
+                             "The grid shows at most 62 nights.")
+
+    def test_single_room_page_shows_room_number(self):
+        response = self.client.get(reverse('admin:check_room_availability', args=[self.rooms["304"].id]))
+        self.assertContains(response, 'Check Room Availability for "304"')
+        self.assertContains(self.client.get(reverse('admin:rooms_room_changelist')), "Availability grid")
+
+
+class AsyncReadEndpointTest(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.room = Room.objects.create(room_number="501A", room_type="Single", rate=80.00,
+                                        room_status="Available", capacity=1)
+        Guest.objects.create(first_name="Ann", last_name="Async", email="ann@example.com", phone_number="1234567890")
+
+    def test_views_are_async(self):
+        for path in ('/api/rooms/', f'/api/rooms/{self.room.id}/availability/', '/api/guests/'):
+            self.assertTrue(iscoroutinefunction(resolve(path).func), path)
+
+    async def test_served_by_async_client(self):
+        response = await self.async_client.get('/api/rooms/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room['room_number'] for room in response.json()['results']], ["501A"])
+        self.assertIn('ETag', response.headers)
+
+        check_in = date.today() + timedelta(days=3)
+        response = await self.async_client.get(f'/api/rooms/{self.room.id}/availability/', {
+            "check_in": check_in.isoformat(), "check_out": (check_in + timedelta(days=2)).isoformat()})
+        self.assertEqual(response.json(), {"message": "Room is available!"})
+        self.assertEqual((await self.async_client.get('/api/rooms/999999/availability/')).status_code, 404)
+
+        response = await self.async_client.get('/api/guests/', {"fields": "email"})
+        self.assertEqual(response.json()['results'], [{"email": "ann@example.com"}])
+        self.assertEqual((await self.async_client.post('/api/guests/')).status_code, 405)
+
+
+class BenchmarkReadEndpointsTest(TransactionTestCase):
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_read_endpoints', '--requests', '30', '--concurrency', '4', '--rooms', '5',
+                     '--guests', '5', '--host', 'testserver', stdout=out)
+        self.assertIn("WSGI", out.getvalue())
+        self.assertIn("ASGI", out.getvalue())
+        self.assertEqual(out.getvalue().count(" 0 failed"), 2)
+        self.assertFalse(Room.objects.filter(room_number__startswith="BENCH-").exists())
+        self.assertFalse(Guest.objects.filter(email__endswith="@bench.invalid").exists())
@@ -1,22 +1,147 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
 from django.http import JsonResponse
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from datetime import datetime
+from datetime import date, datetime
+from hotel_management.cache import aget_cached, aset_cached, avalidators
+from hotel_management.pagination import KeysetPagination
+from hotel_management.serializers import requested_fields
+from hotel_management.views import AsyncAPIView
+from .calendar import OccupancyCalendar
+from .filters import filter_rooms
 from .models import Room
-from .serializers import RoomSerializer
+from .serializers import room_values, serialize_room_values
 
 
-class RoomList(APIView):
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Let clients keep the copy but revalidate it on every use
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class RoomList(AsyncAPIView):
+    read_from_replica = True
+    cache_depends_on = ['rooms.Room']
+
+    async def get(self, request):
+        fields = requested_fields(request)
+        try:
+            rooms, ordering = filter_rooms(Room.objects.all(), request.GET)
+            # The paginator reads its cursor position from the ordering columns
+            rooms = room_values(rooms, fields, extra=[column.lstrip('-') for column in ordering])
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=400)
+
+        entry = await aget_cached(request, self.cache_depends_on)
+        if entry is None:
+            etag, last_modified = await avalidators(request, self.cache_depends_on)
+            paginator = KeysetPagination(ordering=ordering)
+            rooms = await paginator.apaginate_queryset(rooms, request, view=self)
+            entry = {
+                'data': paginator.get_paginated_response(serialize_room_values(rooms, fields)).data,
+                'etag': etag,
+                'last_modified': last_modified,
+            }
+            await aset_cached(request, self.cache_depends_on, entry)
+
+        etag, last_modified = entry['etag'], entry['last_modified']
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+        return set_validators(Response(entry['data']), etag, last_modified)
+
+
+class AvailableRoomList(APIView):
+    read_from_replica = True
+
     def get(self, request):
-        rooms = Room.objects.all()
-        serializer = RoomSerializer(rooms, many=True)
-        return Response(serializer.data)
+        check_in = request.GET.get('check_in')  # For example: "2025-05-01"
+        check_out = request.GET.get('check_out')  # For example: "2025-05-05"
+
+        if not check_in or not check_out:
+            return JsonResponse({"error": "Both check_in and check_out dates are required."}, status=400)
+
+        try:
+            # Bookings are stored per night, so only the date part is relevant
+            check_in = datetime.fromisoformat(check_in).date()
+            check_out = datetime.fromisoformat(check_out).date()
+        except ValueError:
+            return JsonResponse({"error": "Invalid date format."}, status=400)
+
+        if check_in >= check_out:
+            return JsonResponse({"error": "Check-in date must be before check-out date."}, status=400)
+
+        rooms = Room.objects.available_between(check_in, check_out)
+
+        room_type = request.GET.get('room_type')
+        if room_type:
+            rooms = rooms.filter(room_type=room_type)
+
+        min_capacity = request.GET.get('min_capacity')
+        if min_capacity:
+            try:
+                rooms = rooms.filter(capacity__gte=int(min_capacity))
+            except ValueError:
+                return JsonResponse({"error": "min_capacity must be an integer."}, status=400)
+
+        fields = requested_fields(request)
+        try:
+            rooms = room_values(rooms.order_by('id'), fields)
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=400)
+        return Response(serialize_room_values(rooms, fields))
+
+
+class RoomCalendar(APIView):
+    read_from_replica = True
+    max_days = 366
+
+    def get(self, request):
+        try:
+            start = request.GET.get('start')
+            start = datetime.fromisoformat(start).date() if start else date.today()
+        except ValueError:
+            return JsonResponse({"error": "Invalid date format."}, status=400)
+
+        try:
+            days = int(request.GET.get('days', 90))
+        except ValueError:
+            return JsonResponse({"error": "days must be an integer."}, status=400)
+        if not 1 <= days <= self.max_days:
+            return JsonResponse({"error": f"days must be between 1 and {self.max_days}."}, status=400)
+
+        encoding = request.GET.get('encoding', 'bits')
+        if encoding not in ('bits', 'rle'):
+            return JsonResponse({"error": "encoding must be 'bits' or 'rle'."}, status=400)
+
+        calendar = OccupancyCalendar(start, days)
+        availability = calendar.bitstrings() if encoding == 'bits' else calendar.run_lengths()
+
+        return Response({
+            "start": start,
+            "days": days,
+            "encoding": encoding,
+            "rooms": [
+                {"id": room['id'], "room_number": room['room_number'], "type": room['room_type'], "free": free}
+                for room, free in zip(calendar.rooms, availability)
+            ],
+            "free_counts": calendar.free_counts_by_type(),
+        })
+
+
+class RoomAvailability(AsyncAPIView):
+    read_from_replica = True
 
-class RoomAvailability(APIView):
-    def get(self, request, room_id):
+    async def get(self, request, room_id):
         # Get the room based on room_id
-        room = get_object_or_404(Room, id=room_id)
+        room = await aget_object_or_404(Room, id=room_id)
 
         # Get the user-inputted check-in and check-out dates from request (assuming they're sent via GET)
         check_in = request.GET.get('check_in')  # For example: "2025-05-01T15:00"
@@ -33,7 +158,8 @@ class RoomAvailability(APIView):
             return JsonResponse({"error": "Invalid date format."}, status=400)
 
         # Check if room is available
-        is_available, error_message = room.is_room_available(check_in, check_out)
+        # Answered from the in-memory occupancy index, which loads rooms synchronously when stale
+        is_available, error_message = await sync_to_async(room.is_room_available)(check_in, check_out)
 
         if is_available:
             return JsonResponse({"message": "Room is available!"}, status=200)
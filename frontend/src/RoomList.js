@@ -7,7 +7,7 @@ function RoomList() {
   useEffect(() => {
     axios.get('http://127.0.0.1:8000/api/rooms/')
       .then(response => {
-        setRooms(response.data);
+        setRooms(response.data.results);
       })
       .catch(error => {
         console.error('Error fetching rooms:', error);